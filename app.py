@@ -1,3 +1,7 @@
+import time
+# Reference point for the time-to-first-frame report, taken before the heavy imports
+START_TIME = time.perf_counter()
+
 import sys
 import os
 from PyQt6.QtWidgets import QApplication, QMainWindow, QStackedWidget
@@ -5,23 +9,34 @@ from PyQt6.QtCore import Qt, QTimer
 from gui.Login import Login
 from gui.Dashboard import Dashboard
 from dotenv import load_dotenv
-from supabase import create_client
-from utils.session import existsSession
+from utils.lazy import lazyImport, LazyObject
+from utils.session import clientOptions, hasSession, restoreSession, watchSession
+from ui.Theme import applyTheme
+from gui.Worker import runInBackground
+from gui.Refresh import TokenRefresher
+from gui.FirstPaint import afterPaint
 
 load_dotenv()
 
 os.environ['QT_QPA_PLATFORM'] = 'xcb'
 
+# Imported after the first frame, or when the client is first needed
+supabase = lazyImport("supabase")
+
 SUPABASE_URL = os.getenv('SUPABASE_URL')  # Replace with your Supabase URL
 SUPABASE_API_KEY = os.getenv('SUPABASE_API_KEY')
+THEME = os.getenv('THEME') or "dark"
 
 class MainApp(QMainWindow):
     def __init__(self):
         super().__init__()
-        # Create supabase client
-        self.supabase = create_client(SUPABASE_URL, SUPABASE_API_KEY)
-        
-        existsSession(self.supabase)
+        # Create supabase client, built on first use, with its session kept in the token store
+        self.supabase = LazyObject(lambda: watchSession(supabase.create_client(SUPABASE_URL, SUPABASE_API_KEY, options=clientOptions())))
+        self.dashboard_page = None
+        self.session_ready = False
+        # Keeps the session fresh before it expires, for every consumer of the client
+        self.token_refresher = TokenRefresher(self.supabase, parent=self)
+        self.token_refresher.sessionRefreshed.connect(self.on_session_refreshed)
 
         self.setWindowTitle("RemindIt")
         # Create the stacked widget
@@ -40,23 +55,85 @@ class MainApp(QMainWindow):
             QTimer.singleShot(0, self.startFlow)
 
     def startFlow(self):
+        # Paint from local state first, the session is restored in the background
+        if(hasSession()):
+            self.showDashboard()
+            QTimer.singleShot(0, lambda: runInBackground(restoreSession, self.supabase, on_result=self.on_session_restored, on_error=self.on_session_failed))
+        else:
+            self.showLogin()
 
-        if(existsSession(self.supabase)):
+    def showDashboard(self):
+        if self.dashboard_page is None:
             self.dashboard_page = Dashboard(self.supabase, parent=self.stacked_widget)
             self.stacked_widget.addWidget(self.dashboard_page)
-            self.setGeometry(*self.dashboard_page.windowPosSize)
+        self.setGeometry(*self.dashboard_page.windowPosSize)
+        self.stacked_widget.setCurrentWidget(self.dashboard_page)
+
+    def showLogin(self):
+        self.setGeometry(*self.login_page.windowPosSize)
+        self.setWindowFlags(self.windowFlags() & ~Qt.WindowType.WindowMaximizeButtonHint)
+        self.stacked_widget.setCurrentWidget(self.login_page)
+
+    def rebuildPages(self):
+        """
+        Recreate the pages from their current classes, keeping the client,
+        the session and the selected page. Used by `watch.py --reload`
+        after the page modules were reloaded.
+        """
+        self.stacked_widget.removeWidget(self.login_page)
+        self.login_page.deleteLater()
+        self.login_page = Login(self.supabase, self.on_login, parent=self.stacked_widget)
+        self.stacked_widget.insertWidget(0, self.login_page)
+
+        if self.dashboard_page is None:
+            return
+        showing = self.stacked_widget.currentWidget() is self.dashboard_page
+        row = self.dashboard_page.left_sidebar.currentRow()
+        # Pending task writes are committed here, the new page reads them back
+        self.dashboard_page.shutdown()
+        self.stacked_widget.removeWidget(self.dashboard_page)
+        self.dashboard_page.deleteLater()
+
+        self.dashboard_page = Dashboard(self.supabase, parent=self.stacked_widget)
+        self.stacked_widget.addWidget(self.dashboard_page)
+        self.dashboard_page.left_sidebar.setCurrentRow(row)
+        if showing:
             self.stacked_widget.setCurrentWidget(self.dashboard_page)
-        else:
-            self.setGeometry(*self.login_page.windowPosSize)
-            self.setWindowFlags(self.windowFlags() & ~Qt.WindowType.WindowMaximizeButtonHint)
-            self.stacked_widget.setCurrentWidget(self.login_page)
+        if self.session_ready:
+            self.dashboard_page.sessionReady()
 
-def main():
-    app = QApplication(sys.argv)
+    def on_session_restored(self, response):
+        self.session_ready = True
+        self.dashboard_page.sessionReady()
+        self.token_refresher.start()
+
+    def on_session_refreshed(self, session):
+        if self.dashboard_page is not None:
+            self.dashboard_page.sessionRefreshed(session)
+
+    def on_session_failed(self, error):
+        print(f"Could not restore the session: {error}")
+        self.token_refresher.stop()
+        self.showLogin()
+        self.show()
+
+def createWindow():
+    """ Theme and show the main window, the QApplication must already exist. """
+    applyTheme(THEME)
 
     window = MainApp()
     window.show()
+    afterPaint(window, lambda: firstFrame(window))
+    return window
+
+def firstFrame(window):
+    print(f"[Startup] First frame after {(time.perf_counter() - START_TIME) * 1000:.0f} ms")
+    # Then warm up the supabase client off the UI thread
+    runInBackground(window.supabase.load)
 
+def main():
+    app = QApplication(sys.argv)
+    window = createWindow()
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -1,16 +1,58 @@
 import webbrowser
-from flask import Flask, request, render_template
 import threading
 import os
+import sys
+import json
+from http.server import HTTPServer, BaseHTTPRequestHandler
 from dotenv import load_dotenv
-import pickle
-from werkzeug.serving import make_server
+from utils.session import token_store
 
 load_dotenv()
 
 SUPABASE_URL = os.getenv('SUPABASE_URL')
-REDIRECT_URI = os.getenv('REDIRECT_URI')
-TOKEN_PATH = os.getenv('TOKEN_PATH')
+# {port} is replaced with the port the callback listener was given by the OS
+REDIRECT_URI = os.getenv('REDIRECT_URI') or "http://localhost:{port}/callback"
+CALLBACK_PAGE = os.path.join(os.path.dirname(__file__), "templates", "index.html")
+
+class CallbackHandler(BaseHTTPRequestHandler):
+    """
+    ClassName : CallbackHandler
+    Description : Serves the page that reads the tokens from the redirect
+    fragment, then receives them in a single POST.
+    """
+    def do_GET(self):
+        if self.path.split("?")[0] != "/callback":
+            self.reply(404, b"Not found", "text/plain")
+            return
+        with open(CALLBACK_PAGE, "rb") as file:
+            self.reply(200, file.read(), "text/html; charset=utf-8")
+
+    def do_POST(self):
+        if self.path != "/receive_token":
+            self.reply(404, b"Not found", "text/plain")
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            data = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            data = {}
+
+        if data.get('access_token') and data.get('refresh_token'):
+            # Respond to the client before shutting down the server
+            self.reply(200, json.dumps({"message": "Token received successfully"}).encode(), "application/json")
+            self.server.manager.receive_token(data['access_token'], data['refresh_token'])
+        else:
+            self.reply(400, json.dumps({"message": "Token not received"}).encode(), "application/json")
+
+    def reply(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
 
 class AuthManager:
 
@@ -18,48 +60,95 @@ class AuthManager:
         self.callback = login_callback
         self.access_token = None
         self.refresh_token = None
-        self.app = Flask(__name__)
         self.server = None
+        self.redirect_uri = None
         self.loggedin = False
-        self.setup_routes()
-
-    def setup_routes(self):
-        @self.app.route('/callback', methods=['GET'])
-        def callback():
-            return render_template('index.html')
-
-        @self.app.route('/receive_token', methods=['POST'])
-        def receive_token():
-            data = request.get_json()
-            if data.get('access_token') and data.get('refresh_token'):
-                self.access_token = data['access_token']
-                self.refresh_token = data['refresh_token']
-                data_to_save = {'access_token': self.access_token, 'refresh_token': self.refresh_token}
-                with open(TOKEN_PATH, "wb") as file:
-                    pickle.dump(data_to_save, file)
-                    self.loggedin = True
-                
-                # Respond to the client before shutting down the server
-                response = {"message": "Token received successfully"}
-                shutdown_thread = threading.Thread(target=self.stop_server)
-                shutdown_thread.start()
-                return response
-            else:
-                response = {"message": "Token not received"}
-                return response, 400
+
+    def receive_token(self, access_token: str, refresh_token: str):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        token_store.save(self.access_token, self.refresh_token)
+        self.loggedin = True
+        # shutdown() waits for serve_forever, which is running this request
+        threading.Thread(target=self.stop_server, daemon=True).start()
 
     def start_server(self):
-        self.server = make_server('127.0.0.1', 3000, self.app)
+        """ Listen on a port picked by the OS, so a busy port never blocks the login. """
+        self.server = HTTPServer(('127.0.0.1', 0), CallbackHandler)
+        self.server.manager = self
+        self.redirect_uri = REDIRECT_URI.format(port=self.server.server_address[1])
         self.server_thread = threading.Thread(target=self.server.serve_forever)
         self.server_thread.daemon = True
         self.server_thread.start()
 
     def stop_server(self):
         if self.server:
-            self.server.shutdown()
+            server, self.server = self.server, None
+            server.shutdown()
+            server.server_close()
             self.callback(self.loggedin)
 
     def start_oauth_flow(self):
-        auth_url = f"{SUPABASE_URL}/auth/v1/authorize?provider=google&redirect_to={REDIRECT_URI}"
+        if self.server is None:
+            self.start_server()
+        auth_url = f"{SUPABASE_URL}/auth/v1/authorize?provider=google&redirect_to={self.redirect_uri}"
         webbrowser.open(auth_url)
-        self.start_server()
\ No newline at end of file
+
+def benchmark(runs: int = 20):
+    """
+    Milliseconds from starting the callback listener until it answers its
+    first request, for this listener and (if installed) the Flask one it
+    replaced, which also has to import flask and werkzeug first.
+    """
+    import time
+    import urllib.request
+
+    def measure(start, stop):
+        timings = []
+        for _ in range(runs):
+            begin = time.perf_counter()
+            port = start()
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/callback").read()
+            timings.append((time.perf_counter() - begin) * 1000)
+            stop()
+        return timings
+
+    manager = AuthManager(lambda loggedin: None)
+    def start_listener():
+        manager.start_server()
+        return manager.server.server_address[1]
+    def stop_listener():
+        manager.server.shutdown()
+        manager.server.server_close()
+        manager.server = None
+    results = {"http.server": measure(start_listener, stop_listener)}
+
+    begin = time.perf_counter()
+    try:
+        import flask
+        from werkzeug.serving import make_server
+    except ImportError:
+        flask = None
+    import_ms = (time.perf_counter() - begin) * 1000
+    if flask is not None:
+        servers = []
+        def start_flask():
+            app = flask.Flask(__name__)
+            app.add_url_rule('/callback', 'callback', lambda: flask.render_template('index.html'))
+            server = make_server('127.0.0.1', 0, app)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            servers.append(server)
+            return server.server_port
+        def stop_flask():
+            servers.pop().shutdown()
+        results["flask"] = measure(start_flask, stop_flask)
+        print(f"flask import {import_ms:7.2f} ms")
+
+    for name, timings in results.items():
+        print(f"{name:<12} first {timings[0]:7.2f} ms   median {sorted(timings)[len(timings) // 2]:7.2f} ms")
+    return results
+
+if __name__ == "__main__":
+    # python -m auth.Authorization benchmark
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark()
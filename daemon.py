@@ -0,0 +1,292 @@
+import os
+import sys
+import signal
+import socket
+import selectors
+import sqlite3
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from gui.Notification import Notification, NotificationDispatcher, reminderUrgency
+from utils.ipc import DAEMON_SOCKET, MessageBuffer, encode, isRunning, request
+from utils.recurrence import Recurrence
+from utils.report import Reports
+from utils.scheduler import ReminderHeap, nextFireTime, nextFireTimes
+from utils.store import TaskStore
+
+load_dotenv()
+
+ICON = os.getenv('ICON')
+NORMAL_NOTIFICATION_SOUND = os.getenv('NORMAL_NOTIFICATION_SOUND')
+NOTIFICATION_WINDOW = float(os.getenv('NOTIFICATION_WINDOW') or 2)
+NOTIFICATIONS_PER_MINUTE = int(os.getenv('NOTIFICATIONS_PER_MINUTE') or 6)
+TASKS_DB = os.getenv('TASKS_DB') or "tasks.db"
+# Seconds before retrying database work that failed, e.g. while the app holds the write lock
+RETRY_INTERVAL = 5
+
+class ReminderDaemon:
+    """
+    ClassName : ReminderDaemon
+    Description : Fires task reminders without Qt, supabase or a window.
+    Owns the schedule (a ReminderHeap over the task database) and sleeps in
+    one select call until the next reminder or a message from the GUI. The
+    GUI pushes task changes over a Unix-domain socket and is told about
+    every reminder that fires.
+    """
+    def __init__(self, db_path: str = TASKS_DB, socket_path: str = DAEMON_SOCKET):
+        self.socket_path = socket_path
+        self.store = TaskStore(db_path)
+        self.reports = Reports(self.store)
+        self.heap = ReminderHeap()
+        # Task id -> (title, description, time, Recurrence or None)
+        self.tasks = {}
+        # Snoozed task id -> the occurrence it was originally due at
+        self.snoozed = {}
+        # (task id, occurrence) of fired reminders not written to the reports yet
+        self.unrecorded = []
+        # Set when re-reading tasks failed, every task is re-read on the next tick
+        self.stale = False
+        self.dispatcher = None
+        self.selector = selectors.DefaultSelector()
+        self.clients = {}
+        self.server = None
+        self.running = False
+
+    def listen(self):
+        if os.path.exists(self.socket_path):
+            # Left behind by a daemon that did not exit cleanly
+            os.unlink(self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self.server.listen()
+        self.server.setblocking(False)
+        self.selector.register(self.server, selectors.EVENT_READ, self.accept)
+
+    def load(self):
+        """ Schedule every task in the database. """
+        self.heap.clear()
+        self.tasks.clear()
+        self.snoozed.clear()
+        rows = self.store.load()
+        rules = {}
+        for task_id, title, description, time, position, rule, _ in rows:
+            if rule not in rules:
+                rules[rule] = Recurrence.parse(rule)
+            self.tasks[task_id] = (title, description, time, position, rules[rule])
+        fire_times = nextFireTimes([row[6] for row in rows], [self.tasks[row[0]][4] for row in rows])
+        self.heap.pushAll((row[0], fire_at, row[4]) for row, fire_at in zip(rows, fire_times))
+
+    def refresh(self, task_ids):
+        """ Re-read tasks changed by the GUI, dropping deleted ones. """
+        for task_id in task_ids:
+            row = self.store.get(task_id)
+            self.snoozed.pop(task_id, None)
+            if row is None:
+                self.tasks.pop(task_id, None)
+                self.heap.remove(task_id)
+            else:
+                _, title, description, time, position, rule = row
+                self.schedule(task_id, title, description, time, position, rule)
+
+    def schedule(self, task_id: int, title: str, description: str, time: str, position: float, rule: str):
+        rule = Recurrence.parse(rule)
+        self.tasks[task_id] = (title, description, time, position, rule)
+        # Reminders due together are listed in the app's order
+        self.heap.push(task_id, nextFireTime(time, rule=rule), position)
+
+    def timeout(self):
+        """ Seconds until the next reminder or retry, None to wait for messages only. """
+        head = self.heap.peek()
+        wait = None if head is None else max(0.0, (head[0] - datetime.now()).total_seconds())
+        if self.unrecorded or self.stale:
+            wait = RETRY_INTERVAL if wait is None else min(wait, RETRY_INTERVAL)
+        return wait
+
+    def failed(self, error: sqlite3.Error):
+        """ Drop the failed transaction, what it was for is retried on a later tick. """
+        print(error)
+        self.store.connection.rollback()
+        self.store.dirty = False
+
+    def retry(self):
+        if self.stale:
+            try:
+                self.load()
+                self.stale = False
+            except sqlite3.Error as e:
+                self.failed(e)
+        if self.unrecorded:
+            self.record()
+
+    def fireDue(self):
+        now = datetime.now()
+        fired = False
+        for fire_at, task_id in self.heap.popDue(now):
+            title, description, time, position, rule = self.tasks[task_id]
+            # Recurring tasks go straight back in for their next occurrence, still in list order
+            self.heap.push(task_id, nextFireTime(time, now, rule), position)
+            scheduled_at = self.snoozed.pop(task_id, fire_at)
+            self.notify(task_id, title, description, reminderUrgency(scheduled_at, fire_at, now))
+            self.unrecorded.append((task_id, scheduled_at.timestamp()))
+            self.broadcast({"event": "fired", "id": task_id, "scheduled_at": scheduled_at.timestamp()})
+            fired = True
+        if fired:
+            self.record()
+
+    def record(self):
+        """ Write fired reminders to the reports; kept for the next tick if the database is locked. """
+        try:
+            for task_id, scheduled_at in self.unrecorded:
+                uid = self.store.uidOf(task_id)
+                if uid is not None:
+                    # Unless deleted while the database was locked
+                    self.reports.record(uid, "fired", scheduled_at)
+            self.store.flush()
+            self.unrecorded.clear()
+        except sqlite3.Error as e:
+            self.failed(e)
+
+    def notify(self, task_id: int, title: str, description: str, urgency: str = "normal"):
+        if self.dispatcher is None:
+            self.dispatcher = NotificationDispatcher(Notification(), NOTIFICATION_WINDOW, NOTIFICATIONS_PER_MINUTE)
+        self.dispatcher.submit(
+            title=title,
+            message=description,
+            urgency=urgency,
+            icon=ICON,
+            soundfilepath=NORMAL_NOTIFICATION_SOUND,
+            key=task_id
+        )
+
+    # Socket
+
+    def accept(self, server):
+        try:
+            client, _ = server.accept()
+        except BlockingIOError:
+            return
+        client.setblocking(False)
+        self.clients[client] = MessageBuffer()
+        self.selector.register(client, selectors.EVENT_READ, self.receive)
+
+    def receive(self, client):
+        try:
+            data = client.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self.disconnect(client)
+            return
+        for message in self.clients[client].feed(data):
+            try:
+                self.handle(client, message)
+            except (KeyError, TypeError, ValueError) as e:
+                print(e)
+            except sqlite3.Error as e:
+                # The changes it was about are picked up by re-reading everything
+                self.failed(e)
+                self.stale = True
+
+    def handle(self, client, message: dict):
+        op = message.get("op")
+        if op == "changed":
+            self.refresh(message["ids"])
+        elif op == "reload":
+            self.load()
+        elif op == "snooze":
+            task_id = message["id"]
+            if task_id in self.tasks:
+                self.snoozed[task_id] = datetime.fromtimestamp(message["scheduled_at"])
+                self.heap.push(task_id, datetime.now() + timedelta(minutes=message["minutes"]), self.tasks[task_id][3])
+        elif op == "skip":
+            task_id = message["id"]
+            if task_id in self.tasks:
+                _, _, time, position, rule = self.tasks[task_id]
+                self.snoozed.pop(task_id, None)
+                if self.dispatcher is not None:
+                    # Done in the app, its reminder is no longer needed on screen
+                    self.dispatcher.notification.closeNotification(task_id)
+                scheduled_at = datetime.fromtimestamp(message["scheduled_at"])
+                self.heap.push(task_id, nextFireTime(time, max(scheduled_at, datetime.now()), rule), position)
+        elif op == "status":
+            head = self.heap.peek()
+            self.send(client, {
+                "event": "status", "tasks": len(self.tasks), "pid": os.getpid(),
+                "next": head[0].timestamp() if head else None,
+            })
+        elif op == "stop":
+            self.running = False
+
+    def send(self, client, message: dict):
+        try:
+            client.sendall(encode(message))
+        except OSError:
+            # Not reading (or gone), it reconnects and resynchronises
+            self.disconnect(client)
+
+    def broadcast(self, message: dict):
+        for client in list(self.clients):
+            self.send(client, message)
+
+    def disconnect(self, client):
+        if self.clients.pop(client, None) is not None:
+            self.selector.unregister(client)
+            client.close()
+
+    def run(self):
+        self.listen()
+        self.load()
+        self.running = True
+        try:
+            while self.running:
+                for key, _ in self.selector.select(self.timeout()):
+                    key.data(key.fileobj)
+                self.retry()
+                self.fireDue()
+        finally:
+            self.close()
+
+    def close(self):
+        for client in list(self.clients):
+            self.disconnect(client)
+        if self.server is not None:
+            self.selector.unregister(self.server)
+            self.server.close()
+            self.server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        if self.dispatcher is not None:
+            # Deliver what is already queued
+            self.dispatcher.flush()
+            self.dispatcher.notification.wait()
+        self.store.close()
+
+def main():
+    # python daemon.py [status | stop]
+    command = sys.argv[1] if len(sys.argv) > 1 else "run"
+    if command in ("status", "stop"):
+        try:
+            reply = request({"op": command})
+        except OSError:
+            print("Reminder daemon is not running")
+            return 1
+        if reply:
+            next_at = datetime.fromtimestamp(reply["next"]).strftime("%Y-%m-%d %H:%M") if reply["next"] else "-"
+            print(f"pid {reply['pid']}   {reply['tasks']} tasks   next reminder {next_at}")
+        return 0
+
+    if isRunning():
+        print("Reminder daemon is already running")
+        return 0
+    # SIGTERM ends the loop like Ctrl+C, through the finally in run()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        ReminderDaemon().run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import time
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtNetwork import QLocalSocket
+from utils.ipc import DAEMON_SOCKET, MessageBuffer, encode, spawnDaemon
+
+# Seconds between attempts to reach the daemon while it is down
+RETRY_INTERVAL = 30
+# Milliseconds between attempts while a dropped link or a spawned daemon is coming back
+QUICK_RETRY_MS = 500
+# Seconds a spawned daemon gets to start listening
+SPAWN_WAIT = 5
+
+class DaemonLink(QObject):
+    """
+    ClassName : DaemonLink
+    Description : The GUI's connection to daemon.py over its Unix-domain
+    socket. Pushes task changes, receives `fired` events, and reports
+    whether the daemon is attached so the in-app scheduler can stand down.
+    It is reported detached the moment the link drops, however it drops.
+    With `spawn`, a daemon is started when none is running.
+    """
+    attached = pyqtSignal(bool)
+    fired = pyqtSignal(int, float)
+
+    def __init__(self, tasks_db: str, spawn: bool = True, path: str = DAEMON_SOCKET, parent=None):
+        super().__init__(parent)
+        self.tasks_db = tasks_db
+        self.spawn = spawn
+        self.path = path
+        self.spawned = False
+        self.spawned_at = 0.0
+        self.linked = False
+        self.buffer = MessageBuffer()
+
+        self.socket = QLocalSocket(self)
+        self.socket.connected.connect(self.on_connected)
+        self.socket.stateChanged.connect(self.on_state_changed)
+        self.socket.errorOccurred.connect(self.on_error)
+        self.socket.readyRead.connect(self.on_ready_read)
+
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self.connect)
+
+    def isAttached(self):
+        return self.socket.state() == QLocalSocket.LocalSocketState.ConnectedState
+
+    def connect(self):
+        if self.socket.state() == QLocalSocket.LocalSocketState.UnconnectedState:
+            self.socket.connectToServer(self.path)
+
+    def close(self):
+        self.retry_timer.stop()
+        self.socket.stateChanged.disconnect(self.on_state_changed)
+        self.socket.abort()
+
+    def send(self, message: dict):
+        """ Returns False when the daemon is not attached. """
+        if not self.isAttached():
+            return False
+        self.socket.write(encode(message))
+        return True
+
+    def on_connected(self):
+        self.spawned = False
+        self.buffer = MessageBuffer()
+        self.linked = True
+        self.attached.emit(True)
+
+    def on_state_changed(self, state):
+        if state == QLocalSocket.LocalSocketState.UnconnectedState and self.linked:
+            # Reminders are the app's again until the daemon is back
+            self.linked = False
+            self.attached.emit(False)
+            if not self.retry_timer.isActive():
+                self.retry_timer.start(QUICK_RETRY_MS)
+
+    def on_error(self, error):
+        if self.socket.state() != QLocalSocket.LocalSocketState.UnconnectedState or self.linked:
+            # A drop, handled by on_state_changed
+            return
+        if self.spawn and not self.spawned:
+            # Not running (any more): start one and try again once it is listening
+            self.spawned = True
+            self.spawned_at = time.monotonic()
+            spawnDaemon(self.tasks_db)
+            self.retry_timer.start(QUICK_RETRY_MS)
+        elif self.spawned and time.monotonic() - self.spawned_at < SPAWN_WAIT:
+            self.retry_timer.start(QUICK_RETRY_MS)
+        elif not self.retry_timer.isActive():
+            self.retry_timer.start(RETRY_INTERVAL * 1000)
+
+    def on_ready_read(self):
+        for message in self.buffer.feed(bytes(self.socket.readAll())):
+            if message.get("event") == "fired":
+                self.fired.emit(message["id"], message["scheduled_at"])
@@ -1,14 +1,29 @@
+from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
-    QApplication, QToolBar, QStatusBar, QListWidget, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QSizePolicy, QLabel, QStackedWidget
+    QApplication, QToolBar, QStatusBar, QListWidget, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QSizePolicy, QLabel, QStackedWidget,
+    QMenu, QToolButton, QFileDialog, QProgressDialog
 )
 from ui.Picture import Logo
-from supabase import Client
-from ui.ScrollableWidget import OrderableList
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from supabase import Client
 from gui.ToDo import DailyTasks
+from gui.Report import TaskReport
+from ui.Theme import applyTheme
+from gui.Worker import runInBackground
+from utils.session import cachedUser
+
+TASK_FILES = "Task files (*.jsonl *.csv *.ics);;JSON Lines (*.jsonl);;CSV (*.csv);;iCalendar (*.ics)"
+
+def fetchUser(client:"Client"):
+    """ Runs off the UI thread: user name and avatar url. """
+    metadata = client.auth.get_user().user.user_metadata
+    return metadata.get('name'), metadata.get('avatar_url')
 
 class Dashboard(QWidget):
     
-    def __init__(self, client:Client, parent=None):
+    def __init__(self, client:"Client", parent=None):
         super().__init__(parent)
         self.supabase = client
         self.windowPosSize = (2020, 300, 880, 600)
@@ -42,17 +57,15 @@ class Dashboard(QWidget):
         self.stacked_widget = QStackedWidget(self)
         self.stacked_widget.setContentsMargins(0, 0, 0, 0)
 
-        dw = DailyTasks()
-        self.stacked_widget.addWidget(dw)
-        self.stacked_widget.addWidget(OrderableList("Task Reporting"))
+        self.daily_tasks = DailyTasks(self.supabase)
+        self.stacked_widget.addWidget(self.daily_tasks)
+        self.stacked_widget.addWidget(TaskReport(self.daily_tasks.reports))
 
         hbox = QHBoxLayout()
         hbox.addWidget(self.stacked_widget)
 
         self.main_content = QWidget()        
-        self.main_content.setStyleSheet("""
-            background-color: #121212;
-        """)
+        self.main_content.setObjectName("MainContent")
 
         self.main_content.setLayout(hbox)
         self.central_layout.addWidget(self.main_content)
@@ -65,26 +78,7 @@ class Dashboard(QWidget):
         self.left_sidebar.insertItem(0, "Edit Daily Tasks")
         self.left_sidebar.insertItem(1, "Report Tasks")
         self.left_sidebar.setCurrentRow(0)
-        self.left_sidebar.setStyleSheet("""
-            QListWidget {
-                background-color: #121212;
-                border-right: 2px solid #ffffff;
-                margin-right:2px;
-            }
-            QListWidget::item {
-                color: white;
-                padding: 10px;
-                border-bottom: 1px solid #303030;
-            }
-            QListWidget::item:selected {
-                background-color: #2c2c2c;
-                border-left: 4px solid #ff9800;
-                color: white;
-            }
-            QListWidget::item:hover {
-                background-color: #1a1a1a;
-            }
-        """)
+        self.left_sidebar.setObjectName("Sidebar")
 
         self.left_sidebar.currentRowChanged.connect(self.display)
         
@@ -101,58 +95,103 @@ class Dashboard(QWidget):
         # Add left-aligned actions
         taskbar.addAction("Menu")
         taskbar.addAction("Edit")
-        taskbar.addAction("Tools")
+        tools = taskbar.addAction("Tools")
+        tools_menu = QMenu(self)
+        tools_menu.addAction("Import tasks...", self.importTasks)
+        tools_menu.addAction("Export tasks...", self.exportTasks)
+        tools.setMenu(tools_menu)
+        taskbar.widgetForAction(tools).setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
         
         # Add a spacer to push subsequent items to the right
         spacer = QWidget()
         spacer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
         taskbar.addWidget(spacer)
 
-        user = self.supabase.auth.get_user().user
+        # Cached user for the first frame, refreshed once the session is restored
+        user = cachedUser()
 
-        label = QLabel()
-        label.setText(user.user_metadata['name'])
+        self.user_label = QLabel()
+        self.user_label.setText(user.get('name') or "")
 
         # Add right-aligned widget (e.g., logo)
-        url = user.user_metadata['avatar_url']
-        logo = Logo(url, [20, 20], is_url=True)
+        self.avatar = Logo(user.get('avatar_url'), [20, 20], is_url=True)
 
-        taskbar.addWidget(label)
-        taskbar.addWidget(logo)
+        taskbar.addWidget(self.user_label)
+        taskbar.addWidget(self.avatar)
 
-        # Style the toolbar
-        taskbar.setStyleSheet("""
-            QToolBar {
-                background-color: #121212;
-                border-top: 1px solid #585858;
-                border-bottom: 1px solid #585858;
-            }
-        """)
+        taskbar.setObjectName("Taskbar")
 
         # Add the taskbar to the main layout
         self.main_layout.addWidget(taskbar)
 
+    def sessionReady(self):
+        """ Called once the saved session is restored: start network work. """
+        self.daily_tasks.startSync()
+        runInBackground(fetchUser, self.supabase, on_result=self.setUser)
+
+    def sessionRefreshed(self, session):
+        """ New tokens are in place: retry anything that failed on the old ones. """
+        if session and session.user:
+            metadata = session.user.user_metadata
+            self.setUser((metadata.get('name'), metadata.get('avatar_url')))
+        if self.daily_tasks.sync:
+            self.daily_tasks.sync.kick()
+
+    def shutdown(self):
+        """ Stop the pages' background work before the dashboard is discarded. """
+        self.daily_tasks.shutdown()
+
+    def importTasks(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import tasks", "", TASK_FILES)
+        if not path:
+            return
+        importer = self.daily_tasks.import_tasks(path)
+        if importer is None:
+            self.status_bar.showMessage(f"\t\t\tCould not read {path}")
+            return
+
+        # The list keeps updating behind the dialog while chunks come in
+        progress = QProgressDialog("Importing tasks...", "Stop", 0, 1000, self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(importer.cancel)
+        importer.progress.connect(lambda fraction: progress.setValue(int(fraction * 1000)))
+
+        def finished(count, skipped):
+            progress.reset()
+            message = f"Imported {count} tasks" + (f", skipped {skipped} unreadable" if skipped else "")
+            self.status_bar.showMessage(f"\t\t\t{message}")
+        def failed(error):
+            progress.reset()
+            self.status_bar.showMessage(f"\t\t\tImport stopped: {error}")
+        importer.finished.connect(finished)
+        importer.failed.connect(failed)
+
+    def exportTasks(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export tasks", "tasks.jsonl", TASK_FILES)
+        if not path:
+            return
+        self.status_bar.showMessage("\t\t\tExporting tasks...")
+        self.daily_tasks.export_tasks(
+            path,
+            on_result=lambda count: self.status_bar.showMessage(f"\t\t\tExported {count} tasks"),
+            on_error=lambda error: self.status_bar.showMessage(f"\t\t\tExport failed: {error}")
+        )
+
+    def setUser(self, user):
+        name, avatar_url = user
+        self.user_label.setText(name or "")
+        if avatar_url:
+            self.avatar.setUrl(avatar_url)
+
     def createStatusbar(self):
         # Create a status bar at the bottom of the window
         self.status_bar = QStatusBar()
-        self.status_bar.setStyleSheet("""
-            QStatusBar {
-                background-color: #121212;
-                border-top : 1px solid #585858;
-            }
-        """)
+        self.status_bar.setObjectName("StatusBar")
         self.status_bar.setFixedHeight(25)
 
         button1 = QPushButton(".")
-        button1.setStyleSheet("""
-            QPushButton {
-                width : 5px;
-                height: 5px;
-                background-color: #4CAF50;
-                padding: 3px;
-                border-radius: 5px;
-            }
-        """)
+        button1.setObjectName("StatusIndicator")
 
         self.status_bar.addWidget(button1)
         self.status_bar.showMessage(f"\t\t\tReady")
@@ -167,6 +206,7 @@ class Dashboard(QWidget):
 if __name__ == "__main__":
     import sys
     app = QApplication(sys.argv)
+    applyTheme()
     window = Dashboard()
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
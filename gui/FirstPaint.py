@@ -0,0 +1,27 @@
+from PyQt6.QtCore import QEvent, QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+
+class PaintWatcher(QObject):
+    """
+    ClassName : PaintWatcher
+    Description : Calls `callback` once, right after `window` (or any
+    widget in it) has next been painted. A zero timer queued after show()
+    can run before the window is even exposed (xcb, wayland), a paint
+    event cannot. Watches the application's events only until then.
+    """
+    def __init__(self, window, callback):
+        super().__init__(window)
+        self.window = window
+        self.callback = callback
+        QApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and watched.isWidgetType() and watched.window() is self.window:
+            QApplication.instance().removeEventFilter(self)
+            # Queued behind the rest of the paint pass and the flush to the screen
+            QTimer.singleShot(0, self.callback)
+            self.deleteLater()
+        return False
+
+def afterPaint(window, callback):
+    return PaintWatcher(window, callback)
@@ -3,16 +3,15 @@ from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QPu
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import QSize, Qt
 from auth.Authorization import AuthManager
-import pickle
 import os
 from ui.Picture import LogoWithText
 from dotenv import load_dotenv
+from utils.session import token_store, restoreSession
 
 load_dotenv()
 
 SUPABASE_URL = os.getenv('SUPABASE_URL')  # Replace with your Supabase URL
 SUPABASE_API_KEY = os.getenv('SUPABASE_API_KEY')
-TOKEN_PATH = os.getenv('TOKEN_PATH')
 LOGO_PATH = os.getenv('ICON')
 GOOGLE_LOGO = os.getenv("GOOGLE_LOGO")
 
@@ -56,15 +55,11 @@ class Login(QWidget):
     def login(self):
         try:
             self.login_button.setText("Authentication in progress...")
-            if(os.path.exists(TOKEN_PATH)):
-                with open(TOKEN_PATH, "rb") as file:
-                    data  = pickle.load(file)
-                    if(data.get("access_token") and data.get("refresh_token")):
-                        self.auth_manager.access_token = data.get("access_token")
-                        self.auth_manager.refresh_token = data.get("refresh_token")
-                        self.supabase.auth.set_session(self.auth_manager.access_token , self.auth_manager.refresh_token)
-                    else:
-                        self.auth_manager.start_oauth_flow()
+            access_token, refresh_token = token_store.tokens()
+            if(access_token and refresh_token):
+                self.auth_manager.access_token = access_token
+                self.auth_manager.refresh_token = refresh_token
+                restoreSession(self.supabase)
             else:
                 self.auth_manager.start_oauth_flow()
         except Exception as e:
@@ -1,53 +1,462 @@
 import subprocess
 import os
+import shutil
+import sys
+import time
+import queue
+import heapq
+import itertools
+import threading
+from collections import OrderedDict, deque
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+
+from utils.lazy import lazyImport
 
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
-import pygame
+# Imported when the first sound plays
+pygame = lazyImport("pygame")
+
+try:
+    from jeepney import (
+        DBusAddress, DBusErrorResponse, HeaderFields, MessageType, message_bus, new_error, new_method_call,
+        new_method_return
+    )
+    from jeepney.wrappers import unwrap_msg
+    from jeepney.io.blocking import open_dbus_connection
+except ImportError:
+    open_dbus_connection = None
+    DBusErrorResponse = None
+
+URGENCY_LEVELS = {"low": 0, "normal": 1, "critical": 2}
+# Reminders firing this much later than their timer was due for (the
+# machine slept, the daemon was down) are stale
+LATE_REMINDER = timedelta(minutes=5)
+
+def reminderUrgency(scheduled_at: datetime, fire_at: datetime, now: datetime = None):
+    """
+    Urgency of a reminder for the occurrence due at `scheduled_at`, fired
+    by a timer due at `fire_at`: "critical" when it comes back from a
+    snooze, "low" when it is caught up late, else "normal".
+    """
+    now = now or datetime.now()
+    if now - fire_at > LATE_REMINDER:
+        return "low"
+    if fire_at > scheduled_at:
+        return "critical"
+    return "normal"
+
+class NotifySendBackend:
+    """
+    ClassName : NotifySendBackend
+    Description : Spawns one `notify-send` process per notification.
+    """
+    def notify(self, title: str, message: str, urgency: str, icon: str, timeout: int, replaces_id: int = 0):
+        command = [
+            "notify-send",
+            title,
+            message,
+            f"--urgency={urgency}",
+            f"--expire-time={timeout}",
+        ]
+        if icon:
+            command.extend(["--icon", icon])
+
+        subprocess.run(command, check=True)
+        return 0
+
+    def closeNotification(self, popup_id: int):
+        # notify-send cannot close what it showed
+        pass
+
+    def close(self):
+        pass
+
+class DBusBackend:
+    """
+    ClassName : DBusBackend
+    Description : Calls org.freedesktop.Notifications.Notify over a single
+    session-bus connection that stays open between notifications.
+    """
+    def __init__(self, bus: str = "SESSION", app_name: str = "RemindIt"):
+        if open_dbus_connection is None:
+            raise OSError("jeepney is not installed")
+
+        # `bus` is "SESSION" or a bus address, e.g. a private dbus-daemon
+        self.connection = open_dbus_connection(bus=bus)
+        self.app_name = app_name
+        self.address = DBusAddress(
+            "/org/freedesktop/Notifications",
+            bus_name="org.freedesktop.Notifications",
+            interface="org.freedesktop.Notifications",
+        )
+
+    def notify(self, title: str, message: str, urgency: str, icon: str, timeout: int, replaces_id: int = 0):
+        hints = {"urgency": ("y", URGENCY_LEVELS.get(urgency, 1))}
+        msg = new_method_call(self.address, "Notify", "susssasa{sv}i", (
+            self.app_name, replaces_id, icon or "", title, message, [], hints, timeout
+        ))
+        reply = self.connection.send_and_get_reply(msg, timeout=5)
+        # Raises DBusErrorResponse for error replies, e.g. no notification server
+        return unwrap_msg(reply)[0]
+
+    def closeNotification(self, popup_id: int):
+        msg = new_method_call(self.address, "CloseNotification", "u", (popup_id,))
+        unwrap_msg(self.connection.send_and_get_reply(msg, timeout=5))
+
+    def close(self):
+        self.connection.close()
 
 class Notification:
     """
     ClassName : Notification
     Description : The class is used to send notifications on the Linux UI (Ubuntu).
+    Notifications are handed to a worker thread so callers (the Qt event loop)
+    never wait on `notify-send` or on the alert sound.
     """
-    def __init__(self):
-        pygame.mixer.init()
+    def __init__(self, cache_size: int = 16, channels: int = 8, bus: str = "SESSION"):
+        self.channels = channels
+        self.mixer_ready = False
+
+        # Connected lazily on the worker thread, notify-send when unavailable
+        self.bus = bus
+        self.backend = None
+        self.fallback = NotifySendBackend()
+        # Popup ids per caller key, so an update replaces the shown popup
+        self.popup_ids = {}
 
-    def sendNotification(self, title: str, message: str, urgency: str = "normal", icon: str = None, timeout: int = 5000, soundfilepath: str = None):
+        # Decoded sounds keyed by file path, least recently used first
+        self.sounds = OrderedDict()
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+
+        self.queue = queue.Queue()
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def sendNotification(self, title: str, message: str, urgency: str = "normal", icon: str = None, timeout: int = 5000, soundfilepath: str = None, key=None):
         """
-        Send a notification using `notify-send`.
+        Queue a notification and return immediately.
 
         :param title: Title of the notification.
         :param message: Message content.
         :param urgency: Urgency level ('low', 'normal', 'critical').
         :param icon: Path to the notification icon (optional).
         :param timeout: Time (in milliseconds) the notification is displayed.
+        :param soundfilepath: Alert sound played with the notification (optional).
+        :param key: Notifications sent with the same key replace each other (optional).
         """
-        command = [
-            "notify-send",
-            title,
-            message,
-            f"--urgency={urgency}",
-            f"--expire-time={timeout}",
-        ]
-        if icon:
-            command.extend(["--icon", icon])
+        self.queue.put(((title, message, urgency, icon, timeout), soundfilepath, key))
 
-        subprocess.run(command, check=True)
+    def closeNotification(self, key):
+        """ Queue closing the popup last shown for `key`, e.g. once its task is done. """
+        self.queue.put((None, None, key))
+
+    def preloadSound(self, soundfilepath: str):
+        """ Decode a sound ahead of the first notification that uses it. """
+        self.getSound(soundfilepath)
+
+    def initMixer(self):
+        with self.lock:
+            if not self.mixer_ready:
+                pygame.mixer.init()
+                pygame.mixer.set_num_channels(self.channels)
+                self.mixer_ready = True
+
+    def getSound(self, soundfilepath: str):
+        self.initMixer()
+        with self.lock:
+            sound = self.sounds.get(soundfilepath)
+            if sound is not None:
+                self.sounds.move_to_end(soundfilepath)
+                return sound
+
+        sound = pygame.mixer.Sound(soundfilepath)
+
+        with self.lock:
+            self.sounds[soundfilepath] = sound
+            while len(self.sounds) > self.cache_size:
+                self.sounds.popitem(last=False)
+        return sound
+
+    def playSound(self, soundfilepath: str):
+        sound = self.getSound(soundfilepath)
+        channel = pygame.mixer.find_channel()
+        if channel:
+            # Free channel, overlap with whatever is already playing
+            channel.play(sound)
+        else:
+            pygame.mixer.Channel(0).queue(sound)
+
+    def getBackend(self):
+        if self.backend is None:
+            try:
+                self.backend = DBusBackend(self.bus)
+            except (OSError, KeyError, ValueError) as e:
+                print(f"D-Bus notifications unavailable, using notify-send: {e}")
+                self.backend = self.fallback
+        return self.backend
+
+    def deliver(self, args, key=None):
+        backend = self.getBackend()
+        try:
+            popup_id = backend.notify(*args, replaces_id=self.popup_ids.get(key, 0))
+        except Exception as e:
+            if backend is self.fallback:
+                raise
+            print(e)
+            if not isinstance(e, DBusErrorResponse):
+                # Connection dropped, reconnect on the next notification
+                backend.close()
+                self.backend = None
+            popup_id = self.fallback.notify(*args)
+
+        if key is not None and popup_id:
+            self.popup_ids[key] = popup_id
+        return popup_id
+
+    def withdraw(self, key):
+        popup_id = self.popup_ids.pop(key, None)
+        if popup_id:
+            self.getBackend().closeNotification(popup_id)
+
+    def run(self):
+        while True:
+            args, soundfilepath, key = self.queue.get()
+            try:
+                if args is None:
+                    # Queued by closeNotification
+                    self.withdraw(key)
+                    continue
+                self.deliver(args, key)
+                if soundfilepath:
+                    self.playSound(soundfilepath)
+            except Exception as e:
+                # Includes pygame.error, without importing pygame to match it;
+                # the worker has to outlive any one notification
+                print(f"Notification failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def wait(self):
+        """ Block until every queued notification has been dispatched. """
+        self.queue.join()
+
+class NotificationDispatcher:
+    """
+    ClassName : NotificationDispatcher
+    Description : Coalesces reminders that arrive within `window` seconds into
+    one digest notification with a single alert sound. Pending reminders are
+    ordered by urgency and at most `max_per_minute` popups are shown.
+    """
+    def __init__(self, notification: Notification, window: float = 2.0, max_per_minute: int = 6, max_lines: int = 8):
+        self.notification = notification
+        self.window = window
+        self.max_per_minute = max_per_minute
+        self.max_lines = max_lines
+
+        self.pending = []
+        self.counter = itertools.count()
+        self.sent = deque()
+        self.lock = threading.Lock()
+        self.timer = None
+
+    def submit(self, title: str, message: str, urgency: str = "normal", icon: str = None, soundfilepath: str = None, key=None):
+        """ Queue a reminder for the next digest. """
+        rank = -URGENCY_LEVELS.get(urgency, 1)
+        with self.lock:
+            heapq.heappush(self.pending, (rank, next(self.counter), (title, message, urgency, icon, soundfilepath, key)))
+            if self.timer is None:
+                self.schedule(self.window)
+
+    def schedule(self, delay: float):
+        self.timer = threading.Timer(delay, self.flush)
+        self.timer.daemon = True
+        self.timer.start()
 
-        pygame.mixer.music.load(soundfilepath)
-        pygame.mixer.music.play()
+    def flush(self):
+        with self.lock:
+            self.timer = None
+            now = time.monotonic()
+            while self.sent and now - self.sent[0] >= 60:
+                self.sent.popleft()
 
-        while pygame.mixer.music.get_busy():
-            continue
+            if not self.pending:
+                return
+            if len(self.sent) >= self.max_per_minute:
+                # Over the cap, keep collecting until the oldest popup ages out
+                self.schedule(self.sent[0] + 60 - now)
+                return
+
+            items = [heapq.heappop(self.pending)[2] for _ in range(len(self.pending))]
+            self.sent.append(now)
+
+        self.sendDigest(items)
+
+    def sendDigest(self, items):
+        title, message, urgency, icon, soundfilepath, key = items[0]
+        if len(items) > 1:
+            lines = [f"{item[0]}: {item[1]}" for item in items[:self.max_lines]]
+            if len(items) > self.max_lines:
+                lines.append(f"...and {len(items) - self.max_lines} more")
+            title = f"{len(items)} reminders"
+            message = "\n".join(lines)
+            icon = next((item[3] for item in items if item[3]), None)
+            soundfilepath = next((item[4] for item in items if item[4]), None)
+            key = None
+
+        self.notification.sendNotification(
+            title=title,
+            message=message,
+            urgency=urgency,
+            icon=icon,
+            soundfilepath=soundfilepath,
+            key=key
+        )
+
+    def cancel(self):
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            self.pending.clear()
+
+class NotificationStandIn:
+    """
+    ClassName : NotificationStandIn
+    Description : Minimal org.freedesktop.Notifications service on a
+    private bus, so DBusBackend can be checked and benchmarked without a
+    desktop. Records Notify and CloseNotification calls; while `failing`
+    is set, Notify answers with a D-Bus error as a broken server would.
+    """
+    def __init__(self, address: str):
+        self.connection = open_dbus_connection(bus=address)
+        self.connection.send_and_get_reply(message_bus.RequestName("org.freedesktop.Notifications"), timeout=5)
+        self.ids = itertools.count(1)
+        self.notified = []
+        self.closed = []
+        self.failing = False
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                msg = self.connection.receive(timeout=0.2)
+            except TimeoutError:
+                continue
+            if msg.header.message_type != MessageType.method_call:
+                continue
+            member = msg.header.fields.get(HeaderFields.member)
+            if member == "Notify" and self.failing:
+                reply = new_error(msg, "org.freedesktop.DBus.Error.Failed", "s", ("Stand-in told to fail",))
+            elif member == "Notify":
+                _, replaces_id, _, title, message, _, hints, _ = msg.body
+                popup_id = replaces_id or next(self.ids)
+                self.notified.append((popup_id, title, message, hints["urgency"][1]))
+                reply = new_method_return(msg, "u", (popup_id,))
+            elif member == "CloseNotification":
+                self.closed.append(msg.body[0])
+                reply = new_method_return(msg)
+            else:
+                reply = new_error(msg, "org.freedesktop.DBus.Error.UnknownMethod")
+            self.connection.send(reply)
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        self.connection.close()
+
+@contextmanager
+def privateBus():
+    """ Address of a throwaway `dbus-daemon --session`, stopped on exit. """
+    daemon = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    try:
+        yield daemon.stdout.readline().strip()
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+def check(address: str):
+    """
+    Notify, replacing a popup, CloseNotification and the notify-send
+    fallback on a D-Bus error, against a stand-in on the bus at `address`.
+    """
+    stand_in = NotificationStandIn(address)
+    backend = DBusBackend(address)
+    try:
+        first = backend.notify("Reminder", "Stretch", "critical", None, 1000)
+        again = backend.notify("Reminder", "Stretch now", "critical", None, 1000, replaces_id=first)
+        assert again == first and stand_in.notified[-1] == (first, "Reminder", "Stretch now", 2)
+        backend.closeNotification(first)
+        assert stand_in.closed == [first]
+
+        class RecordingFallback(NotifySendBackend):
+            def __init__(self):
+                self.sent = []
+
+            def notify(self, title, message, urgency, icon, timeout, replaces_id=0):
+                self.sent.append(title)
+                return 0
+
+        notification = Notification(bus=address)
+        notification.fallback = RecordingFallback()
+        stand_in.failing = True
+        notification.sendNotification("Failing", "Error reply", key="task")
+        notification.wait()
+        assert notification.fallback.sent == ["Failing"] and notification.backend is not notification.fallback
+
+        stand_in.failing = False
+        notification.sendNotification("Working", "Shown over D-Bus", key="task")
+        notification.closeNotification("task")
+        notification.wait()
+        assert stand_in.notified[-1][1] == "Working" and stand_in.closed[-1] == stand_in.notified[-1][0]
+    finally:
+        backend.close()
+        stand_in.stop()
+
+def benchmark(backend, count: int = 200):
+    """ Notifications per second delivered by `backend`. """
+    start = time.perf_counter()
+    popup_id = 0
+    for i in range(count):
+        popup_id = backend.notify("Benchmark", f"Notification {i}", "low", None, 1, replaces_id=popup_id)
+    return count / (time.perf_counter() - start)
 
 # Example usage
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("benchmark", "check"):
+        # python -m gui.Notification benchmark|check [bus address], a private bus by default
+        with ExitStack() as stack:
+            if len(sys.argv) > 2:
+                bus = sys.argv[2]
+            else:
+                bus = stack.enter_context(privateBus())
+                if sys.argv[1] == "benchmark":
+                    stack.callback(NotificationStandIn(bus).stop)
+            if sys.argv[1] == "check":
+                check(bus)
+                print("Notify, CloseNotification and the notify-send fallback work")
+            else:
+                if shutil.which("notify-send"):
+                    print(f"notify-send : {benchmark(NotifySendBackend()):.1f} notifications/s")
+                print(f"D-Bus       : {benchmark(DBusBackend(bus)):.1f} notifications/s")
+        sys.exit(0)
+
     notification = Notification()
     notification.sendNotification(
-        title="Reminder", 
-        message="Time to take a break!", 
-        urgency="critical", 
+        title="Reminder",
+        message="Time to take a break!",
+        urgency="critical",
         icon="/home/rakesh/Desktop/Git Hub Projects/RemindIt/logo.png",
         soundfilepath="/home/rakesh/Desktop/Git Hub Projects/RemindIt/Normal.mp3",
         timeout=2000
-    )
\ No newline at end of file
+    )
+    notification.wait()
+    # Let the clip finish before the interpreter exits
+    while pygame.mixer.get_busy():
+        pygame.time.wait(100)
@@ -0,0 +1,55 @@
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+from gui.Worker import runInBackground
+from utils.session import token_store, refreshSession, TOKEN_REFRESH_MARGIN
+
+# Seconds before retrying a refresh that failed (offline, server error)
+RETRY_INTERVAL = 30
+
+class TokenRefresher(QObject):
+    """
+    ClassName : TokenRefresher
+    Description : Refreshes the session `margin` seconds before the access
+    token expires, on a worker thread, and publishes the new session through
+    `sessionRefreshed`. Only one refresh is in flight at a time.
+    """
+    sessionRefreshed = pyqtSignal(object)
+
+    def __init__(self, client, margin: float = TOKEN_REFRESH_MARGIN, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.margin = margin
+        self.worker = None
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+        self.timer.timeout.connect(self.refresh)
+
+    def start(self):
+        """ Arm the timer for the saved token, refreshing now if it is due. """
+        expires_in = token_store.expiresIn()
+        if expires_in is None:
+            return
+        self.schedule(expires_in - self.margin)
+
+    def schedule(self, delay: float):
+        self.timer.start(int(max(delay, 0) * 1000))
+
+    def refresh(self):
+        if self.worker is not None:
+            return
+        self.timer.stop()
+        self.worker = runInBackground(refreshSession, self.client, on_result=self.on_refreshed, on_error=self.on_failed)
+
+    def stop(self):
+        self.timer.stop()
+
+    def on_refreshed(self, session):
+        self.worker = None
+        self.sessionRefreshed.emit(session)
+        self.start()
+
+    def on_failed(self, error):
+        self.worker = None
+        print(f"Could not refresh the session: {error}")
+        self.schedule(RETRY_INTERVAL)
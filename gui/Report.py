@@ -0,0 +1,88 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (
+    QApplication, QAbstractItemView, QComboBox, QHBoxLayout, QHeaderView, QLabel, QTableWidget, QTableWidgetItem,
+    QVBoxLayout, QWidget
+)
+from ui.Theme import applyTheme
+
+PERIODS = {"Daily": "day", "Weekly": "week", "Monthly": "month"}
+COLUMNS = ("Period", "Fired", "Done", "Snoozed", "Completion", "Avg. lateness")
+
+class TaskReport(QWidget):
+    """
+    ClassName : TaskReport
+    Description : The "Report Tasks" page. Shows the rollups kept by a
+    Reports object for the chosen range, read when the page is shown or
+    the range changes; the event history itself is never scanned here.
+    Below them, how many reminders the current rules schedule this week.
+    """
+    def __init__(self, reports, parent=None):
+        super().__init__(parent)
+        self.reports = reports
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout()
+        self.main_layout.setSpacing(10)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+
+        # Header with the range picker
+        header = QHBoxLayout()
+        label = QLabel("Task Reporting", self)
+        label.setObjectName("PageHeader")
+        header.addWidget(label)
+        self.period_input = QComboBox(self)
+        self.period_input.addItems(PERIODS)
+        self.period_input.currentTextChanged.connect(self.refresh)
+        header.addWidget(self.period_input, alignment=Qt.AlignmentFlag.AlignRight)
+        self.main_layout.addLayout(header)
+
+        self.table = QTableWidget(0, len(COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.main_layout.addWidget(self.table)
+
+        self.streak_label = QLabel(self)
+        self.main_layout.addWidget(self.streak_label)
+        self.scheduled_label = QLabel(self)
+        self.main_layout.addWidget(self.scheduled_label)
+
+        self.setLayout(self.main_layout)
+        self.setObjectName("TaskReport")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def refresh(self):
+        rows = self.reports.rollups(PERIODS[self.period_input.currentText()])
+        self.table.setRowCount(len(rows))
+        for row, (label, fired, completed, snoozed, rate, lateness) in enumerate(rows):
+            values = (
+                label, str(fired), str(completed), str(snoozed),
+                "-" if rate is None else f"{rate:.0%}",
+                "-" if lateness is None else f"{lateness:.1f} min",
+            )
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+        streaks = self.reports.streaks().values()
+        current = max((current for current, _ in streaks), default=0)
+        best = max((best for _, best in streaks), default=0)
+        self.streak_label.setText(f"🔥 Longest current streak: {current}    🏆 Best streak: {best}")
+
+        scheduled = self.reports.scheduled(7)
+        self.scheduled_label.setText(f"📅 Scheduled today: {scheduled[0]}    Next 7 days: {sum(scheduled)}")
+
+if __name__ == "__main__":
+    from utils.store import TaskStore
+    from utils.report import Reports
+    app = QApplication([])
+    applyTheme()
+    w = TaskReport(Reports(TaskStore("tasks.db")))
+    w.setWindowTitle("Task Reporting")
+    w.resize(600, 400)
+    w.show()
+    app.exec()
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+from utils.scheduler import ReminderHeap, minutesOf, nextFireTime, nextFireTimes
+
+# QTimer intervals are signed 32-bit milliseconds (about 24.8 days)
+MAX_TIMER_MS = 2**31 - 1
+
+class ReminderScheduler(QObject):
+    """
+    ClassName : ReminderScheduler
+    Description : Fires reminders for daily tasks. All tasks share one
+    single-shot QTimer armed for the nearest deadline in a ReminderHeap.
+    `fired` carries the task, the time it was scheduled for, which stays
+    the same when a snoozed reminder comes back, and the time the timer
+    was due to fire. While `suspended` (the
+    reminder daemon fires them) the schedule is kept but never fires.
+    """
+    fired = pyqtSignal(object, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.heap = ReminderHeap()
+        self.armed_for = None
+        # Snoozed task -> the occurrence it was originally due at
+        self.snoozed = {}
+        self.suspended = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.onTimeout)
+
+    def schedule(self, task):
+        self.snoozed.pop(task, None)
+        self.heap.push(task, nextFireTime(task.time, rule=task.rule), task.position)
+        self.rearm()
+
+    def scheduleAll(self, tasks, minutes=None):
+        """
+        Schedule many tasks, building the heap in one pass and arming the
+        timer once. `minutes` are their times already parsed (the store's
+        column), in the same order.
+        """
+        if minutes is None:
+            minutes = [minutesOf(task.time) for task in tasks]
+        fire_times = nextFireTimes(minutes, [task.rule for task in tasks])
+        self.heap.pushAll((task, fire_at, task.position) for task, fire_at in zip(tasks, fire_times))
+        self.rearm()
+
+    def unschedule(self, task):
+        self.snoozed.pop(task, None)
+        self.heap.remove(task)
+        self.rearm()
+
+    def snooze(self, task, minutes: int, scheduled_at: datetime):
+        """ Fire the reminder for the occurrence due at `scheduled_at` again in `minutes`. """
+        self.snoozed[task] = scheduled_at
+        self.heap.push(task, datetime.now() + timedelta(minutes=minutes), task.position)
+        self.rearm()
+
+    def skip(self, task, scheduled_at: datetime):
+        """ The occurrence due at `scheduled_at` is done, wait for the one after it. """
+        self.snoozed.pop(task, None)
+        self.heap.push(task, nextFireTime(task.time, max(scheduled_at, datetime.now()), task.rule), task.position)
+        self.rearm()
+
+    def move(self, task):
+        """ Tasks due at the same minute fire in list order, `task.position` has changed. """
+        self.heap.reposition(task, task.position)
+        self.rearm()
+
+    def reorder(self, tasks):
+        """ Every task's position has changed (the list was renumbered). """
+        self.heap.reorder((task, task.position) for task in tasks)
+        self.rearm()
+
+    def suspend(self):
+        self.suspended = True
+        self.rearm()
+
+    def resume(self, tasks):
+        """ Fire reminders again, from now on: occurrences passed while suspended were the daemon's. """
+        self.suspended = False
+        self.snoozed.clear()
+        self.scheduleAll(tasks)
+
+    def rearm(self):
+        head = None if self.suspended else self.heap.peek()
+        if head is None:
+            self.timer.stop()
+            self.armed_for = None
+            return
+
+        fire_at = head[0]
+        if fire_at == self.armed_for and self.timer.isActive():
+            return
+
+        delay = int((fire_at - datetime.now()).total_seconds() * 1000)
+        self.armed_for = fire_at
+        # Reminders further off wake the timer early, which just re-arms it
+        self.timer.start(min(max(0, delay), MAX_TIMER_MS))
+
+    def onTimeout(self):
+        now = datetime.now()
+        self.armed_for = None
+        for fire_at, task in self.heap.popDue(now):
+            # Recurring tasks go straight back in for their next occurrence, still in list order
+            self.heap.push(task, nextFireTime(task.time, now, task.rule), task.position)
+            self.fired.emit(task, self.snoozed.pop(task, fire_at), fire_at)
+        self.rearm()
@@ -0,0 +1,44 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from utils.realtime import RealtimeListener, realtimeUrl
+from utils.sync import SyncEngine
+
+def accessToken(client):
+    session = client.auth.get_session()
+    return session.access_token if session else None
+
+class TaskSync(QObject):
+    """
+    ClassName : TaskSync
+    Description : Runs the SyncEngine in the background and reports tasks
+    changed by other devices through a queued Qt signal. With `realtime`,
+    other devices' changes are pushed over a websocket subscription instead
+    of waiting for the next pull.
+    """
+    tasksChanged = pyqtSignal(list)
+
+    def __init__(self, client, path: str, interval: float = 30, realtime: bool = True, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.engine = SyncEngine(client, path, on_change=self.tasksChanged.emit, interval=interval)
+        self.realtime = realtime
+        self.listener = None
+
+    def start(self):
+        self.engine.start()
+        if self.realtime:
+            # Reading the client's url builds it, the session is restored by now
+            self.listener = RealtimeListener(
+                realtimeUrl(self.client.supabase_url, self.client.supabase_key),
+                token=lambda: accessToken(self.client),
+                on_rows=self.engine.receive,
+                on_live=self.engine.setLive
+            )
+            self.listener.start()
+
+    def kick(self):
+        self.engine.kick()
+
+    def stop(self):
+        if self.listener:
+            self.listener.stop()
+        self.engine.stop()
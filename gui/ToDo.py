@@ -1,20 +1,83 @@
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtWidgets import (
-    QApplication, QScrollArea, QVBoxLayout, QWidget, QFrame, QLabel, QSpacerItem, QSizePolicy
+    QApplication, QVBoxLayout, QWidget, QLabel
 )
-from ui.Button import DragButton
+import bisect
+import os
+from datetime import datetime
+from dotenv import load_dotenv
 from ui.Input import Input
+from ui.Theme import applyTheme
+from ui.TaskList import Task, TaskModel, TaskListView, TaskEditDialog
+from gui.Scheduler import ReminderScheduler
+from gui.Notification import Notification, NotificationDispatcher, reminderUrgency
+from gui.Sync import TaskSync
+from gui.Transfer import TaskImporter
+from gui.Daemon import DaemonLink
+from gui.Worker import runInBackground
+from utils.store import TaskStore
+from utils.recurrence import Recurrence
+from utils.report import Reports
+from utils.scheduler import nextFireTime
+from utils.transfer import exportDatabase
+
+load_dotenv()
+
+ICON = os.getenv('ICON')
+NORMAL_NOTIFICATION_SOUND = os.getenv('NORMAL_NOTIFICATION_SOUND')
+NOTIFICATION_WINDOW = float(os.getenv('NOTIFICATION_WINDOW') or 2)
+NOTIFICATIONS_PER_MINUTE = int(os.getenv('NOTIFICATIONS_PER_MINUTE') or 6)
+TASKS_DB = os.getenv('TASKS_DB') or "tasks.db"
+SYNC_INTERVAL = float(os.getenv('SYNC_INTERVAL') or 30)
+REALTIME = (os.getenv('REALTIME') or "on") != "off"
+CHECKPOINT_INTERVAL = float(os.getenv('CHECKPOINT_INTERVAL') or 30)
+SNOOZE_MINUTES = 10
+# auto: hand reminders to daemon.py, starting it if needed; attach: only if it runs; off: fire them in the app
+REMINDER_DAEMON = os.getenv('REMINDER_DAEMON') or "auto"
 
 class DailyTasks(QWidget):
-    def __init__(self):
+    def __init__(self, client=None):
         super().__init__()
-        self.setAcceptDrops(True)
+
+        # One timer for every task's reminder
+        self.scheduler = ReminderScheduler(self)
+        self.scheduler.fired.connect(self.on_reminder)
+        self.dispatcher = None
+
+        # Writes are committed together shortly after the last change, the
+        # log they append to is folded into the database in the background
+        self.store = TaskStore(TASKS_DB, CHECKPOINT_INTERVAL)
+        self.commit_timer = QTimer(self)
+        self.commit_timer.setSingleShot(True)
+        self.commit_timer.timeout.connect(self.commit)
+        QApplication.instance().aboutToQuit.connect(self.store.flush)
+        self.tasks_by_id = {}
+
+        # Fired, completed and snoozed reminders, rolled up as they happen
+        self.reports = Reports(self.store)
+        # Task -> occurrence whose reminder fired and is not done yet
+        self.due = {}
+
         self.setup_ui()
-        
-        # Timer for auto-scrolling
-        self.scroll_timer = QTimer()
-        self.scroll_timer.timeout.connect(self.auto_scroll)
-        self.scroll_direction = 0  # -1 for up, 1 for down
+        self.load_tasks()
+
+        # Reminders fired by daemon.py keep working after the window closes;
+        # it is told which tasks changed once they are committed
+        self.daemon = None
+        self.daemon_ids = set()
+        self.daemon_reload = False
+        if REMINDER_DAEMON != "off":
+            self.daemon = DaemonLink(TASKS_DB, spawn=REMINDER_DAEMON == "auto", parent=self)
+            self.daemon.attached.connect(self.on_daemon_attached)
+            self.daemon.fired.connect(self.on_daemon_fired)
+            self.daemon.connect()
+
+        # Background sync with Supabase, the list never waits on it
+        self.sync = None
+        if client is not None:
+            self.sync = TaskSync(client, TASKS_DB, SYNC_INTERVAL, REALTIME, self)
+            self.sync.tasksChanged.connect(self.on_remote_changes)
+
         self.setMaximumWidth(800)
 
     def setup_ui(self):
@@ -25,229 +88,256 @@ class DailyTasks(QWidget):
 
         # Header
         label = QLabel("Your Daily To-Do List", self)
-        label.setStyleSheet("""
-            QLabel {
-                font-size: 24px;
-                font-weight: bold;
-                color: white;
-                margin-bottom: 20px;
-            }
-        """)
+        label.setObjectName("PageHeader")
         self.main_layout.addWidget(label)
 
-        # Scroll area
-        self.scroll_area = QScrollArea(self)
-        self.scroll_area.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QScrollBar:vertical {
-                width: 12px;
-            }
-            QScrollBar::handle:vertical {
-                background: #404040;
-                border-radius: 6px;
-                min-height: 30px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
-
-        container = QWidget()
-        container_layout = QVBoxLayout(container)
-        container_layout.setSpacing(10)
-        container_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        self.blayout = QVBoxLayout()
-        self.blayout.setSpacing(8)
-        self.blayout.setContentsMargins(0, 5, 0, 5)
-        self.blayout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        container_layout.addLayout(self.blayout)
+        # Task list, only the visible rows are painted
+        self.model = TaskModel(self)
+        self.list_view = TaskListView(self)
+        self.list_view.setModel(self.model)
+        self.list_view.doubleClicked.connect(self.edit_task)
+        self.list_view.taskMoved.connect(self.on_task_moved)
+        self.list_view.taskCompleted.connect(self.complete_task)
+        self.list_view.taskSnoozed.connect(self.snooze_task)
+        self.main_layout.addWidget(self.list_view)
 
         # Input area
-        input_container = Input(self.blayout)
-
-        container_layout.addWidget(input_container)
-
-        spacer = QSpacerItem(20, 40, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding)
-        container_layout.addItem(spacer)
+        input_container = Input()
+        input_container.taskAdded.connect(self.on_task_added)
+        self.main_layout.addWidget(input_container)
 
-        self.scroll_area.setWidget(container)
-        self.main_layout.addWidget(self.scroll_area)
         self.setLayout(self.main_layout)
 
-        # Placeholder for drag and drop
-        self.placeholder = QFrame()
-        self.placeholder.setFixedHeight(80)
-        self.placeholder.setStyleSheet("""
-            QFrame {
-                background-color: #2c2c2c;
-                border: 2px dashed #ff9800;
-                border-radius: 4px;
-                margin: 5px 0;
-            }
-        """)
-        self.placeholder.hide()
-
-        # Tracking variables
-        self.dragged_widget = None
-        self.last_insert_index = -1
-
-        # Set dark theme
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #121212;
-                color: white;
-            }
-        """)
-
-    def auto_scroll(self):
-        """Simplified auto-scroll function"""
-        if self.scroll_direction != 0:
-            scroll_bar = self.scroll_area.verticalScrollBar()
-            scroll_bar.setValue(scroll_bar.value() + (10 * self.scroll_direction))
-
-    def dragEnterEvent(self, e):
-        if isinstance(e.source(), DragButton):
-            self.dragged_widget = e.source()
-            e.accept()
-        else:
-            e.ignore()
-
-    def find_insert_position(self, pos):
-        """Find insertion position with improved stability"""
-        # Add hysteresis - only update position if mouse has moved significantly
-        HYSTERESIS = 30  # pixels of movement required before position change
-        
-        # If we have a last position, check if movement is significant
-        if hasattr(self, '_last_y') and abs(pos.y() - self._last_y) < HYSTERESIS:
-            return self.last_insert_index
-        
-        self._last_y = pos.y()
-        
-        # Calculate positions with dead zones
-        for i in range(self.blayout.count()):
-            widget = self.blayout.itemAt(i).widget()
-            if not widget or widget is self.placeholder:
+        self.setObjectName("DailyTasks")
+
+    def startSync(self):
+        """Start syncing once the session is authenticated"""
+        if self.sync and not self.sync.engine.running:
+            self.sync.start()
+
+    def load_tasks(self):
+        """Rebuild the list from the task store"""
+        rows = self.store.load()
+        # Most tasks share a handful of rules, or have none
+        rules = {}
+        for row in rows:
+            if row[5] not in rules:
+                rules[row[5]] = Recurrence.parse(row[5])
+        tasks = [Task(title, description, time, task_id, position, rules[rule])
+                 for task_id, title, description, time, position, rule, _ in rows]
+        self.tasks_by_id = {task.task_id: task for task in tasks}
+        self.model.setTasks(tasks)
+        self.scheduler.scheduleAll(tasks, [row[6] for row in rows])
+
+    def on_remote_changes(self, task_ids):
+        """Apply tasks changed on another device"""
+        for task_id in task_ids:
+            row = self.store.get(task_id)
+            task = self.tasks_by_id.get(task_id)
+            if task is not None:
+                self.model.removeTask(self.model.rowOf(task))
+            if row is None:
+                if task is not None:
+                    self.tasks_by_id.pop(task_id)
+                    self.due.pop(task, None)
+                    self.scheduler.unschedule(task)
                 continue
 
-            widget_pos = widget.mapToGlobal(widget.rect().topLeft())
-            widget_pos = self.mapFromGlobal(widget_pos)
-            widget_height = widget.height()
-            
-            # Create three zones: top (30%), middle (40%), bottom (30%)
-            top_zone = widget_pos.y() + (widget_height * 0.3)
-            bottom_zone = widget_pos.y() + (widget_height * 0.7)
-            
-            if pos.y() < top_zone:
-                return i
-            elif pos.y() < bottom_zone:
-                # Middle zone - maintain current position
-                return self.last_insert_index if self.last_insert_index != -1 else i
-
-        return self.blayout.count()
-
-    def dragMoveEvent(self, e):
-        if not self.dragged_widget:
-            return
-
-        pos = e.position()
-        source_index = self.blayout.indexOf(self.dragged_widget)
-        insert_index = self.find_insert_position(pos)
-
-        # Handle auto-scrolling
-        self.handle_auto_scroll(pos.y())
-
-        # Don't update if we're in the same position
-        if insert_index == self.last_insert_index and self.placeholder.isVisible():
-            e.accept()
-            return
-
-        # Always remove placeholder before inserting at new position
-        if self.placeholder.parent():
-            self.blayout.removeWidget(self.placeholder)
-
-        # Adjust insert index if needed
-        if insert_index > source_index:
-            insert_index -= 1
-
-        self.blayout.insertWidget(insert_index, self.placeholder)
-        self.placeholder.show()
-
-        self.last_insert_index = insert_index
-        e.accept()
-
-    def handle_auto_scroll(self, y_pos):
-        """Optimized auto-scroll detection"""
-        threshold = 40
-        
-        # Determine scroll direction
-        if y_pos < threshold:
-            self.scroll_direction = -1
-        elif y_pos > self.height() - threshold:
-            self.scroll_direction = 1
+            _, title, description, time, position, rule = row
+            if task is None:
+                task = Task(title, description, time, task_id)
+                self.tasks_by_id[task_id] = task
+            task.title, task.description, task.time, task.position = title, description, time, position
+            task.rule = Recurrence.parse(rule)
+            self.scheduler.schedule(task)
+
+            index = bisect.bisect_left(self.model.tasks, position, key=lambda t: t.position)
+            self.model.insertTask(index, task)
+        # Already committed by the sync engine
+        self.tell_daemon({"op": "changed", "ids": list(task_ids)})
+        # On screen now, completes the engine's edit-to-UI latency sample
+        self.sync.engine.applied()
+
+    def edit_task(self, index):
+        task = self.model.task(index.row())
+        dialog = TaskEditDialog(task, self)
+        dialog.exec()
+
+        if dialog.action == "save":
+            task.title, task.description, task.time = dialog.values()
+            self.model.updateTask(self.model.rowOf(task))
+            self.on_task_changed(task)
+        elif dialog.action == "delete":
+            self.model.removeTask(self.model.rowOf(task))
+            self.on_task_deleted(task)
+
+    def on_task_added(self, task):
+        task.task_id, task.position = self.store.add(task.title, task.description, task.time, rule=task.rule and str(task.rule))
+        self.tasks_by_id[task.task_id] = task
+        self.model.appendTask(task)
+        self.list_view.scrollToBottom()
+        self.scheduler.schedule(task)
+        self.daemon_ids.add(task.task_id)
+        self.save()
+
+    def on_task_changed(self, task):
+        self.store.update(task.task_id, task.title, task.description, task.time, task.rule and str(task.rule))
+        self.scheduler.schedule(task)
+        self.daemon_ids.add(task.task_id)
+        self.save()
+
+    def on_task_deleted(self, task):
+        self.tasks_by_id.pop(task.task_id, None)
+        self.due.pop(task, None)
+        self.store.delete(task.task_id)
+        self.scheduler.unschedule(task)
+        self.daemon_ids.add(task.task_id)
+        self.save()
+
+    def on_task_moved(self, row):
+        tasks = self.model.tasks
+        task = tasks[row]
+        before = tasks[row - 1].position if row > 0 else None
+        after = tasks[row + 1].position if row + 1 < len(tasks) else None
+
+        position = self.store.move(task.task_id, before, after)
+        if position is None:
+            # Neighbouring positions ran out of precision, renumber the list
+            self.store.renumber([t.task_id for t in tasks])
+            for i, t in enumerate(tasks):
+                t.position = i + 1.0
+            self.scheduler.reorder(tasks)
         else:
-            self.scroll_direction = 0
-
-        # Simplified timer management
-        if self.scroll_direction != 0:
-            if not self.scroll_timer.isActive():
-                self.scroll_timer.start(30)
-        else:
-            self.scroll_timer.stop()
-
-    def dropEvent(self, e):
-        if not isinstance(e.source(), DragButton):
-            e.ignore()
+            task.position = position
+            self.scheduler.move(task)
+        self.save()
+
+    def import_tasks(self, path):
+        """Append the tasks of a JSONL, CSV or iCalendar file, a chunk per timer tick. Returns the running TaskImporter."""
+        try:
+            importer = TaskImporter(path, self)
+        except (OSError, ValueError) as e:
+            print(e)
+            return None
+        importer.chunkRead.connect(self.on_tasks_imported)
+        importer.start()
+        return importer
+
+    def on_tasks_imported(self, records):
+        added = self.store.addMany(records)
+        # Imported files tend to repeat a handful of rules
+        rules = {}
+        tasks = []
+        for (title, description, time, rule), (task_id, position) in zip(records, added):
+            if rule not in rules:
+                rules[rule] = Recurrence.parse(rule)
+            tasks.append(Task(title, description, time, task_id, position, rules[rule]))
+        self.tasks_by_id.update((task.task_id, task) for task in tasks)
+        self.model.appendTasks(tasks)
+        self.scheduler.scheduleAll(tasks)
+        self.daemon_reload = True
+        # Committed chunk by chunk so the import never holds the write lock
+        # for long; the daemon and sync hear of it once it has settled
+        self.store.flush()
+        self.save()
+
+    def export_tasks(self, path, on_result=None, on_error=None):
+        """Write every task to `path` on a worker thread, `on_result` gets the count"""
+        self.commit_timer.stop()
+        self.commit()
+        return runInBackground(exportDatabase, TASKS_DB, path, on_result=on_result, on_error=on_error)
+
+    def complete_task(self, row):
+        """Mark the occurrence that fired done, or the upcoming one when completing early"""
+        task = self.model.task(row)
+        scheduled_at = self.due.pop(task, None) or nextFireTime(task.time, rule=task.rule)
+        if scheduled_at is None:
             return
-
-        source_widget = e.source()
-        source_index = self.blayout.indexOf(source_widget)
-        target_index = self.blayout.indexOf(self.placeholder)
-
-        if source_index == -1 or target_index == -1:
-            self.dragLeaveEvent(e)
-            e.ignore()
+        self.reports.record(self.store.uidOf(task.task_id), "completed", scheduled_at.timestamp())
+        if self.dispatcher is not None:
+            # Its reminder is no longer needed on screen
+            self.dispatcher.notification.closeNotification(id(task))
+        self.scheduler.skip(task, scheduled_at)
+        self.tell_daemon({"op": "skip", "id": task.task_id, "scheduled_at": scheduled_at.timestamp()})
+        self.save()
+
+    def snooze_task(self, row):
+        task = self.model.task(row)
+        scheduled_at = self.due.get(task)
+        if scheduled_at is None:
+            # Nothing has fired yet
             return
-
-        self.blayout.removeWidget(self.placeholder)
-        self.placeholder.hide()
-        self.blayout.removeWidget(source_widget)
-
-        if target_index > source_index:
-            target_index -= 1
-
-        self.blayout.insertWidget(target_index, source_widget)
-
-        # Stop scrolling when dropping
-        self.scroll_direction = 0
-        self.scroll_timer.stop()
-
-        self.dragged_widget = None
-        self.last_insert_index = -1
-        if hasattr(self, '_last_y'):
-            del self._last_y
-        e.accept()
-
-    def dragLeaveEvent(self, e):
-        """
-        Handle drag leave event without depending on position
-        """
-        # Simply clean up the placeholder
-        if self.placeholder.parent():
-            self.blayout.removeWidget(self.placeholder)
-        self.placeholder.hide()
-        self.last_insert_index = -1
-        if hasattr(self, '_last_y'):
-            del self._last_y
-        e.accept()
+        self.reports.record(self.store.uidOf(task.task_id), "snoozed", scheduled_at.timestamp())
+        self.scheduler.snooze(task, SNOOZE_MINUTES, scheduled_at)
+        self.tell_daemon({"op": "snooze", "id": task.task_id, "minutes": SNOOZE_MINUTES, "scheduled_at": scheduled_at.timestamp()})
+        self.save()
+
+    def save(self):
+        self.commit_timer.start(200)
+
+    def commit(self):
+        self.store.flush()
+        # The daemon reads the database, so it only hears of committed changes
+        if self.daemon_reload:
+            self.tell_daemon({"op": "reload"})
+        elif self.daemon_ids:
+            self.tell_daemon({"op": "changed", "ids": sorted(self.daemon_ids)})
+        self.daemon_reload = False
+        self.daemon_ids.clear()
+        if self.sync:
+            self.sync.kick()
+
+    def tell_daemon(self, message):
+        if self.daemon:
+            self.daemon.send(message)
+
+    def on_daemon_attached(self, attached):
+        if attached:
+            # The daemon fires the reminders from now on
+            self.scheduler.suspend()
+            self.tell_daemon({"op": "reload"})
+        else:
+            self.scheduler.resume(self.model.tasks)
+
+    def on_daemon_fired(self, task_id, scheduled_at):
+        # Already notified and recorded by the daemon, remembered so that it can be completed or snoozed here
+        task = self.tasks_by_id.get(task_id)
+        if task is not None:
+            self.due[task] = datetime.fromtimestamp(scheduled_at)
+
+    def shutdown(self):
+        """Commit pending writes and stop background work, the page is being discarded"""
+        self.commit_timer.stop()
+        self.scheduler.timer.stop()
+        if self.sync:
+            self.sync.stop()
+        if self.daemon:
+            self.daemon.close()
+        if self.dispatcher:
+            self.dispatcher.cancel()
+        QApplication.instance().aboutToQuit.disconnect(self.store.flush)
+        self.store.close()
+
+    def on_reminder(self, task, scheduled_at, fire_at):
+        self.due[task] = scheduled_at
+        self.reports.record(self.store.uidOf(task.task_id), "fired", scheduled_at.timestamp())
+        self.save()
+
+        if self.dispatcher is None:
+            self.dispatcher = NotificationDispatcher(Notification(), NOTIFICATION_WINDOW, NOTIFICATIONS_PER_MINUTE)
+        self.dispatcher.submit(
+            title=task.title,
+            message=task.description,
+            # Snoozed ones first in a digest, stale catch-ups last
+            urgency=reminderUrgency(scheduled_at, fire_at),
+            icon=ICON,
+            soundfilepath=NORMAL_NOTIFICATION_SOUND,
+            key=id(task)
+        )
 
 if __name__ == "__main__":
     app = QApplication([])
+    applyTheme()
     w = DailyTasks()
     w.setWindowTitle("To-Do List")
     w.resize(400, 600)
@@ -0,0 +1,62 @@
+import csv
+import time
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from utils.transfer import TaskReader
+
+# Tasks handed over per chunk, and the time a timer tick may spend on them
+CHUNK = 250
+SLICE_MS = 12
+
+class TaskImporter(QObject):
+    """
+    ClassName : TaskImporter
+    Description : Reads a task file in time slices on the UI thread. Each
+    QTimer tick streams chunks of CHUNK tasks out of the file for at most
+    SLICE_MS, then yields to the event loop, so the window keeps painting
+    and the progress can be shown. Only one chunk is held at a time.
+    """
+    chunkRead = pyqtSignal(list)
+    progress = pyqtSignal(float)
+    finished = pyqtSignal(int, int)
+    failed = pyqtSignal(object)
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent)
+        # Raises OSError or ValueError for unreadable files and unknown types
+        self.reader = TaskReader(path)
+        self.count = 0
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.step)
+
+    def start(self):
+        self.timer.start(0)
+
+    def step(self):
+        deadline = time.perf_counter() + SLICE_MS / 1000
+        try:
+            while time.perf_counter() < deadline:
+                chunk = self.reader.take(CHUNK)
+                if chunk:
+                    self.count += len(chunk)
+                    self.chunkRead.emit(chunk)
+                if len(chunk) < CHUNK:
+                    self.finish()
+                    return
+        except (ValueError, csv.Error) as e:
+            # Undecodable text or a broken file, unusable records are only skipped
+            self.timer.stop()
+            self.reader.close()
+            self.failed.emit(e)
+            return
+        self.progress.emit(self.reader.progress)
+
+    def finish(self):
+        self.timer.stop()
+        self.reader.close()
+        self.progress.emit(1.0)
+        self.finished.emit(self.count, self.reader.skipped)
+
+    def cancel(self):
+        """ Stop reading, the chunks already handed over stay imported. """
+        if self.timer.isActive():
+            self.finish()
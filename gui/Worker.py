@@ -0,0 +1,34 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+class WorkerSignals(QObject):
+    result = pyqtSignal(object)
+    error = pyqtSignal(object)
+
+class Worker(QRunnable):
+    """
+    ClassName : Worker
+    Description : Runs a blocking call on the global QThreadPool and hands
+    the result (or the exception) back to the UI thread through signals.
+    """
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(e)
+        else:
+            self.signals.result.emit(result)
+
+def runInBackground(fn, *args, on_result=None, on_error=None, **kwargs):
+    worker = Worker(fn, *args, **kwargs)
+    if on_result:
+        worker.signals.result.connect(on_result)
+    worker.signals.error.connect(on_error or print)
+    QThreadPool.globalInstance().start(worker)
+    return worker
@@ -1 +1,14 @@
-from .Notification import Notification
\ No newline at end of file
+import importlib
+
+# Imported on first use, so the Qt-free gui.Notification can be used without
+# loading PyQt6 (daemon.py)
+EXPORTS = {
+    "Notification": ".Notification",
+    "ReminderScheduler": ".Scheduler",
+    "TokenRefresher": ".Refresh",
+}
+
+def __getattr__(name):
+    if name in EXPORTS:
+        return getattr(importlib.import_module(EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
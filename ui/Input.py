@@ -1,17 +1,19 @@
-from PyQt6.QtCore import Qt, QTime
+from PyQt6.QtCore import Qt, QTime, pyqtSignal
 from PyQt6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QWidget, QLineEdit, QPushButton, QTimeEdit
 )
-import re
-from ui.Button import DragButton
-
-
-time_pattern = r"@([0]?[1-9]|1[0-2]):([0-5]?[0-9])\s([APap][Mm])"
+from ui.TaskList import Task
+from utils.timeparse import TimeParser
+from utils.recurrence import Recurrence
+from datetime import date, timedelta
 
 class Input(QWidget):
-    def __init__(self, blayout:QVBoxLayout):
+    taskAdded = pyqtSignal(object)
+
+    def __init__(self):
         super().__init__()
-        self.blayout = blayout
+        # Keeps its state between keystrokes, each one costs a single step
+        self.parser = TimeParser()
         self.setup_ui()
 
     def setup_ui(self):
@@ -25,7 +27,7 @@ class Input(QWidget):
         
         add_task_button = QPushButton("+\t\tAdd new task", self)
         add_task_button.setFixedSize(400, 40)
-        add_task_button.setStyleSheet(self.button_style())
+        add_task_button.setObjectName("InputButton")
         add_task_button.clicked.connect(self.toggle_input_visibility)
     
         add_task_layout.addWidget(add_task_button)
@@ -43,7 +45,7 @@ class Input(QWidget):
         self.title_input = QLineEdit(self)
         self.title_input.setPlaceholderText("Title")
         self.title_input.setFixedHeight(35)  # Smaller height
-        self.title_input.setStyleSheet(self.title_style())
+        self.title_input.setObjectName("TaskTitleInput")
         self.title_input.textChanged.connect(self.on_text_changed)
         self.container_layout.addWidget(self.title_input)
 
@@ -51,7 +53,7 @@ class Input(QWidget):
         self.description_input = QLineEdit(self)
         self.description_input.setPlaceholderText("Description")
         self.description_input.setFixedHeight(35)
-        self.description_input.setStyleSheet(self.input_style())
+        self.description_input.setObjectName("TaskDescriptionInput")
         self.container_layout.addWidget(self.description_input)
 
         # Schedule input
@@ -64,14 +66,14 @@ class Input(QWidget):
         self.schedule_input.setDisplayFormat("hh:mm AP")
         self.schedule_input.setFixedWidth(100)  # Limited width
         self.schedule_input.setFixedHeight(35)
-        self.schedule_input.setStyleSheet(self.schedule_style())
+        self.schedule_input.setObjectName("TaskScheduleInput")
         schedule_task_layout.addWidget(self.schedule_input, alignment=Qt.AlignmentFlag.AlignLeft)
 
         # Submit button
         self.submit_button = QPushButton("Add Task", self)
         self.submit_button.clicked.connect(self.addTask)
         self.submit_button.setFixedHeight(35)
-        self.submit_button.setStyleSheet(self.button_style())
+        self.submit_button.setObjectName("InputButton")
         schedule_task_layout.addWidget(self.submit_button, alignment=Qt.AlignmentFlag.AlignRight)
 
         self.container_layout.addWidget(schedule_task_container)
@@ -84,88 +86,36 @@ class Input(QWidget):
         self.container.setVisible(True)
         self.add_task_container.setVisible(False)
 
-    def title_style(self):
-        return """
-            QLineEdit {
-                background-color: #1a1a1a;
-                color: white;
-                font-size: 16px;
-                font:bold;
-                border: none;
-                padding: 8px;
-            }
-        """
-
-    def input_style(self):
-        return """
-            QLineEdit {
-                background-color: #1a1a1a;
-                color: white;
-                font-size: 14px;
-                border: none;
-                padding: 8px;
-            }
-        """
-
-    def schedule_style(self):
-        return """
-            QTimeEdit {
-                background-color: #1a1a1a;
-                color: white;
-                font-size: 14px;
-                padding: 5px;
-                border: none;
-            }
-            QTimeEdit::up-button, QTimeEdit::down-button {
-                width: 20px;
-                color: #ffffff;
-            }
-        """
-
-    def button_style(self):
-        return """
-            QPushButton {
-                padding : 10px;
-                background-color: #1a1a1a;
-                border: none;
-                color: white;
-                font-weight: bold;
-            }
-        """
-
     def on_text_changed(self, text):
         """Triggered whenever text in the QLineEdit changes."""
-        matches = re.findall(time_pattern, text)
-        if(matches):
-            hours, minutes, am_pm = matches[0]
-            hours = int(hours)
-            minutes = int(minutes)
-
-            # Convert to 24-hour format
-            if am_pm == "AM" or am_pm == "am":
-                if hours == 12:
-                    hours = 0 
-            elif am_pm == "PM" or am_pm == "pm":
-                if hours != 12:
-                    hours += 12
-
-            time = QTime(hours, minutes)
-            self.schedule_input.setTime(time)
-        else:
-            time = QTime(9, 0)
-            self.schedule_input.setTime(time)
+        self.parser.feed(text)
+        fire_at = self.parser.fireTime()
+        # Without a time in the title, the time picked by hand is kept
+        if fire_at is not None:
+            self.schedule_input.setTime(QTime(fire_at.hour, fire_at.minute))
+
+    def recurrence(self):
+        """Rule for "every mon and wed", "weekdays", "tomorrow" or "in 20 min" (once) in the title, None for a plain daily task."""
+        schedule = self.parser.schedule
+        if schedule.delta is not None:
+            # "in 20 min" is a one-off reminder, not a daily one
+            day = self.parser.fireTime().date()
+            return Recurrence(start=day, until=day)
+        weekdays = schedule.weekdays if schedule.weekdays and len(schedule.weekdays) < 7 else None
+        start = date.today() + timedelta(days=schedule.day) if schedule.day else None
+        if weekdays is None and start is None:
+            return None
+        return Recurrence("WEEKLY" if weekdays else "DAILY", weekdays=weekdays, start=start)
 
     def addTask(self):
-        title = self.title_input.text().strip()  
-        description = self.description_input.text().strip()  
+        description = self.description_input.text().strip()
         schedule = self.schedule_input.time().toString("hh:mm AP")
 
-        # Remove time pattern from title if present
-        title = re.sub(time_pattern, "", title).strip()
+        # Remove the schedule phrases from the title, offsets are into the raw text
+        title = self.parser.strip(self.title_input.text())
 
         if(title and description):
-            btn = DragButton(title, description, schedule)
-            self.blayout.addWidget(btn)
+            self.taskAdded.emit(Task(title, description, schedule, rule=self.recurrence()))
             self.title_input.clear()
             self.description_input.clear()
             self.schedule_input.clear()
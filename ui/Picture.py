@@ -1,8 +1,48 @@
 from PyQt6.QtWidgets import QLabel, QVBoxLayout, QWidget, QHBoxLayout
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtGui import QPixmap, QPixmapCache, QImage
 from PyQt6.QtCore import Qt
-from io import BytesIO
-import requests
+import os
+from dotenv import load_dotenv
+from gui.Worker import runInBackground
+from utils.imagecache import DiskImageCache
+
+load_dotenv()
+
+IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR') or os.path.join(os.path.expanduser("~"), ".cache", "remindit", "images")
+
+# Second tier behind QPixmapCache, shared by every Logo
+disk_cache = DiskImageCache(IMAGE_CACHE_DIR)
+
+def cachedPixmap(path: str):
+    """ Decode a local image once and reuse it from QPixmapCache. """
+    pixmap = QPixmapCache.find(path)
+    if pixmap is None:
+        pixmap = QPixmap(path)
+        QPixmapCache.insert(path, pixmap)
+    return pixmap
+
+def fetchImage(url: str):
+    """ Runs off the UI thread: bytes from the disk cache (or network), decoded. """
+    image = QImage()
+    data = disk_cache.get(url)
+    if data:
+        image.loadFromData(data)
+    return image
+
+def loadImage(url: str, callback):
+    """ Call `callback` with the pixmap for `url`, right away on a memory hit. """
+    pixmap = QPixmapCache.find(url)
+    if pixmap is not None:
+        callback(pixmap)
+        return
+
+    def on_image(image):
+        if image.isNull():
+            return
+        pixmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(url, pixmap)
+        callback(pixmap)
+    runInBackground(fetchImage, url, on_result=on_image)
 
 class LogoWithText(QWidget):
     def __init__(self, logo_path: str, text: str, size, parent=None):
@@ -17,16 +57,16 @@ class LogoWithText(QWidget):
 
         # Add the logo
         logo_label = QLabel(self)
-        logo_label.setPixmap(QPixmap(logo_path))
+        logo_label.setPixmap(cachedPixmap(logo_path))
         logo_label.setScaledContents(True)
         logo_label.setFixedSize(size[0], size[1])
         logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         logo_container.addWidget(logo_label)
-        
+
         # Add the text
         text_label = QLabel(text, self)
-        text_label.setStyleSheet("font-size: 16px; color: #ffffff;")
+        text_label.setObjectName("WelcomeText")
         text_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         layout.addLayout(logo_container)
@@ -44,25 +84,26 @@ class Logo(QWidget):
         layout = QVBoxLayout(self)
 
         # Add the logo
-        logo_label = QLabel(self)
+        self.logo_label = QLabel(self)
+        self.logo_label.setScaledContents(True)
+        self.logo_label.setFixedSize(size[0], size[1])
+        layout.addWidget(self.logo_label)
 
         # Load the logo (either from a file path or a URL)
-        pixmap = QPixmap()
-        if is_url:
-            # If the source is a URL, fetch the image data
-            response = requests.get(logo_source)
-            if response.status_code == 200:
-                image_data = BytesIO(response.content)
-                pixmap.loadFromData(image_data.read())
-        else:
+        self.url = None
+        if logo_source and is_url:
+            # Fetched and decoded in the background, then shown
+            self.setUrl(logo_source)
+        elif logo_source:
             # Otherwise, load from a local file path
-            pixmap.load(logo_source)
-
-        # Set the pixmap to the QLabel
-        logo_label.setPixmap(pixmap)
-        logo_label.setScaledContents(True)
-        logo_label.setFixedSize(size[0], size[1])
-        layout.addWidget(logo_label)
+            self.logo_label.setPixmap(cachedPixmap(logo_source))
 
         # Set the layout
-        self.setLayout(layout)
\ No newline at end of file
+        self.setLayout(layout)
+
+    def setUrl(self, url: str):
+        """ Show the image at `url` once it is available. """
+        if url == self.url:
+            return
+        self.url = url
+        loadImage(url, self.logo_label.setPixmap)
@@ -0,0 +1,357 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QMimeData, QRect, QSize, QTime, QTimer, pyqtSignal
+from PyQt6.QtGui import QFont, QIcon, QPainter, QPen
+from PyQt6.QtWidgets import (
+    QAbstractItemView, QDialog, QHBoxLayout, QLabel, QLineEdit, QListView, QMenu, QPushButton,
+    QStyle, QStyledItemDelegate, QTimeEdit, QVBoxLayout
+)
+from ui import Theme
+
+TaskRole = Qt.ItemDataRole.UserRole
+TASK_MIME_TYPE = "application/x-remindit-task-row"
+
+CARD_WIDTH = 550
+CARD_HEIGHT = 76
+CARD_SPACING = 8
+ROW_HEIGHT = CARD_HEIGHT + CARD_SPACING
+
+class Task:
+    """
+    ClassName : Task
+    Description : A recurring task as shown in the task list, daily
+    unless it has a Recurrence `rule`.
+    """
+    def __init__(self, title: str, description: str, time: str, task_id: int = None, position: float = None, rule=None):
+        self.title = title
+        self.description = description
+        self.time = time
+        self.rule = rule
+
+        # Row id and list position in the task store
+        self.task_id = task_id
+        self.position = position
+
+    def text(self):
+        repeat = f"  🔁 {self.rule.describe()}" if self.rule else ""
+        return f"📌 {self.title}\n📝 {self.description}\n⏰ {self.time}{repeat}"
+
+class TaskModel(QAbstractListModel):
+    """
+    ClassName : TaskModel
+    Description : List model holding every Task in display order.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tasks = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.tasks)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self.tasks[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return task.text()
+        if role == TaskRole:
+            return task
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def mimeTypes(self):
+        return [TASK_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        mime_data = QMimeData()
+        mime_data.setData(TASK_MIME_TYPE, str(indexes[0].row()).encode())
+        mime_data.setText(self.tasks[indexes[0].row()].title)
+        return mime_data
+
+    def setTasks(self, tasks):
+        self.beginResetModel()
+        self.tasks = list(tasks)
+        self.endResetModel()
+
+    def task(self, row: int):
+        return self.tasks[row]
+
+    def rowOf(self, task):
+        return self.tasks.index(task)
+
+    def insertTask(self, row: int, task: Task):
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.tasks.insert(row, task)
+        self.endInsertRows()
+
+    def appendTask(self, task: Task):
+        self.insertTask(len(self.tasks), task)
+
+    def appendTasks(self, tasks):
+        """ Append many tasks with a single insert notification. """
+        if not tasks:
+            return
+        row = len(self.tasks)
+        self.beginInsertRows(QModelIndex(), row, row + len(tasks) - 1)
+        self.tasks.extend(tasks)
+        self.endInsertRows()
+
+    def removeTask(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        task = self.tasks.pop(row)
+        self.endRemoveRows()
+        return task
+
+    def updateTask(self, row: int):
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def moveTask(self, source: int, target: int):
+        """
+        Move the task at `source` so it lands before the task currently at
+        `target`. Returns the task's new row, or None if nothing moved.
+        """
+        if target in (source, source + 1):
+            return None
+        self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), target)
+        task = self.tasks.pop(source)
+        row = target - 1 if target > source else target
+        self.tasks.insert(row, task)
+        self.endMoveRows()
+        return row
+
+class TaskDelegate(QStyledItemDelegate):
+    """
+    ClassName : TaskDelegate
+    Description : Paints each task as a card, so rows cost no widgets.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.font = QFont()
+        self.font.setPixelSize(14)
+
+    def sizeHint(self, option, index):
+        return QSize(CARD_WIDTH, ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        task = index.data(TaskRole)
+        hovered = option.state & QStyle.StateFlag.State_MouseOver
+
+        width = min(CARD_WIDTH, option.rect.width())
+        left = option.rect.left() + (option.rect.width() - width) // 2
+        card = QRect(left, option.rect.top() + CARD_SPACING // 2, width, CARD_HEIGHT)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(Theme.color("card_border_hover" if hovered else "card_border")))
+        painter.setBrush(Theme.color("card_hover" if hovered else "card"))
+        painter.drawRoundedRect(card, 6, 6)
+
+        painter.setPen(Theme.color("text"))
+        painter.setFont(self.font)
+        painter.drawText(card.adjusted(12, 6, -12, -6), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, task.text())
+        painter.restore()
+
+class TaskListView(QListView):
+    """
+    ClassName : TaskListView
+    Description : Virtualized view over a TaskModel; only visible rows are
+    painted. Supports drag-and-drop reordering with auto-scroll.
+
+    Drag moves are coalesced to one drop-target update per display frame.
+    Rows all have the same height, so the target row is plain arithmetic
+    and only the old and new drop-indicator strips are repainted.
+    """
+    taskMoved = pyqtSignal(int)
+    taskCompleted = pyqtSignal(int)
+    taskSnoozed = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setItemDelegate(TaskDelegate(self))
+        self.setUniformItemSizes(True)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setDragEnabled(True)
+        self.setAcceptDrops(True)
+        self.setDropIndicatorShown(False)
+        self.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+        self.setDefaultDropAction(Qt.DropAction.MoveAction)
+        self.setAutoScroll(True)
+        self.setAutoScrollMargin(40)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WidgetAttribute.WA_Hover)
+
+        # Drop target tracking
+        self.drop_row = None
+        self.drag_pos = None
+        self.drag_timer = QTimer(self)
+        self.drag_timer.setSingleShot(True)
+        self.drag_timer.timeout.connect(self.updateDropRow)
+        self.verticalScrollBar().valueChanged.connect(self.scheduleDropUpdate)
+
+        self.setObjectName("TaskList")
+
+    def dropRow(self, pos):
+        """ Row the dragged task would be inserted before. """
+        y = pos.y() + self.verticalOffset()
+        return max(0, min(self.model().rowCount(), (y + ROW_HEIGHT // 2) // ROW_HEIGHT))
+
+    def indicatorRect(self, row):
+        y = row * ROW_HEIGHT - self.verticalOffset()
+        return QRect(0, y - 2, self.viewport().width(), 4)
+
+    def frameInterval(self):
+        screen = self.screen()
+        rate = screen.refreshRate() if screen else 60
+        return max(1, int(1000 / (rate or 60)))
+
+    def scheduleDropUpdate(self):
+        if self.drag_pos is not None and not self.drag_timer.isActive():
+            self.drag_timer.start(self.frameInterval())
+
+    def updateDropRow(self):
+        if self.drag_pos is None:
+            return
+        row = self.dropRow(self.drag_pos)
+        if row == self.drop_row:
+            return
+        if self.drop_row is not None:
+            self.viewport().update(self.indicatorRect(self.drop_row))
+        self.drop_row = row
+        self.viewport().update(self.indicatorRect(row))
+
+    def clearDropRow(self):
+        self.drag_timer.stop()
+        self.drag_pos = None
+        if self.drop_row is not None:
+            self.viewport().update(self.indicatorRect(self.drop_row))
+            self.drop_row = None
+
+    def dragMoveEvent(self, e):
+        if e.source() is not self or not e.mimeData().hasFormat(TASK_MIME_TYPE):
+            e.ignore()
+            return
+
+        pos = e.position().toPoint()
+        self.drag_pos = pos
+        self.scheduleDropUpdate()
+
+        margin = self.autoScrollMargin()
+        if pos.y() < margin or pos.y() > self.viewport().height() - margin:
+            self.startAutoScroll()
+        e.setDropAction(Qt.DropAction.MoveAction)
+        e.accept()
+
+    def dragLeaveEvent(self, e):
+        self.clearDropRow()
+        super().dragLeaveEvent(e)
+
+    def paintEvent(self, e):
+        super().paintEvent(e)
+        if self.drop_row is not None:
+            painter = QPainter(self.viewport())
+            painter.fillRect(self.indicatorRect(self.drop_row).adjusted(0, 1, 0, -1), Theme.color("accent"))
+            painter.end()
+
+    def dropEvent(self, e):
+        self.clearDropRow()
+        if e.source() is not self or not e.mimeData().hasFormat(TASK_MIME_TYPE):
+            e.ignore()
+            return
+
+        source = int(bytes(e.mimeData().data(TASK_MIME_TYPE)).decode())
+        target = self.dropRow(e.position().toPoint())
+        row = self.model().moveTask(source, target)
+
+        # The move is done here, so tell the drag not to remove the source row
+        e.setDropAction(Qt.DropAction.CopyAction)
+        e.accept()
+        self.stopAutoScroll()
+        self.setState(QAbstractItemView.State.NoState)
+
+        if row is not None:
+            self.setCurrentIndex(self.model().index(row))
+            self.taskMoved.emit(row)
+
+    def contextMenuEvent(self, e):
+        index = self.indexAt(e.pos())
+        if not index.isValid():
+            return
+        menu = QMenu(self)
+        done_action = menu.addAction("Mark done")
+        snooze_action = menu.addAction("Snooze 10 min")
+        action = menu.exec(e.globalPos())
+        if action is done_action:
+            self.taskCompleted.emit(index.row())
+        elif action is snooze_action:
+            self.taskSnoozed.emit(index.row())
+
+class TaskEditDialog(QDialog):
+    """
+    ClassName : TaskEditDialog
+    Description : Dialog to edit or delete a task. After `exec`, `action` is
+    "save", "delete" or None when cancelled.
+    """
+    def __init__(self, task: Task, parent=None):
+        super().__init__(parent)
+        self.action = None
+        self.setFixedWidth(500)
+        self.setWindowTitle("Edit Task")
+        layout = QVBoxLayout()
+
+        title_label = QLabel("Title:")
+        self.title_input = QLineEdit(task.title)
+        layout.addWidget(title_label)
+        layout.addWidget(self.title_input)
+
+        desc_label = QLabel("Description:")
+        self.desc_input = QLineEdit(task.description)
+        layout.addWidget(desc_label)
+        layout.addWidget(self.desc_input)
+
+        time_label = QLabel("Scheduled Time:")
+        self.time_input = QTimeEdit()
+        self.time_input.setDisplayFormat("hh:mm AP")
+        self.time_input.setTime(QTime.fromString(task.time, "hh:mm AP"))
+        layout.addWidget(time_label)
+        layout.addWidget(self.time_input)
+
+        button_layout = QHBoxLayout()
+
+        save_button = QPushButton("Save")
+        save_button.setFixedWidth(50)
+        save_button.setIcon(QIcon("/home/rakesh/Desktop/Git Hub Projects/RemindIt/public/edit_icon.png"))
+        save_button.setObjectName("SaveButton")
+        button_layout.addWidget(save_button)
+
+        delete_button = QPushButton("Delete")
+        delete_button.setFixedWidth(50)
+        delete_button.setIcon(QIcon("/home/rakesh/Desktop/Git Hub Projects/RemindIt/public/delete_icon.png"))
+        delete_button.setObjectName("DeleteButton")
+        button_layout.addWidget(delete_button)
+
+        cancel_button = QPushButton("Cancel")
+        cancel_button.setFixedWidth(50)
+        cancel_button.setObjectName("CancelButton")
+        button_layout.addWidget(cancel_button)
+
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        save_button.clicked.connect(lambda: self.finish("save"))
+        delete_button.clicked.connect(lambda: self.finish("delete"))
+        cancel_button.clicked.connect(self.reject)
+
+    def finish(self, action):
+        self.action = action
+        self.accept()
+
+    def values(self):
+        """ Edited (title, description, time). """
+        return self.title_input.text(), self.desc_input.text(), self.time_input.time().toString("hh:mm AP")
@@ -0,0 +1,225 @@
+from string import Template
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QApplication
+
+THEMES = {
+    "dark": {
+        "background": "#121212",
+        "surface": "#1a1a1a",
+        "card": "#1e1e1e",
+        "card_hover": "#2a2a2a",
+        "card_border": "#2c2c2c",
+        "card_border_hover": "#505050",
+        "selected": "#2c2c2c",
+        "separator": "#303030",
+        "frame": "#585858",
+        "scroll_handle": "#404040",
+        "text": "#ffffff",
+        "accent": "#ff9800",
+        "online": "#4CAF50",
+        "save": "#2e7d32",
+        "delete": "#c62828",
+        "cancel": "#616161",
+    },
+    "light": {
+        "background": "#f5f5f5",
+        "surface": "#ffffff",
+        "card": "#ffffff",
+        "card_hover": "#eeeeee",
+        "card_border": "#dddddd",
+        "card_border_hover": "#9e9e9e",
+        "selected": "#e0e0e0",
+        "separator": "#e0e0e0",
+        "frame": "#bdbdbd",
+        "scroll_handle": "#bdbdbd",
+        "text": "#212121",
+        "accent": "#ef6c00",
+        "online": "#388e3c",
+        "save": "#2e7d32",
+        "delete": "#c62828",
+        "cancel": "#757575",
+    },
+}
+
+# Widgets opt in by objectName, so the whole UI is parsed once per theme
+STYLESHEET = Template("""
+    #MainContent, #DailyTasks, #DailyTasks QWidget {
+        background-color: $background;
+        color: $text;
+    }
+    #PageHeader {
+        font-size: 24px;
+        font-weight: bold;
+        color: $text;
+        margin-bottom: 20px;
+    }
+    #WelcomeText {
+        font-size: 16px;
+        color: $text;
+    }
+
+    QListWidget#Sidebar {
+        background-color: $background;
+        border-right: 2px solid $text;
+        margin-right: 2px;
+    }
+    QListWidget#Sidebar::item {
+        color: $text;
+        padding: 10px;
+        border-bottom: 1px solid $separator;
+    }
+    QListWidget#Sidebar::item:selected {
+        background-color: $selected;
+        border-left: 4px solid $accent;
+        color: $text;
+    }
+    QListWidget#Sidebar::item:hover {
+        background-color: $surface;
+    }
+
+    QToolBar#Taskbar {
+        background-color: $background;
+        border-top: 1px solid $frame;
+        border-bottom: 1px solid $frame;
+    }
+    QStatusBar#StatusBar {
+        background-color: $background;
+        border-top: 1px solid $frame;
+    }
+    QPushButton#StatusIndicator {
+        width: 5px;
+        height: 5px;
+        background-color: $online;
+        padding: 3px;
+        border-radius: 5px;
+    }
+
+    QListView#TaskList {
+        border: none;
+        background-color: transparent;
+        outline: none;
+    }
+    QListView#TaskList QScrollBar:vertical {
+        width: 12px;
+    }
+    QListView#TaskList QScrollBar::handle:vertical {
+        background: $scroll_handle;
+        border-radius: 6px;
+        min-height: 30px;
+    }
+    QListView#TaskList QScrollBar::add-line:vertical, QListView#TaskList QScrollBar::sub-line:vertical {
+        height: 0px;
+    }
+
+    QLineEdit#TaskTitleInput, QLineEdit#TaskDescriptionInput {
+        background-color: $surface;
+        color: $text;
+        font-size: 14px;
+        border: none;
+        padding: 8px;
+    }
+    QLineEdit#TaskTitleInput {
+        font-size: 16px;
+        font-weight: bold;
+    }
+    QTimeEdit#TaskScheduleInput {
+        background-color: $surface;
+        color: $text;
+        font-size: 14px;
+        padding: 5px;
+        border: none;
+    }
+    QTimeEdit#TaskScheduleInput::up-button, QTimeEdit#TaskScheduleInput::down-button {
+        width: 20px;
+        color: $text;
+    }
+    QPushButton#InputButton {
+        padding: 10px;
+        background-color: $surface;
+        border: none;
+        color: $text;
+        font-weight: bold;
+    }
+
+    QPushButton#SaveButton, QPushButton#DeleteButton, QPushButton#CancelButton {
+        border: none;
+        padding: 6px;
+        color: white;
+        border-radius: 4px;
+        margin: 0 5px;
+    }
+    QPushButton#SaveButton {
+        background-color: $save;
+    }
+    QPushButton#DeleteButton {
+        background-color: $delete;
+    }
+    QPushButton#CancelButton {
+        background-color: $cancel;
+    }
+""")
+
+DEFAULT_THEME = "dark"
+current = DEFAULT_THEME
+
+def stylesheet(name: str):
+    return STYLESHEET.substitute(THEMES[name])
+
+def color(role: str):
+    """ QColor for a role of the active theme, for widgets that paint themselves. """
+    return QColor(THEMES[current][role])
+
+def applyTheme(name: str = DEFAULT_THEME, app: QApplication = None):
+    """ Switch the whole application to theme `name` with one stylesheet, the default one if unknown. """
+    global current
+    if name not in THEMES:
+        print(f"Unknown theme {name!r}, using {DEFAULT_THEME!r} (themes: {', '.join(THEMES)})")
+        name = DEFAULT_THEME
+    current = name
+    app = app or QApplication.instance()
+    app.setStyleSheet(stylesheet(name))
+
+def benchmark(count: int):
+    """
+    Seconds to create and show `count` styled buttons, first with a
+    stylesheet per widget and then styled through the application sheet.
+    """
+    import time
+    from PyQt6.QtWidgets import QPushButton, QVBoxLayout, QWidget
+
+    app = QApplication.instance()
+    per_widget = """
+        QPushButton {
+            padding: 10px;
+            background-color: #1a1a1a;
+            border: none;
+            color: white;
+            font-weight: bold;
+        }
+    """
+    results = []
+    for themed in (False, True):
+        app.setStyleSheet(stylesheet(current) if themed else "")
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        start = time.perf_counter()
+        for i in range(count):
+            button = QPushButton(f"Task {i}")
+            if themed:
+                button.setObjectName("InputButton")
+            else:
+                button.setStyleSheet(per_widget)
+            layout.addWidget(button)
+        container.show()
+        app.processEvents()
+        results.append(time.perf_counter() - start)
+        container.deleteLater()
+        app.processEvents()
+    return results
+
+if __name__ == "__main__":
+    import sys
+    app = QApplication(sys.argv)
+    for count in (1000, 10000):
+        before, after = benchmark(count)
+        print(f"{count:>6} widgets : per-widget {before * 1000:.0f} ms, theme {after * 1000:.0f} ms")
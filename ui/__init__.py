@@ -1,2 +1,2 @@
-from .Button import DragButton
+from .TaskList import Task, TaskModel, TaskListView
 from .Input import Input
\ No newline at end of file
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from utils.lazy import lazyImport
+
+requests = lazyImport("requests")
+
+class DiskImageCache:
+    """
+    ClassName : DiskImageCache
+    Description : Size-bounded on-disk LRU for downloaded images.
+    Entries younger than `max_age` seconds are used without touching the
+    network; older ones are revalidated with ETag / If-Modified-Since.
+    """
+    def __init__(self, directory: str, max_bytes: int = 20 * 1024 * 1024, max_age: int = 24 * 60 * 60):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def paths(self, url: str):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".img", base + ".json"
+
+    def get(self, url: str):
+        """ Image bytes for `url`, or None if it cannot be fetched. """
+        data_path, meta_path = self.paths(url)
+        meta = self.readMeta(meta_path)
+        cached = os.path.exists(data_path) and meta is not None
+
+        if cached and time.time() - meta.get("fetched_at", 0) < self.max_age:
+            return self.touch(data_path)
+
+        headers = {}
+        if cached and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if cached and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            response = requests.get(url, headers=headers, timeout=10)
+        except requests.RequestException as e:
+            print(e)
+            # Offline, a stale copy is better than none
+            return self.touch(data_path) if cached else None
+
+        if response.status_code == 304 and cached:
+            meta["fetched_at"] = time.time()
+            self.write(meta_path, json.dumps(meta).encode())
+            return self.touch(data_path)
+        if response.status_code != 200:
+            return self.touch(data_path) if cached else None
+
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        self.write(data_path, response.content)
+        self.write(meta_path, json.dumps(meta).encode())
+        self.evict()
+        return response.content
+
+    def readMeta(self, meta_path: str):
+        try:
+            with open(meta_path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def touch(self, data_path: str):
+        # Modification time doubles as the LRU timestamp
+        os.utime(data_path)
+        with open(data_path, "rb") as file:
+            return file.read()
+
+    def write(self, path: str, data: bytes):
+        # Write then rename, so readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """ Drop least recently used images until the cache fits in `max_bytes`. """
+        with self.lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith(".img"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                for victim in (path, path[:-len(".img")] + ".json"):
+                    try:
+                        os.remove(victim)
+                    except OSError:
+                        pass
+                total -= size
@@ -0,0 +1,66 @@
+"""
+Startup import budget check.
+
+Imports the app module under `python -X importtime`, prints the slowest
+modules and exits non-zero when the total import time exceeds the budget
+or a module that must stay lazy was imported.
+
+Usage: python -m utils.importtime [budget_ms] [module]
+"""
+import os
+import re
+import subprocess
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+IMPORT_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS') or 500)
+
+# Loaded on demand (first sound, after the first frame, reports, realtime sync)
+DEFERRED_MODULES = ("pygame", "supabase", "numpy", "websockets")
+
+LINE_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure(module: str = "app"):
+    """ [(module, self_us, cumulative_us, depth)] as reported by -X importtime. """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    timings = []
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return timings
+
+def check(budget_ms: float = IMPORT_BUDGET_MS, module: str = "app"):
+    timings = measure(module)
+    total_ms = sum(self_us for _, self_us, _, _ in timings) / 1000
+
+    print(f"{'module':<50} {'self ms':>9} {'cumulative ms':>14}")
+    for name, self_us, cumulative_us, depth in sorted(timings, key=lambda t: t[1], reverse=True)[:20]:
+        print(f"{name:<50} {self_us / 1000:>9.1f} {cumulative_us / 1000:>14.1f}")
+    print(f"\nTotal import time: {total_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+
+    failures = []
+    if total_ms > budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms exceeds the {budget_ms:.0f} ms budget")
+    imported = {name.split(".")[0] for name, _, _, _ in timings}
+    for name in DEFERRED_MODULES:
+        if name in imported:
+            failures.append(f"{name} is imported at startup but should load lazily")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return not failures
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_BUDGET_MS
+    module = sys.argv[2] if len(sys.argv) > 2 else "app"
+    sys.exit(0 if check(budget, module) else 1)
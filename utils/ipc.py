@@ -0,0 +1,85 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Unix-domain socket of the reminder daemon, private to the user
+DAEMON_SOCKET = os.getenv('DAEMON_SOCKET') or os.path.join(
+    os.getenv('XDG_RUNTIME_DIR') or tempfile.gettempdir(), f"remindit-{os.getuid()}.sock"
+)
+DAEMON_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "daemon.py")
+
+# Messages are JSON objects, one per line.
+#
+# GUI -> daemon
+#   {"op": "changed", "ids": [task id, ...]}   re-read these tasks from the database
+#   {"op": "reload"}                           re-read every task
+#   {"op": "snooze", "id": id, "minutes": m, "scheduled_at": epoch seconds}
+#   {"op": "skip", "id": id, "scheduled_at": epoch seconds}
+#   {"op": "status"}                           answered with a "status" event
+#   {"op": "stop"}
+# daemon -> GUI
+#   {"event": "fired", "id": id, "scheduled_at": epoch seconds}
+#   {"event": "status", "tasks": n, "next": epoch seconds or null, "pid": pid}
+
+def encode(message: dict):
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+class MessageBuffer:
+    """
+    ClassName : MessageBuffer
+    Description : Splits the bytes read from a socket into messages, keeping
+    a partial line until the rest of it arrives.
+    """
+    def __init__(self):
+        self.pending = b""
+
+    def feed(self, data: bytes):
+        lines = (self.pending + data).split(b"\n")
+        self.pending = lines.pop()
+        messages = []
+        for line in lines:
+            try:
+                messages.append(json.loads(line))
+            except ValueError as e:
+                print(e)
+        return messages
+
+def request(message: dict, path: str = DAEMON_SOCKET, timeout: float = 2):
+    """ Send one message to the daemon and return its first reply (None if the op has none). Raises OSError if it is not running. """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(encode(message))
+        if message.get("op") != "status":
+            return None
+        buffer = MessageBuffer()
+        while True:
+            data = client.recv(4096)
+            if not data:
+                return None
+            for reply in buffer.feed(data):
+                if reply.get("event") == message["op"]:
+                    return reply
+
+def isRunning(path: str = DAEMON_SOCKET):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(1)
+            client.connect(path)
+        return True
+    except OSError:
+        return False
+
+def spawnDaemon(tasks_db: str):
+    """ Start daemon.py detached from this process, so reminders outlive the GUI, on the same database. """
+    subprocess.Popen(
+        [sys.executable, DAEMON_SCRIPT],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True, env=dict(os.environ, TASKS_DB=os.path.abspath(tasks_db))
+    )
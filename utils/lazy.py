@@ -0,0 +1,44 @@
+import importlib
+import threading
+
+class LazyModule:
+    """
+    ClassName : LazyModule
+    Description : Stand-in for a module that is imported on first attribute
+    access, keeping heavy dependencies off the startup path.
+    """
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+class LazyObject:
+    """
+    ClassName : LazyObject
+    Description : Stand-in for an object built by `factory` on first use
+    (from any thread), forwarding every attribute to it.
+    """
+    def __init__(self, factory):
+        self._factory = factory
+        self._object = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._object is None:
+            with self._lock:
+                if self._object is None:
+                    self._object = self._factory()
+        return self._object
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+def lazyImport(name: str):
+    return LazyModule(name)
@@ -0,0 +1,241 @@
+import calendar
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+from dotenv import load_dotenv
+from utils.lazy import lazyImport
+
+load_dotenv()
+
+# websockets comes with supabase's realtime client
+websocket = lazyImport("websockets.sync.client")
+
+# Websocket endpoint of Supabase Realtime, e.g. ws://127.0.0.1:4000/socket to
+# use a local stand-in (default derived from SUPABASE_URL)
+REALTIME_URL = os.getenv('REALTIME_URL')
+TOPIC = "realtime:tasks"
+# Phoenix closes sockets that stay silent for 60 seconds
+HEARTBEAT_INTERVAL = 25
+# Reconnect delays double from the first to the last, with jitter
+BACKOFF_FIRST = 1
+BACKOFF_LAST = 60
+
+def realtimeUrl(supabase_url: str, api_key: str):
+    base = REALTIME_URL or supabase_url.rstrip("/").replace("https://", "wss://", 1).replace("http://", "ws://", 1) + "/realtime/v1/websocket"
+    return f"{base}?{urlencode({'apikey': api_key, 'vsn': '1.0.0'})}"
+
+def changedRow(data: dict):
+    """ Task row of a postgres_changes event, hard deletes as tombstones. """
+    if data.get("type") == "DELETE":
+        return {"id": data["old_record"]["id"], "deleted": True}
+    return data["record"]
+
+def commitTime(data: dict):
+    """ Server commit time of a change in epoch seconds, None if missing. """
+    try:
+        stamp = data["commit_timestamp"]
+        # Always UTC, e.g. 2026-01-01T08:30:00.123456Z
+        fraction = stamp[19:].rstrip("Z").split("+")[0]
+        return calendar.timegm(time.strptime(stamp[:19], "%Y-%m-%dT%H:%M:%S")) + (float(fraction) if fraction[:1] == "." else 0)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class RealtimeListener:
+    """
+    ClassName : RealtimeListener
+    Description : Subscribes to row changes of the tasks table over the
+    Supabase Realtime websocket (Phoenix channel protocol), on its own
+    thread. Rows are handed to `on_rows` as they arrive; `on_live` is told
+    when the subscription starts and stops, so the sync engine can resync
+    from its cursor what was missed while disconnected. Reconnects with
+    exponential backoff and jitter.
+    """
+    def __init__(self, url: str, token=None, on_rows=None, on_live=None, table: str = "tasks"):
+        self.url = url
+        # Called for the current access token, None for the anon key
+        self.token = token or (lambda: None)
+        self.on_rows = on_rows
+        self.on_live = on_live
+        self.table = table
+
+        self.connections = 0
+        self.ref = 0
+        self.sent_token = None
+        self.socket = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        socket = self.socket
+        if socket is not None:
+            # Unblocks recv()
+            socket.close()
+
+    def run(self):
+        attempt = 0
+        while not self.stopped.is_set():
+            subscribed = False
+            try:
+                with websocket.connect(self.url, open_timeout=10, ping_interval=None, compression=None) as self.socket:
+                    self.connections += 1
+                    self.join()
+                    subscribed = True
+                    attempt = 0
+                    if self.on_live:
+                        self.on_live(True)
+                    self.listen()
+            except Exception as e:
+                if not self.stopped.is_set():
+                    print(f"Realtime disconnected: {e}")
+            finally:
+                self.socket = None
+                if subscribed and self.on_live:
+                    self.on_live(False)
+            if self.stopped.is_set():
+                return
+            delay = min(BACKOFF_LAST, BACKOFF_FIRST * 2 ** attempt)
+            attempt += 1
+            self.stopped.wait(random.uniform(delay / 2, delay))
+
+    def send(self, topic: str, event: str, payload: dict):
+        self.ref += 1
+        self.socket.send(json.dumps({"topic": topic, "event": event, "payload": payload, "ref": str(self.ref), "join_ref": "1"}))
+        return str(self.ref)
+
+    def join(self):
+        self.sent_token = self.token()
+        config = {"postgres_changes": [{"event": "*", "schema": "public", "table": self.table}]}
+        ref = self.send(TOPIC, "phx_join", {"config": config, "access_token": self.sent_token})
+        while True:
+            message = json.loads(self.socket.recv(timeout=10))
+            if message.get("event") == "phx_reply" and message.get("ref") == ref:
+                payload = message["payload"]
+                if payload.get("status") != "ok":
+                    raise ConnectionError(f"Subscription refused: {payload.get('response')}")
+                return
+
+    def listen(self):
+        heartbeat = None
+        next_beat = time.monotonic() + HEARTBEAT_INTERVAL
+        while not self.stopped.is_set():
+            try:
+                raw = self.socket.recv(timeout=max(0.0, next_beat - time.monotonic()))
+            except TimeoutError:
+                if heartbeat is not None:
+                    raise ConnectionError("Heartbeat not answered")
+                heartbeat = self.send("phoenix", "heartbeat", {})
+                self.renewToken()
+                next_beat = time.monotonic() + HEARTBEAT_INTERVAL
+                continue
+
+            message = json.loads(raw)
+            event = message.get("event")
+            if event == "postgres_changes":
+                data = message["payload"]["data"]
+                if self.on_rows:
+                    self.on_rows([(changedRow(data), commitTime(data))])
+            elif event == "phx_reply" and message.get("ref") == heartbeat:
+                heartbeat = None
+            elif event in ("phx_error", "phx_close"):
+                raise ConnectionError(f"Channel closed: {event}")
+
+    def renewToken(self):
+        """ Hand a refreshed access token to the channel, which drops subscriptions on expired ones. """
+        token = self.token()
+        if token and token != self.sent_token:
+            self.send(TOPIC, "access_token", {"access_token": token})
+            self.sent_token = token
+
+def benchmark(count: int = 2000, pause: float = 0.002, directory: str = None):
+    """
+    Replays `count` remote edits, `pause` seconds apart, through a local
+    websocket stand-in and applies them to a scratch task store the way the
+    sync engine does. The stand-in drops the connection halfway to exercise
+    reconnecting. Reports the time from each edit being sent to it being
+    committed locally.
+    """
+    import tempfile
+    from websockets.sync.server import serve
+    from utils.store import TaskStore
+
+    global BACKOFF_FIRST
+    BACKOFF_FIRST = 0.05
+
+    sent = {}
+    latencies = []
+    applied = threading.Event()
+    connections = []
+
+    def standIn(connection):
+        join = json.loads(connection.recv())
+        connection.send(json.dumps({"topic": TOPIC, "event": "phx_reply", "ref": join["ref"], "payload": {"status": "ok", "response": {}}}))
+        connections.append(connection)
+        first = len(connections) == 1
+        start, stop = (0, count // 2) if first else (count // 2, count)
+        for n in range(start, stop):
+            record = {"id": f"task-{n % 500}", "title": f"Task {n}", "description": "", "time": f"{n % 24:02d}:{n % 60:02d}",
+                      "position": float(n % 500), "title_at": n, "description_at": n, "time_at": n, "position_at": n}
+            sent[record["title"]] = time.perf_counter()
+            connection.send(json.dumps({"topic": TOPIC, "event": "postgres_changes", "payload": {"data": {
+                "type": "UPDATE", "table": "tasks", "record": record, "commit_timestamp": "2026-01-01T00:00:00Z"}}}))
+            time.sleep(pause)
+        if first:
+            # Drop it like a flaky network would
+            connection.close()
+            return
+        for message in connection:
+            pass
+
+    with tempfile.TemporaryDirectory(dir=directory) as folder, serve(standIn, "127.0.0.1", 0) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        store = None
+
+        def apply(rows):
+            nonlocal store
+            if store is None:
+                # On the listener's thread, which sqlite connections stay on
+                store = TaskStore(os.path.join(folder, "tasks.db"))
+            for remote, _ in rows:
+                store.applyRemote(remote)
+            store.flush()
+            now = time.perf_counter()
+            for remote, _ in rows:
+                latencies.append(now - sent[remote["title"]])
+            if len(latencies) == count:
+                applied.set()
+
+        def closeStore(is_live):
+            nonlocal store
+            if not is_live and store is not None:
+                store.close()
+                store = None
+
+        port = server.socket.getsockname()[1]
+        listener = RealtimeListener(f"ws://127.0.0.1:{port}", on_rows=apply, on_live=closeStore)
+        started = time.perf_counter()
+        listener.start()
+        if not applied.wait(60):
+            print(f"Only {len(latencies)} of {count} edits arrived")
+        elapsed = time.perf_counter() - started
+        listener.stop()
+        listener.thread.join()
+
+    latencies.sort()
+    print(f"{len(latencies)} edits in {elapsed:.2f} s over {listener.connections} connections")
+    for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        print(f"  {label} edit to local commit {latencies[int(q * (len(latencies) - 1))] * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    # python -m utils.realtime benchmark [count]
+    if sys.argv[1:2] == ["benchmark"]:
+        benchmark(*(int(arg) for arg in sys.argv[2:3]))
@@ -0,0 +1,264 @@
+import sys
+from datetime import date, datetime, timedelta
+from utils.lazy import lazyImport
+
+# Only needed for bulk expansion (reporting, large schedules), not for a few tasks
+np = lazyImport("numpy")
+
+DAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+EVERY_DAY = frozenset(range(7))
+DATE_FORMAT = "%Y%m%d"
+EPOCH = date(1970, 1, 1)
+# Days RecurrenceTable.nextOccurrences expands; rules quieter than that are looked up one by one
+LOOKAHEAD_DAYS = 8
+
+class Recurrence:
+    """
+    ClassName : Recurrence
+    Description : When a task repeats, in RRULE terms: DAILY every
+    `interval` days, or WEEKLY on `weekdays` every `interval` weeks, from
+    `start` up to `until` (forever when None), minus the `exceptions`
+    dates; a rule ending on its start day fires once. The day-of-week
+    lookup table is built once, so the next occurrence is a lookup plus
+    arithmetic.
+    """
+    def __init__(self, freq: str = "DAILY", interval: int = 1, weekdays=None, start: date = None, exceptions=(), until: date = None):
+        self.freq = freq
+        self.interval = max(1, int(interval))
+        self.start = start or date.today()
+        if freq == "DAILY":
+            weekdays = EVERY_DAY
+        self.weekdays = frozenset(weekdays) if weekdays else frozenset((self.start.weekday(),))
+        self.exceptions = frozenset(exceptions)
+        self.until = until
+
+        # Days from each weekday to the next active one in the same week (None if there is none)
+        self.ahead = tuple(
+            min((active - weekday for active in self.weekdays if active >= weekday), default=None)
+            for weekday in range(7)
+        )
+        self.first = min(self.weekdays)
+        # Bit d set when the rule can fire on weekday d
+        self.mask = sum(1 << day for day in self.weekdays)
+        # Weeks of a WEEKLY rule are counted from the Monday of its first week
+        self.anchor = self.start - timedelta(days=self.start.weekday()) if freq == "WEEKLY" else self.start
+
+    @classmethod
+    def parse(cls, text: str):
+        """ Rule from its stored form ("FREQ=WEEKLY;BYDAY=MO,WE;DTSTART=20261018"), None if empty. """
+        if not text:
+            return None
+        parts = dict(part.split("=", 1) for part in text.split(";") if "=" in part)
+        weekdays = [DAY_CODES.index(code) for code in parts.get("BYDAY", "").split(",") if code in DAY_CODES]
+        start = datetime.strptime(parts["DTSTART"], DATE_FORMAT).date() if "DTSTART" in parts else None
+        exceptions = [datetime.strptime(day, DATE_FORMAT).date() for day in parts.get("EXDATE", "").split(",") if day]
+        # The date of an RRULE UNTIL, which may carry a time
+        until = datetime.strptime(parts["UNTIL"][:8], DATE_FORMAT).date() if "UNTIL" in parts else None
+        return cls(parts.get("FREQ", "DAILY"), int(parts.get("INTERVAL", 1)), weekdays, start, exceptions, until)
+
+    def __str__(self):
+        parts = [f"FREQ={self.freq}"]
+        if self.interval > 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.freq == "WEEKLY":
+            parts.append("BYDAY=" + ",".join(DAY_CODES[day] for day in sorted(self.weekdays)))
+        parts.append(f"DTSTART={self.start.strftime(DATE_FORMAT)}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime(DATE_FORMAT)}")
+        if self.exceptions:
+            parts.append("EXDATE=" + ",".join(day.strftime(DATE_FORMAT) for day in sorted(self.exceptions)))
+        return ";".join(parts)
+
+    def __eq__(self, other):
+        return isinstance(other, Recurrence) and str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def describe(self, today: date = None):
+        """ Short text for the task card: "daily", "weekdays", "Mon, Wed", "every 3 days", "once"... """
+        if self.until is not None and self.until <= self.start:
+            return "once" if self.start <= (today or date.today()) else f"once on {self.start.strftime('%b %d')}"
+        if self.freq == "DAILY" or self.weekdays == EVERY_DAY:
+            text = "daily" if self.interval == 1 else f"every {self.interval} {'days' if self.freq == 'DAILY' else 'weeks'}"
+        else:
+            if self.weekdays == frozenset(range(5)):
+                days = "weekdays"
+            elif self.weekdays == frozenset((5, 6)):
+                days = "weekends"
+            else:
+                days = ", ".join(DAY_NAMES[day] for day in sorted(self.weekdays))
+            text = days if self.interval == 1 else f"every {self.interval} weeks on {days}"
+        if self.start > (today or date.today()):
+            text += f" from {self.start.strftime('%b %d')}"
+        if self.until is not None:
+            text += f" until {self.until.strftime('%b %d')}"
+        return text
+
+    def exclude(self, day: date):
+        """ The same rule without the occurrence on `day`. """
+        return Recurrence(self.freq, self.interval, self.weekdays, self.start, self.exceptions | {day}, self.until)
+
+    def nextDate(self, day: date):
+        """ First day on or after `day` on which the rule occurs, None once it has ended. """
+        while True:
+            day = max(day, self.start)
+            if self.freq == "DAILY":
+                offset = (day - self.start).days % self.interval
+                if offset:
+                    day += timedelta(days=self.interval - offset)
+            else:
+                week, weekday = divmod((day - self.anchor).days, 7)
+                skip = -week % self.interval
+                ahead = self.ahead[weekday]
+                if skip == 0 and ahead is not None:
+                    day += timedelta(days=ahead)
+                else:
+                    # Next active week, on its first active day
+                    day = self.anchor + timedelta(weeks=week + (skip or self.interval), days=self.first)
+            if self.until is not None and day > self.until:
+                return None
+            if day not in self.exceptions:
+                return day
+            day += timedelta(days=1)
+
+    def occursOn(self, day: date):
+        return self.nextDate(day) == day
+
+    def nextOccurrence(self, hour: int, minute: int, now: datetime = None):
+        """ Next datetime after `now` at which a task at hour:minute following this rule fires, None if there is none. """
+        now = now or datetime.now()
+        day = self.nextDate(now.date())
+        if day is not None and datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute) <= now:
+            day = self.nextDate(now.date() + timedelta(days=1))
+        if day is None:
+            return None
+        return datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute)
+
+# What a task without a rule does
+DAILY = Recurrence(start=EPOCH)
+
+class RecurrenceTable:
+    """
+    ClassName : RecurrenceTable
+    Description : Many tasks' rules as NumPy columns, built once. `expand`
+    then lists every occurrence in a date range with array operations over
+    a (task x day) grid, without a Python loop per task or per day.
+    """
+    def __init__(self, rules, minutes):
+        """ `rules` may contain None (plain daily task), `minutes` are minutes since midnight (None if unknown). """
+        rules = [rule or DAILY for rule in rules]
+        self.weekly = np.array([rule.freq == "WEEKLY" for rule in rules], dtype=bool)
+        self.interval = np.array([rule.interval for rule in rules], dtype=np.int64)
+        self.start = np.array([(rule.start - EPOCH).days for rule in rules], dtype=np.int64)
+        self.anchor = np.array([(rule.anchor - EPOCH).days for rule in rules], dtype=np.int64)
+        # Rules without an end run to the last representable day
+        self.until = np.array([np.iinfo(np.int64).max if rule.until is None else (rule.until - EPOCH).days for rule in rules], dtype=np.int64)
+        masks = np.array([rule.mask for rule in rules], dtype=np.int64)
+        self.weekday_mask = (masks[:, None] >> np.arange(7)) & 1 == 1
+        self.minutes = np.array([-1 if m is None else m for m in minutes], dtype=np.int64)
+
+        exceptions = [(row, (day - EPOCH).days) for row, rule in enumerate(rules) if rule.exceptions for day in rule.exceptions]
+        self.exception_rows = np.array([row for row, _ in exceptions], dtype=np.int64)
+        self.exception_days = np.array([day for _, day in exceptions], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.minutes)
+
+    def expand(self, start: date, end: date):
+        """
+        Occurrences from `start` up to (not including) `end`, sorted by
+        time, as (row indices, datetime64[m] fire times).
+        """
+        days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D"))
+        numbers = days.astype(np.int64)
+        # 1970-01-01 was a Thursday
+        weekdays = (numbers + 3) % 7
+
+        since = numbers[None, :] - self.anchor[:, None]
+        interval = self.interval[:, None]
+        daily = since % interval == 0
+        weekly = ((since // 7) % interval == 0) & self.weekday_mask[:, weekdays]
+        active = np.where(self.weekly[:, None], weekly, daily)
+        active &= numbers[None, :] >= self.start[:, None]
+        active &= numbers[None, :] <= self.until[:, None]
+        active &= (self.minutes >= 0)[:, None]
+
+        if len(self.exception_rows) and len(numbers):
+            columns = self.exception_days - numbers[0]
+            inside = (columns >= 0) & (columns < len(numbers))
+            active[self.exception_rows[inside], columns[inside]] = False
+
+        rows, columns = np.nonzero(active)
+        fire_at = days[columns].astype("datetime64[m]") + self.minutes[rows].astype("timedelta64[m]")
+        order = np.argsort(fire_at, kind="stable")
+        return rows[order], fire_at[order]
+
+    def nextOccurrences(self, now: datetime, days: int = LOOKAHEAD_DAYS):
+        """
+        Each row's first fire time after `now`, as datetimes, looking `days`
+        days ahead. None for rows without an occurrence that soon.
+        """
+        today = now.date()
+        rows, fire_at = self.expand(today, today + timedelta(days=days))
+        later = fire_at > np.datetime64(now)
+        rows, fire_at = rows[later], fire_at[later]
+        # Sorted by time, so the first index of a row is its next occurrence
+        found, first = np.unique(rows, return_index=True)
+        fire_times = [None] * len(self)
+        for row, fire in zip(found.tolist(), fire_at[first].tolist()):
+            fire_times[row] = fire
+        return fire_times
+
+def benchmark(count: int = 5000, days: int = 90):
+    """ Seconds to expand `count` mixed rules over `days` days, against looping over nextDate. """
+    import random
+    import time
+
+    random.seed(0)
+    today = date.today()
+    rules = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            rules.append(None)
+        elif kind == 1:
+            rules.append(Recurrence("WEEKLY", weekdays=random.sample(range(7), 3), start=today))
+        elif kind == 2:
+            rules.append(Recurrence("DAILY", interval=random.randint(2, 5), start=today, until=today + timedelta(days=random.randint(0, days))))
+        else:
+            rules.append(Recurrence("WEEKLY", interval=2, weekdays=range(5), start=today,
+                                    exceptions=[today + timedelta(days=random.randint(0, days))]))
+    minutes = [random.randint(0, 24 * 60 - 1) for _ in range(count)]
+    # Keep the lazy numpy import out of the timings
+    np.zeros(0)
+
+    start = time.perf_counter()
+    table = RecurrenceTable(rules, minutes)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    rows, _ = table.expand(today, today + timedelta(days=days))
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    looped = 0
+    end = today + timedelta(days=days)
+    for rule in rules:
+        rule = rule or DAILY
+        day = rule.nextDate(today)
+        while day is not None and day < end:
+            looped += 1
+            day = rule.nextDate(day + timedelta(days=1))
+    loop = time.perf_counter() - start
+    assert looped == len(rows)
+    return {"occurrences": len(rows), "table": built, "expand": vectorized, "loop": loop}
+
+if __name__ == "__main__":
+    # python -m utils.recurrence [tasks] [days]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+    results = benchmark(count, days)
+    print(f"{results['occurrences']} occurrences of {count} tasks over {days} days")
+    for name in ("table", "expand", "loop"):
+        print(f"{name:<8} {results[name] * 1000:8.1f} ms")
@@ -0,0 +1,286 @@
+import sys
+import time
+from datetime import date, datetime, timedelta
+from utils.lazy import lazyImport
+from utils.recurrence import Recurrence, RecurrenceTable
+
+# Only needed when the rollups are rebuilt from the full history
+np = lazyImport("numpy")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    task_uid TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    scheduled_at REAL NOT NULL,
+    at REAL NOT NULL,
+    day INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_occurrence ON events(task_uid, kind, scheduled_at) WHERE kind != 'snoozed';
+
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    fired INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    snoozed INTEGER NOT NULL DEFAULT 0,
+    lateness INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, bucket)
+);
+CREATE TABLE IF NOT EXISTS streaks (
+    task_uid TEXT PRIMARY KEY,
+    current INTEGER NOT NULL DEFAULT 0,
+    best INTEGER NOT NULL DEFAULT 0,
+    pending REAL
+);
+"""
+
+KINDS = ("fired", "completed", "snoozed")
+PERIODS = ("day", "week", "month")
+EPOCH = date(1970, 1, 1)
+
+def bucketOf(period: str, day: int):
+    """
+    Bucket of a local day (days since 1970-01-01): the day itself, the
+    Monday of its week, or the month counted from January 1970.
+    """
+    if period == "day":
+        return day
+    if period == "week":
+        # 1970-01-01 was a Thursday
+        return day - (day + 3) % 7
+    local = EPOCH + timedelta(days=day)
+    return (local.year - 1970) * 12 + local.month - 1
+
+def bucketLabel(period: str, bucket: int):
+    if period == "month":
+        year, month = divmod(bucket, 12)
+        return f"{1970 + year}-{month + 1:02d}"
+    day = EPOCH + timedelta(days=bucket)
+    return day.isoformat() if period == "day" else f"Week of {day.isoformat()}"
+
+def localDay(timestamp: float):
+    return (datetime.fromtimestamp(timestamp).date() - EPOCH).days
+
+class Reports:
+    """
+    ClassName : Reports
+    Description : History of reminders (fired, completed, snoozed) kept in
+    the task database. Each event updates its day, week and month rollup
+    and the task's streak in place, so reading a report never rescans the
+    history. `rebuild` recomputes everything from the events with NumPy.
+    """
+    def __init__(self, store):
+        # Shares the task store's connection, writes are committed by its flush
+        self.store = store
+        self.connection = store.connection
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+        # Last result of `scheduled` and the database version and range it is for
+        self.scheduled_cache = (None, None)
+
+    def record(self, task_uid: str, kind: str, scheduled_at: float, at: float = None):
+        """
+        Add an event for the occurrence of a task due at `scheduled_at`
+        (epoch seconds). Returns False if it was already recorded. An
+        occurrence completed before it fired counts as fired too.
+        """
+        at = time.time() if at is None else at
+        if kind == "completed":
+            self.record(task_uid, "fired", scheduled_at, min(at, scheduled_at))
+        day = localDay(scheduled_at)
+        cursor = self.connection.execute(
+            "INSERT OR IGNORE INTO events (task_uid, kind, scheduled_at, at, day) VALUES (?, ?, ?, ?, ?)",
+            (task_uid, kind, scheduled_at, at, day)
+        )
+        if cursor.rowcount == 0:
+            return False
+
+        # Whole seconds, so incremental sums and rebuilt ones agree exactly; early is on time
+        lateness = max(0, round(at - scheduled_at)) if kind == "completed" else 0
+        self.connection.executemany(
+            f"INSERT INTO rollups (period, bucket, {kind}, lateness) VALUES (?, ?, 1, ?) "
+            f"ON CONFLICT(period, bucket) DO UPDATE SET {kind} = {kind} + 1, lateness = lateness + excluded.lateness",
+            [(period, bucketOf(period, day), lateness) for period in PERIODS]
+        )
+        self.updateStreak(task_uid, kind, scheduled_at)
+        self.store.dirty = True
+        return True
+
+    def updateStreak(self, task_uid: str, kind: str, scheduled_at: float):
+        """ Streaks count occurrences completed in a row; one left open when the next fires breaks it. """
+        row = self.connection.execute(
+            "SELECT current, best, pending FROM streaks WHERE task_uid = ?", (task_uid,)
+        ).fetchone()
+        current, best, pending = row or (0, 0, None)
+        if kind == "fired":
+            if pending is not None and pending != scheduled_at:
+                current = 0
+            pending = scheduled_at
+        elif kind == "completed":
+            current += 1
+            best = max(best, current)
+            if pending == scheduled_at:
+                pending = None
+        else:
+            return
+        self.connection.execute(
+            "INSERT INTO streaks (task_uid, current, best, pending) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(task_uid) DO UPDATE SET current = excluded.current, best = excluded.best, pending = excluded.pending",
+            (task_uid, current, best, pending)
+        )
+
+    def isCompleted(self, task_uid: str, scheduled_at: float):
+        row = self.connection.execute(
+            "SELECT 1 FROM events WHERE task_uid = ? AND kind = 'completed' AND scheduled_at = ?", (task_uid, scheduled_at)
+        ).fetchone()
+        return row is not None
+
+    def rollups(self, period: str, limit: int = 30):
+        """
+        The latest `limit` buckets of `period`, newest first, as
+        (label, fired, completed, snoozed, completion rate, average lateness
+        in minutes). Rate and lateness are None without data.
+        """
+        rows = self.connection.execute(
+            "SELECT bucket, fired, completed, snoozed, lateness FROM rollups WHERE period = ? ORDER BY bucket DESC LIMIT ?",
+            (period, limit)
+        ).fetchall()
+        return [
+            (bucketLabel(period, bucket), fired, completed, snoozed,
+             completed / fired if fired else None, lateness / completed / 60 if completed else None)
+            for bucket, fired, completed, snoozed, lateness in rows
+        ]
+
+    def streaks(self):
+        """ {task uid: (current streak, best streak)}. """
+        return {uid: (current, best) for uid, current, best in self.connection.execute(
+            "SELECT task_uid, current, best FROM streaks"
+        )}
+
+    def scheduled(self, days: int = 7, today: date = None):
+        """
+        Reminders due on each of the next `days` days from `today`, under
+        the tasks' current rules. Expanded again only when the day or the
+        database changed (data_version counts other connections' commits,
+        total_changes this one's writes).
+        """
+        today = today or date.today()
+        version = (
+            self.connection.execute("PRAGMA data_version").fetchone()[0], self.connection.total_changes, today, days
+        )
+        key, counts = self.scheduled_cache
+        if key == version:
+            return counts
+        counts = self.expandScheduled(days, today)
+        self.scheduled_cache = (version, counts)
+        return counts
+
+    def expandScheduled(self, days: int, today: date):
+        rows = self.connection.execute("SELECT rule, minutes FROM tasks").fetchall()
+        if not rows:
+            return [0] * days
+        rules = {}
+        for rule, _ in rows:
+            if rule not in rules:
+                rules[rule] = Recurrence.parse(rule)
+        table = RecurrenceTable([rules[rule] for rule, _ in rows], [minutes for _, minutes in rows])
+        _, fire_at = table.expand(today, today + timedelta(days=days))
+        offsets = (fire_at.astype("datetime64[D]") - np.datetime64(today, "D")).astype(np.int64)
+        return np.bincount(offsets, minlength=days).tolist()
+
+    def rebuild(self):
+        """ Recompute every rollup and streak from the events. """
+        # Completions recorded without their firing, before record() added it
+        self.connection.execute(
+            "INSERT OR IGNORE INTO events (task_uid, kind, scheduled_at, at, day) "
+            "SELECT task_uid, 'fired', scheduled_at, MIN(at, scheduled_at), day FROM events WHERE kind = 'completed'"
+        )
+        rows = self.connection.execute(
+            "SELECT task_uid, kind, scheduled_at, at, day FROM events ORDER BY task_uid, scheduled_at, at"
+        ).fetchall()
+        self.connection.execute("DELETE FROM rollups")
+        self.connection.execute("DELETE FROM streaks")
+        self.store.dirty = True
+        if not rows:
+            return
+
+        uids, kinds, scheduled, at, days = zip(*rows)
+        kinds = np.array([KINDS.index(kind) for kind in kinds])
+        scheduled = np.array(scheduled, dtype=np.float64)
+        at = np.array(at, dtype=np.float64)
+        days = np.array(days, dtype=np.int64)
+        completed = kinds == 1
+        lateness = np.where(completed, np.maximum(np.round(at - scheduled), 0.0), 0.0)
+
+        # Month of each day, through datetime64
+        months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        keys = {"day": days, "week": days - (days + 3) % 7, "month": months}
+
+        for period, key in keys.items():
+            buckets, index = np.unique(key, return_inverse=True)
+            counts = [np.bincount(index, weights=kinds == kind, minlength=len(buckets)) for kind in range(len(KINDS))]
+            late = np.bincount(index, weights=lateness, minlength=len(buckets)).astype(np.int64)
+            self.connection.executemany(
+                "INSERT INTO rollups (period, bucket, fired, completed, snoozed, lateness) VALUES (?, ?, ?, ?, ?, ?)",
+                zip([period] * len(buckets), buckets.tolist(), *(count.astype(np.int64).tolist() for count in counts), late.tolist())
+            )
+
+        for uid, kind, scheduled_at in zip(uids, (KINDS[kind] for kind in kinds.tolist()), scheduled.tolist()):
+            self.updateStreak(uid, kind, scheduled_at)
+
+def benchmark(count: int = 100000):
+    """ Seconds to record `count` events one by one, to rebuild from them, and to read a report. """
+    import os
+    import random
+    import tempfile
+    from utils.store import TaskStore
+
+    path = os.path.join(tempfile.mkdtemp(), "report.db")
+    store = TaskStore(path)
+    reports = Reports(store)
+    random.seed(0)
+    uids = [f"task-{i}" for i in range(200)]
+    start_day = time.time() - 365 * 86400
+
+    start = time.perf_counter()
+    for i in range(count // 2):
+        uid = random.choice(uids)
+        scheduled_at = start_day + i * 86400 * 365 / (count // 2)
+        if random.random() < 0.1:
+            # Completed ahead of time, before it fired
+            reports.record(uid, "completed", scheduled_at, scheduled_at - random.randint(0, 3600))
+            continue
+        reports.record(uid, "fired", scheduled_at, scheduled_at)
+        if random.random() < 0.8:
+            reports.record(uid, "completed", scheduled_at, scheduled_at + random.randint(0, 3600))
+    store.flush()
+    recorded = time.perf_counter() - start
+
+    before = reports.rollups("week", 1000)
+    start = time.perf_counter()
+    reports.rebuild()
+    store.flush()
+    rebuilt = time.perf_counter() - start
+    assert reports.rollups("week", 1000) == before
+    assert all(rate <= 1 and lateness >= 0 for _, _, _, _, rate, lateness in before if rate is not None)
+
+    start = time.perf_counter()
+    for period in PERIODS:
+        reports.rollups(period)
+    read = time.perf_counter() - start
+
+    store.close()
+    return {"record": recorded, "rebuild": rebuilt, "read": read}
+
+if __name__ == "__main__":
+    # python -m utils.report benchmark [events] | python -m utils.report rebuild [tasks.db]
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild":
+        from utils.store import TaskStore
+        store = TaskStore(sys.argv[2] if len(sys.argv) > 2 else "tasks.db")
+        Reports(store).rebuild()
+        store.close()
+    else:
+        results = benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
+        for name, seconds in results.items():
+            print(f"{name:<8} {seconds * 1000:9.1f} ms")
@@ -0,0 +1,227 @@
+import heapq
+import itertools
+import re
+import sys
+from datetime import datetime, timedelta
+from utils.recurrence import RecurrenceTable
+
+TIME_FORMAT = "%I:%M %p"   # Matches QTime.toString("hh:mm AP")
+# TIME_FORMAT without strptime, which dominates bulk loads
+CLOCK_PATTERN = re.compile(r"\s*(\d{1,2}):(\d{2})\s*([AaPp][Mm])\s*$")
+# Recurring tasks are expanded together through a RecurrenceTable from this
+# many on, fewer are not worth importing NumPy for
+BULK_RULES = 256
+
+def minutesOf(time_str: str):
+    """ Minutes since midnight for an "hh:mm AP" string, None if unparsable. """
+    match = CLOCK_PATTERN.match(time_str) if isinstance(time_str, str) else None
+    if match is None:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2))
+    if not 1 <= hour <= 12 or minute > 59:
+        return None
+    return (hour % 12 + (12 if match.group(3).upper() == "PM" else 0)) * 60 + minute
+
+def nextFireTime(time_str: str, now: datetime = None, rule=None):
+    """
+    Return the next datetime at which a task scheduled at `time_str`
+    ("hh:mm AP") fires. Without a recurrence `rule` the task is daily and
+    times already passed today roll over to tomorrow.
+    """
+    return nextFireAt(minutesOf(time_str), now, rule)
+
+def nextFireAt(minutes: int, now: datetime = None, rule=None):
+    """ nextFireTime for a time of day given in minutes since midnight. """
+    if minutes is None:
+        return None
+    now = now or datetime.now()
+    if rule is not None:
+        return rule.nextOccurrence(minutes // 60, minutes % 60, now)
+    fire_at = now.replace(hour=minutes // 60, minute=minutes % 60, second=0, microsecond=0)
+    if fire_at <= now:
+        fire_at += timedelta(days=1)
+    return fire_at
+
+def nextFireTimes(minutes, rules, now: datetime = None):
+    """
+    nextFireAt for many tasks at once, e.g. the whole list at startup.
+    Plain daily tasks (rule None) are one addition to today's or
+    tomorrow's midnight; many recurring ones go through a RecurrenceTable.
+    """
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
+    # Seconds since midnight, a time equal to now has passed
+    current = (now - today).total_seconds()
+
+    recurring = [index for index, (minute, rule) in enumerate(zip(minutes, rules)) if minute is not None and rule is not None]
+    bulk = {}
+    if len(recurring) >= BULK_RULES:
+        table = RecurrenceTable([rules[index] for index in recurring], [minutes[index] for index in recurring])
+        bulk = dict(zip(recurring, table.nextOccurrences(now)))
+
+    offsets = {}
+    fire_times = []
+    for index, (minute, rule) in enumerate(zip(minutes, rules)):
+        if minute is None:
+            fire_times.append(None)
+        elif rule is not None:
+            fire_at = bulk.get(index)
+            if fire_at is None:
+                fire_at = rule.nextOccurrence(minute // 60, minute % 60, now)
+            fire_times.append(fire_at)
+        else:
+            offset = offsets.get(minute)
+            if offset is None:
+                offset = offsets[minute] = timedelta(minutes=minute)
+            fire_times.append((today if minute * 60 > current else tomorrow) + offset)
+    return fire_times
+
+class ReminderHeap:
+    """
+    ClassName : ReminderHeap
+    Description : Min-heap of reminders keyed by their next fire time, ties
+    broken by a rank (the task's list position). Updates and removals are
+    O(log n); replaced entries are invalidated in place and dropped lazily
+    when they surface at the top of the heap.
+    """
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def push(self, key, fire_at: datetime, rank: float = None):
+        """ Insert `key` or move it to a new fire time. Without `rank` it keeps the one it had (0 when new). """
+        if rank is None:
+            old = self._entries.get(key)
+            rank = old[1] if old is not None else 0
+        self.remove(key)
+        if fire_at is None:
+            return
+        entry = [fire_at, rank, next(self._counter), key, True]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def pushAll(self, entries):
+        """ Insert or move many keys from (key, fire_at, rank) triples, re-heapifying once when that is cheaper. """
+        added = []
+        for key, fire_at, rank in entries:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                old[-1] = False
+            if fire_at is None:
+                continue
+            entry = [fire_at, rank, next(self._counter), key, True]
+            self._entries[key] = entry
+            added.append(entry)
+
+        if len(added) * 8 < len(self._heap):
+            for entry in added:
+                heapq.heappush(self._heap, entry)
+        else:
+            self._heap = [entry for entry in self._heap if entry[-1]] + added
+            heapq.heapify(self._heap)
+
+    def remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[-1] = False
+            self._compact()
+
+    def peek(self):
+        """ Return (fire_at, key) of the nearest reminder, or None if empty. """
+        while self._heap and not self._heap[0][-1]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        entry = self._heap[0]
+        return entry[0], entry[3]
+
+    def pop(self):
+        head = self.peek()
+        if head is not None:
+            entry = heapq.heappop(self._heap)
+            del self._entries[entry[3]]
+        return head
+
+    def popDue(self, now: datetime):
+        """ Pop every reminder whose fire time is at or before `now`. """
+        due = []
+        while True:
+            head = self.peek()
+            if head is None or head[0] > now:
+                return due
+            due.append(self.pop())
+
+    def reposition(self, key, rank: float):
+        """ Give one reminder a new rank, e.g. a task dropped between two others, in O(log n). """
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] != rank:
+            self.push(key, entry[0], rank)
+
+    def reorder(self, ranks):
+        """
+        New ranks for many reminders at once, from (key, rank) pairs, e.g.
+        after the list is renumbered. The heap is rebuilt in one O(n) pass.
+        """
+        for key, rank in ranks:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] = rank
+        self._heap = [entry for entry in self._heap if entry[-1]]
+        heapq.heapify(self._heap)
+
+    def clear(self):
+        self._heap.clear()
+        self._entries.clear()
+
+    def _compact(self):
+        # Rebuild once invalidated entries outnumber live ones
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._heap = [entry for entry in self._heap if entry[-1]]
+            heapq.heapify(self._heap)
+
+def benchmark(count: int = 10000):
+    """
+    Seconds to fire `count` reminders due at the same minute and push them
+    back for the next day, twice, then once more after a drag. Checks that
+    they fire in rank (list) order every time.
+    """
+    import random
+    import time
+
+    random.seed(0)
+    ranks = {key: float(rank) for rank, key in enumerate(random.sample(range(count), count))}
+    heap = ReminderHeap()
+    now = datetime(2026, 1, 1, 9, 0)
+    heap.pushAll((key, now, rank) for key, rank in ranks.items())
+
+    def fire(now):
+        due = heap.popDue(now)
+        for fire_at, key in due:
+            # What the scheduler and the daemon do: back in for tomorrow, in list order
+            heap.push(key, fire_at + timedelta(days=1), ranks[key])
+        order = [key for _, key in due]
+        assert order == sorted(ranks, key=ranks.get), "reminders due together fired out of list order"
+        return len(order)
+
+    start = time.perf_counter()
+    fired = fire(now) + fire(now + timedelta(days=1))
+    # Drop the last task in front of the first one
+    first, last = min(ranks, key=ranks.get), max(ranks, key=ranks.get)
+    ranks[last] = ranks[first] - 1
+    heap.reposition(last, ranks[last])
+    fired += fire(now + timedelta(days=2))
+    return {"fired": fired, "seconds": time.perf_counter() - start}
+
+if __name__ == "__main__":
+    # python -m utils.scheduler benchmark [count]
+    if sys.argv[1:2] == ["benchmark"]:
+        results = benchmark(*(int(arg) for arg in sys.argv[2:3]))
+        print(f"{results['fired']} reminders fired in list order in {results['seconds'] * 1000:.1f} ms")
@@ -1,23 +1,211 @@
+import base64
+import json
 import os
 import pickle
+import threading
+import time
 from dotenv import load_dotenv
-from supabase import Client
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 load_dotenv()
 
 TOKEN_PATH = os.getenv('TOKEN_PATH')
+# Tokens expiring sooner than this (seconds) are refreshed over the network
+TOKEN_REFRESH_MARGIN = float(os.getenv('TOKEN_REFRESH_MARGIN') or 300)
+
+def tokenExpiry(access_token: str):
+    """ `exp` claim of a JWT, decoded locally without verifying it. """
+    try:
+        payload = access_token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+class TokenStore:
+    """
+    ClassName : TokenStore
+    Description : The single owner of the saved session. Keeps an in-memory
+    copy and writes the JSON file atomically (temp file + rename).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.data = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        with self.lock:
+            if self.data is None:
+                self.data = self.read()
+            return self.data
+
+    def read(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        with open(self.path, "rb") as file:
+            raw = file.read()
+        try:
+            return json.loads(raw)
+        except ValueError:
+            # Token files written before the JSON store were pickled
+            return pickle.loads(raw)
+
+    def save(self, access_token: str, refresh_token: str, user: dict = None):
+        data = { 'access_token' : access_token , 'refresh_token' : refresh_token }
+        if user is None:
+            user = self.load().get('user')
+        if user:
+            data['user'] = user
+
+        with self.lock:
+            tmp_path = f"{self.path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self.path)
+            self.data = data
+
+    def clear(self):
+        with self.lock:
+            self.data = {}
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def tokens(self):
+        data = self.load()
+        return data.get('access_token'), data.get('refresh_token')
+
+    def expiresIn(self):
+        """ Seconds until the access token expires, None if unknown. """
+        expires_at = tokenExpiry(self.load().get('access_token'))
+        return None if expires_at is None else expires_at - time.time()
+
+token_store = TokenStore(TOKEN_PATH)
+# Held for every network refresh, so concurrent attempts collapse into one
+refresh_lock = threading.Lock()
+
+def userToDict(user):
+    if hasattr(user, "model_dump"):
+        return user.model_dump(mode="json")
+    return json.loads(user.json())
+
+def hasSession():
+    """ Local check only, no network: is there a saved session to restore? """
+    access_token, refresh_token = token_store.tokens()
+    return bool(access_token and refresh_token)
 
-def existsSession(client:Client):
-    if(os.path.exists(TOKEN_PATH)):
-        with open(TOKEN_PATH , "rb") as file:
-            data = pickle.load(file)
-            response = client.auth.set_session(data.get("access_token") , data.get("refresh_token"))
+def cachedUser():
+    """ Name and avatar url saved with the last session, for the first frame. """
+    metadata = (token_store.load().get("user") or {}).get("user_metadata") or {}
+    return { 'name' : metadata.get('name') , 'avatar_url' : metadata.get('avatar_url') }
+
+class TokenStorage:
+    """
+    ClassName : TokenStorage
+    Description : gotrue session storage backed by the token store. The
+    client reads the saved session from it without a request, and every
+    session it saves (sign in, refresh, rotation) lands in the token file.
+    The file stays the token store's: gotrue dropping a session it cannot
+    parse does not delete it.
+    """
+    def get_item(self, key: str):
+        data = token_store.load()
+        expires_at = tokenExpiry(data.get('access_token'))
+        if not (data.get('refresh_token') and data.get('user')) or expires_at is None:
+            return None
+        return json.dumps({
+            'access_token' : data['access_token'] , 'refresh_token' : data['refresh_token'] , 'token_type' : "bearer" ,
+            'expires_in' : int(expires_at - time.time()) , 'expires_at' : expires_at , 'user' : data['user'] ,
+        })
+
+    def set_item(self, key: str, value: str):
+        data = json.loads(value)
+        if (data.get('access_token'), data.get('refresh_token')) != token_store.tokens():
+            token_store.save(data['access_token'], data['refresh_token'], data.get('user'))
+
+    def remove_item(self, key: str):
+        pass
+
+def clientOptions():
+    """ Options for a supabase client whose session lives in the token store. """
+    from supabase import ClientOptions
+    return ClientOptions(storage=TokenStorage(), persist_session=True)
+
+def persistSession(event, session):
+    """
+    Auth state listener: save every session the client switches to. gotrue
+    rotates the refresh token on its own (auto-refresh, get_session), and a
+    rotated token that is not saved is spent by the next refresh.
+    """
+    if session is None or event not in ("SIGNED_IN", "TOKEN_REFRESHED", "USER_UPDATED"):
+        return
+    if (session.access_token, session.refresh_token) == token_store.tokens():
+        return
+    user = userToDict(session.user) if session.user else None
+    token_store.save(session.access_token, session.refresh_token, user)
+
+def watchSession(client:"Client"):
+    """ Keep the token file in step with `client`'s session. Returns the client. """
+    client.auth.on_auth_state_change(persistSession)
+    return client
+
+def restoreSession(client:"Client"):
+    """
+    Restore the saved session. A token that is still valid is read by the
+    client from its TokenStorage, with no round trip and no disk write;
+    TokenRefresher renews it before it expires. Only a token already close
+    to expiry goes through set_session, which refreshes and saves it.
+    """
+    expires_in = token_store.expiresIn()
+    if expires_in is not None and expires_in > TOKEN_REFRESH_MARGIN:
+        # Installs the stored session and tells the client's listeners (SIGNED_IN)
+        client.auth.initialize_from_storage()
+        session = client.auth.get_session()
+        if session is not None:
+            return session
+
+    with refresh_lock:
+        access_token, refresh_token = token_store.tokens()
+        response = client.auth.set_session(access_token , refresh_token)
+        if (response.session.access_token, response.session.refresh_token) != (access_token, refresh_token):
             saveSession(response)
+        return response.session
+
+def refreshSession(client:"Client"):
+    """
+    Exchange the client's current refresh token for a new session and save
+    it. Callers that were waiting on another refresh get its result instead
+    of sending a request of their own.
+    """
+    stale_token, _ = token_store.tokens()
+    with refresh_lock:
+        access_token, refresh_token = token_store.tokens()
+        expires_in = token_store.expiresIn()
+        if access_token != stale_token and expires_in is not None and expires_in > TOKEN_REFRESH_MARGIN:
+            return client.auth.get_session()
+
+        # The client's token is the latest one, the saved one may already be spent
+        current = client.auth.get_session()
+        if current is not None and current.access_token != access_token:
+            # gotrue refreshed it on its own, no need for another request
+            expires_at = tokenExpiry(current.access_token)
+            if expires_at is not None and expires_at - time.time() > TOKEN_REFRESH_MARGIN:
+                persistSession("TOKEN_REFRESHED", current)
+                return current
+        response = client.auth.refresh_session(current.refresh_token if current else refresh_token)
+        saveSession(response)
+        return response.session
+
+def existsSession(client:"Client"):
+    if(hasSession()):
+        restoreSession(client)
         return True
     else:
         return False
-    
+
 def saveSession(response):
-    data = { 'access_token' : response.session.access_token , 'refresh_token' : response.session.refresh_token }
-    with open(TOKEN_PATH , "wb") as file:
-        pickle.dump(data, file)
\ No newline at end of file
+    user = userToDict(response.user) if response.user else None
+    token_store.save(response.session.access_token, response.session.refresh_token, user)
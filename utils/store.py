@@ -0,0 +1,428 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from utils.scheduler import minutesOf
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    time TEXT NOT NULL,
+    minutes INTEGER,
+    position REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_minutes ON tasks(minutes);
+CREATE INDEX IF NOT EXISTS idx_tasks_position ON tasks(position);
+
+CREATE TABLE IF NOT EXISTS outbox (
+    uid TEXT PRIMARY KEY,
+    changes TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Task fields that are synced, each with its own change time
+FIELDS = ("title", "description", "time", "position", "rule")
+# Fields a task pulled from the server needs before it can be created
+REQUIRED_FIELDS = ("title", "description", "time", "position")
+
+# Smallest gap kept between neighbouring positions before renumbering
+MIN_GAP = 1e-9
+
+# Commits that wake the checkpointer early (a few pages each), and the
+# size the log file is cut back to once folded
+WAKE_COMMITS = 256
+WAL_SIZE_LIMIT = 4 << 20
+# Log pages after which the writer folds inline, as SQLite does by default.
+# Only reached by bursts of commits that never leave the log idle long
+# enough to restart it after a background fold.
+MAX_WAL_PAGES = 16384
+
+class Checkpointer(threading.Thread):
+    """
+    ClassName : Checkpointer
+    Description : Folds the write-ahead log into the database file on its
+    own connection, every `interval` seconds or after WAKE_COMMITS
+    commits. This is also where the log is fsynced, so commits in between
+    are plain appends.
+    """
+    def __init__(self, path: str, interval: float):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.checkpoints = 0
+        # Pages in the log at the last fold
+        self.pages = 0
+
+    def run(self):
+        connection = sqlite3.connect(self.path, timeout=5)
+        try:
+            while not self.stopped.is_set():
+                self.wake.wait(self.interval)
+                self.wake.clear()
+                try:
+                    # PASSIVE never blocks the UI connection's writes
+                    _, self.pages, _ = connection.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+                    self.checkpoints += 1
+                except sqlite3.Error as e:
+                    print(e)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+        self.join()
+
+class TaskStore:
+    """
+    ClassName : TaskStore
+    Description : SQLite persistence for daily tasks (WAL mode).
+    List order is a fractional `position`, so adding, editing, moving or
+    deleting a task touches a single row. Writes accumulate in an open
+    transaction until `flush` commits them together, as one append to the
+    write-ahead log. Every change is also folded into an outbox row per
+    task for the sync engine to push.
+
+    With a `checkpoint_interval`, commits never fold the log into the
+    database themselves; a Checkpointer thread does it in the background.
+    Opening the store replays only the log written since the last fold.
+    """
+    def __init__(self, path: str, checkpoint_interval: float = None):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=5)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.migrate()
+        self.dirty = False
+
+        self.checkpointer = None
+        self.commits = 0
+        if checkpoint_interval:
+            self.connection.execute("PRAGMA wal_autocheckpoint=0")
+            self.connection.execute(f"PRAGMA journal_size_limit={WAL_SIZE_LIMIT}")
+            self.checkpointer = Checkpointer(path, checkpoint_interval)
+            self.checkpointer.start()
+
+    def migrate(self):
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(tasks)")}
+        if "uid" not in columns:
+            self.connection.execute("ALTER TABLE tasks ADD COLUMN uid TEXT")
+            self.connection.execute("UPDATE tasks SET uid = lower(hex(randomblob(16))) WHERE uid IS NULL")
+            # Tasks created before sync existed still have to reach the server
+            for (uid,) in self.connection.execute("SELECT uid FROM tasks").fetchall():
+                self.record(uid, FIELDS)
+        if "rule" not in columns:
+            # Recurrence rule (utils.recurrence), NULL repeats daily
+            self.connection.execute("ALTER TABLE tasks ADD COLUMN rule TEXT")
+        self.connection.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_uid ON tasks(uid)")
+        self.connection.commit()
+
+    def load(self):
+        """
+        All tasks as (id, title, description, time, position, rule, minutes),
+        in list order. `minutes` is the time already parsed, for scheduling.
+        """
+        return self.connection.execute(
+            "SELECT id, title, description, time, position, rule, minutes FROM tasks ORDER BY position"
+        ).fetchall()
+
+    def get(self, task_id: int):
+        """ One task as (id, title, description, time, position, rule), None if deleted. """
+        return self.connection.execute(
+            "SELECT id, title, description, time, position, rule FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+
+    def tasksAt(self, start_minute: int, end_minute: int):
+        """ Ids of the tasks scheduled between two minutes of the day (inclusive). """
+        rows = self.connection.execute(
+            "SELECT id FROM tasks WHERE minutes BETWEEN ? AND ? ORDER BY minutes, position",
+            (start_minute, end_minute)
+        )
+        return [row[0] for row in rows]
+
+    def lastPosition(self):
+        row = self.connection.execute("SELECT MAX(position) FROM tasks").fetchone()
+        return row[0] if row[0] is not None else 0.0
+
+    def add(self, title: str, description: str, time_str: str, position: float = None, rule: str = None):
+        """ Insert a task, appended to the end of the list by default. Returns (id, position). """
+        if position is None:
+            position = self.lastPosition() + 1.0
+        uid = str(uuid.uuid4())
+        cursor = self.connection.execute(
+            "INSERT INTO tasks (uid, title, description, time, minutes, position, rule, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (uid, title, description, time_str, minutesOf(time_str), position, rule, time.time())
+        )
+        self.record(uid, FIELDS)
+        return cursor.lastrowid, position
+
+    def addMany(self, tasks):
+        """
+        Insert (title, description, time, rule) tasks at the end of the list,
+        in one pass for a whole chunk of an import. Returns [(id, position)].
+        """
+        position = self.lastPosition()
+        now = time.time()
+        changes = json.dumps(dict.fromkeys(FIELDS, now))
+        added = []
+        outbox = []
+        for title, description, time_str, rule in tasks:
+            position += 1.0
+            uid = str(uuid.uuid4())
+            cursor = self.connection.execute(
+                "INSERT INTO tasks (uid, title, description, time, minutes, position, rule, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (uid, title, description, time_str, minutesOf(time_str), position, rule, now)
+            )
+            added.append((cursor.lastrowid, position))
+            outbox.append((uid, changes))
+        # New uids have nothing pending to merge with
+        self.connection.executemany("INSERT OR REPLACE INTO outbox (uid, changes) VALUES (?, ?)", outbox)
+        self.dirty = True
+        return added
+
+    def iterate(self, batch: int = 1000):
+        """ Every task as (uid, title, description, time, rule) in list order, `batch` rows at a time. """
+        cursor = self.connection.execute("SELECT uid, title, description, time, rule FROM tasks ORDER BY position")
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                return
+            yield rows
+
+    def update(self, task_id: int, title: str, description: str, time_str: str, rule: str = None):
+        self.connection.execute(
+            "UPDATE tasks SET title = ?, description = ?, time = ?, minutes = ?, rule = ?, updated_at = ? WHERE id = ?",
+            (title, description, time_str, minutesOf(time_str), rule, time.time(), task_id)
+        )
+        self.record(self.uidOf(task_id), ("title", "description", "time", "rule"))
+
+    def move(self, task_id: int, before: float = None, after: float = None):
+        """
+        Place a task between the positions of its new neighbours (either may
+        be None at the ends of the list). Returns the new position, or None
+        if the gap is exhausted and the list has to be renumbered.
+        """
+        if before is None and after is None:
+            position = 1.0
+        elif before is None:
+            position = after - 1.0
+        elif after is None:
+            position = before + 1.0
+        elif after - before < MIN_GAP:
+            return None
+        else:
+            position = (before + after) / 2
+
+        self.connection.execute(
+            "UPDATE tasks SET position = ?, updated_at = ? WHERE id = ?",
+            (position, time.time(), task_id)
+        )
+        self.record(self.uidOf(task_id), ("position",))
+        return position
+
+    def renumber(self, task_ids):
+        """ Rewrite every position as 1, 2, 3... in the given order. """
+        now = time.time()
+        self.connection.executemany(
+            "UPDATE tasks SET position = ?, updated_at = ? WHERE id = ?",
+            [(index + 1.0, now, task_id) for index, task_id in enumerate(task_ids)]
+        )
+        for task_id in task_ids:
+            self.record(self.uidOf(task_id), ("position",))
+
+    def delete(self, task_id: int):
+        uid = self.uidOf(task_id)
+        self.connection.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        self.record(uid, ("deleted",))
+
+    def uidOf(self, task_id: int):
+        row = self.connection.execute("SELECT uid FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return row[0] if row else None
+
+    def flush(self):
+        """ Commit every write made since the last flush in one transaction. """
+        if self.dirty:
+            self.connection.commit()
+            self.dirty = False
+            self.commits += 1
+            if self.checkpointer and self.commits % WAKE_COMMITS == 0:
+                if self.checkpointer.pages > MAX_WAL_PAGES:
+                    self.connection.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+                    self.checkpointer.pages = 0
+                self.checkpointer.wake.set()
+
+    def close(self):
+        self.flush()
+        if self.checkpointer:
+            self.checkpointer.stop()
+            self.checkpointer = None
+        # The last connection to close folds whatever is left
+        self.connection.close()
+
+    # Sync outbox
+
+    def record(self, uid: str, fields):
+        """ Mark fields of a task as changed locally, coalescing with earlier edits. """
+        self.dirty = True
+        if uid is None:
+            return
+        changes = self.pendingChanges(uid)
+        now = time.time()
+        for field in fields:
+            changes[field] = now
+        self.connection.execute(
+            "INSERT INTO outbox (uid, changes) VALUES (?, ?) ON CONFLICT(uid) DO UPDATE SET changes = excluded.changes",
+            (uid, json.dumps(changes))
+        )
+
+    def pendingChanges(self, uid: str):
+        row = self.connection.execute("SELECT changes FROM outbox WHERE uid = ?", (uid,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def outbox(self, limit: int = 1000):
+        """
+        Pending changes as (uid, changes, values); `changes` maps each field
+        to its local change time and `values` holds the current field values
+        (None for deleted tasks).
+        """
+        rows = self.connection.execute(
+            "SELECT o.uid, o.changes, t.title, t.description, t.time, t.position, t.rule "
+            "FROM outbox o LEFT JOIN tasks t ON t.uid = o.uid LIMIT ?", (limit,)
+        ).fetchall()
+        pending = []
+        for uid, changes, *values in rows:
+            changes = json.loads(changes)
+            values = None if "deleted" in changes else dict(zip(FIELDS, values))
+            pending.append((uid, changes, values))
+        return pending
+
+    def acknowledge(self, uid: str, pushed):
+        """ Drop pushed fields from the outbox unless they changed again meanwhile. """
+        changes = self.pendingChanges(uid)
+        for field, changed_at in pushed.items():
+            if changes.get(field) == changed_at:
+                del changes[field]
+        if changes:
+            self.connection.execute("UPDATE outbox SET changes = ? WHERE uid = ?", (json.dumps(changes), uid))
+        else:
+            self.connection.execute("DELETE FROM outbox WHERE uid = ?", (uid,))
+        self.dirty = True
+
+    def applyRemote(self, remote: dict):
+        """
+        Merge a row pulled from the server. Each field keeps whichever side
+        changed it last; a pending local delete wins. Returns the local task
+        id if anything visible changed, else None.
+        """
+        uid = remote["id"]
+        changes = self.pendingChanges(uid)
+        row = self.connection.execute(
+            "SELECT id, title, description, time, position, rule FROM tasks WHERE uid = ?", (uid,)
+        ).fetchone()
+        task_id = row[0] if row else None
+        local = dict(zip(FIELDS, row[1:])) if row else {}
+
+        if "deleted" in changes:
+            return None
+
+        if remote.get("deleted"):
+            if task_id is None:
+                return None
+            self.connection.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            self.connection.execute("DELETE FROM outbox WHERE uid = ?", (uid,))
+            self.dirty = True
+            return task_id
+
+        updates = {}
+        for field in FIELDS:
+            if field not in remote or (field in local and local[field] == remote[field]):
+                continue
+            if field in changes and changes[field] >= (remote.get(f"{field}_at") or 0):
+                continue
+            updates[field] = remote[field]
+            changes.pop(field, None)
+
+        if not updates:
+            return None
+
+        if task_id is None:
+            if any(field not in updates for field in REQUIRED_FIELDS):
+                return None
+            cursor = self.connection.execute(
+                "INSERT INTO tasks (uid, title, description, time, minutes, position, rule, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (uid, updates["title"], updates["description"], updates["time"], minutesOf(updates["time"]), updates["position"], updates.get("rule"), time.time())
+            )
+            task_id = cursor.lastrowid
+        else:
+            if "time" in updates:
+                updates["minutes"] = minutesOf(updates["time"])
+            assignments = ", ".join(f"{field} = ?" for field in updates)
+            self.connection.execute(
+                f"UPDATE tasks SET {assignments}, updated_at = ? WHERE id = ?",
+                (*updates.values(), time.time(), task_id)
+            )
+
+        if changes:
+            self.connection.execute("UPDATE outbox SET changes = ? WHERE uid = ?", (json.dumps(changes), uid))
+        else:
+            self.connection.execute("DELETE FROM outbox WHERE uid = ?", (uid,))
+        self.dirty = True
+        return task_id
+
+    def getState(self, key: str, default=None):
+        row = self.connection.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def setState(self, key: str, value: str):
+        self.connection.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+        self.dirty = True
+
+def benchmark(count: int = 3000, pause: float = 0.005, directory: str = None):
+    """
+    Milliseconds per commit of a one-task move, as (median, 99th percentile,
+    worst), with the log folded inline by the committing connection
+    (SQLite's default) and by a Checkpointer thread. Commits are `pause`
+    seconds apart, the UI commits at most every 200 ms.
+    """
+    import tempfile
+
+    results = {}
+    for name, interval in (("inline", None), ("background", 0.5)):
+        store = TaskStore(os.path.join(tempfile.mkdtemp(dir=directory), "tasks.db"), interval)
+        ids = [store.add(f"Task {i}", "", "09:00 AM")[0] for i in range(200)]
+        store.flush()
+        timings = []
+        for i in range(count):
+            time.sleep(pause)
+            start = time.perf_counter()
+            store.move(ids[i % len(ids)], i, i + 1)
+            store.flush()
+            timings.append((time.perf_counter() - start) * 1000)
+        store.close()
+        timings.sort()
+        results[name] = (timings[len(timings) // 2], timings[len(timings) * 99 // 100], timings[-1])
+    return results
+
+if __name__ == "__main__":
+    # python -m utils.store benchmark [commits] [directory]
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+        results = benchmark(count, directory=sys.argv[3] if len(sys.argv) > 3 else None)
+        for name, (median, p99, worst) in results.items():
+            print(f"{name:<11} median {median:6.3f} ms   p99 {p99:6.3f} ms   worst {worst:7.3f} ms")
@@ -0,0 +1,302 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from utils.store import TaskStore, FIELDS
+
+TABLE = "tasks"
+BATCH_SIZE = 500
+# Recent realtime deliveries kept for the latency figures
+LATENCY_SAMPLES = 500
+
+def afterCursor(updated_at: str, uid: str):
+    """
+    PostgREST filter for rows after (updated_at, id). One upsert stamps all
+    its rows with the same updated_at, so the id breaks ties between pages.
+    """
+    return f'updated_at.gt."{updated_at}",and(updated_at.eq."{updated_at}",id.gt."{uid}")'
+
+class SyncEngine:
+    """
+    ClassName : SyncEngine
+    Description : Offline-first sync of the local task store with a Supabase
+    table, run on its own thread so the UI never waits on the network.
+
+    Local edits are coalesced per task in the store's outbox and pushed as
+    batched upserts; only rows after the stored (updated_at, id) cursor are
+    pulled. Conflicts are resolved per field by change time.
+    While a realtime subscription is live, rows it delivers are applied as
+    they arrive and pulling is skipped, except once after every
+    (re)subscription to catch up from the cursor on what was missed.
+
+    Expected table (with `updated_at` maintained by a trigger):
+        id uuid primary key, user_id uuid default auth.uid(),
+        title text, title_at float8, description text, description_at float8,
+        time text, time_at float8, position float8, position_at float8,
+        rule text, rule_at float8,
+        deleted boolean default false, deleted_at float8,
+        updated_at timestamptz default now()
+    """
+    def __init__(self, client, path: str, on_change=None, interval: float = 30):
+        self.client = client
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+
+        self.round_trips = 0
+        # Rows delivered by the realtime subscription, with their commit time
+        self.inbox = deque()
+        self.live = False
+        self.resync = True
+        # Commit times of each batch handed to on_change, until it is applied
+        self.delivered = deque(maxlen=LATENCY_SAMPLES)
+        # Seconds from the server commit to the change being applied
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.wake = threading.Event()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+
+    def kick(self):
+        """ Sync as soon as possible, e.g. right after local changes were committed. """
+        self.wake.set()
+
+    def receive(self, rows):
+        """ Queue (row, commit time) pairs from the realtime subscription, from any thread. """
+        self.inbox.extend(rows)
+        self.wake.set()
+
+    def setLive(self, live: bool):
+        """ The realtime subscription started (catch up from the cursor) or stopped (poll again). """
+        self.live = live
+        if live:
+            self.resync = True
+        self.wake.set()
+
+    def run(self):
+        # sqlite connections stay on the thread that opened them
+        store = TaskStore(self.path)
+        while self.running:
+            try:
+                changed, committed = self.applyLive(store)
+                if self.resync or not self.live:
+                    self.resync = False
+                    changed += self.pull(store)
+                self.push(store)
+                if changed and self.on_change:
+                    self.delivered.append(committed)
+                    self.on_change(changed)
+            except Exception as e:
+                # Offline or rejected, the outbox keeps everything for the next round
+                print(f"Sync failed: {e}")
+                store.connection.rollback()
+                store.dirty = False
+                self.resync = True
+            if not self.inbox:
+                self.wake.wait(self.interval)
+            self.wake.clear()
+        store.close()
+
+    def applied(self):
+        """ The receiver of on_change has applied the oldest batch handed to it, e.g. shown it in the UI. """
+        if self.delivered:
+            now = time.time()
+            self.latencies.extend(now - at for at in self.delivered.popleft())
+
+    def latency(self, quantile: float = 0.5):
+        """ Realtime delivery latency in seconds at `quantile`, None before any arrived. """
+        latencies = sorted(self.latencies)
+        return latencies[int(quantile * (len(latencies) - 1))] if latencies else None
+
+    def applyLive(self, store: TaskStore):
+        """ Apply rows queued by the realtime subscription. Returns changed local task ids and their commit times. """
+        changed = []
+        committed = []
+        cursor = (store.getState("cursor"), store.getState("cursor_id", ""))
+        while self.inbox:
+            remote, at = self.inbox.popleft()
+            task_id = store.applyRemote(remote)
+            if task_id is not None:
+                changed.append(task_id)
+                if at is not None:
+                    committed.append(at)
+            key = (remote.get("updated_at"), remote["id"])
+            if key[0] and not self.resync and (cursor[0] is None or key > cursor):
+                # Nothing was missed since the last catch-up, so the cursor can follow
+                cursor = key
+                store.setState("cursor", cursor[0])
+                store.setState("cursor_id", cursor[1])
+        store.flush()
+        return changed, committed
+
+    def pull(self, store: TaskStore):
+        """ Apply remote rows changed since the cursor. Returns changed local task ids. """
+        changed = []
+        cursor = store.getState("cursor")
+        # Cursors saved before ids were part of them resume from every row at that time
+        cursor_id = store.getState("cursor_id", "")
+        while True:
+            query = self.client.table(TABLE).select("*").order("updated_at").order("id").limit(BATCH_SIZE)
+            if cursor:
+                query = query.or_(afterCursor(cursor, cursor_id))
+            rows = query.execute().data
+            self.round_trips += 1
+
+            for remote in rows:
+                task_id = store.applyRemote(remote)
+                if task_id is not None:
+                    changed.append(task_id)
+            if rows:
+                cursor, cursor_id = rows[-1]["updated_at"], rows[-1]["id"]
+                store.setState("cursor", cursor)
+                store.setState("cursor_id", cursor_id)
+            store.flush()
+
+            if len(rows) < BATCH_SIZE:
+                return changed
+
+    def push(self, store: TaskStore):
+        """ Upsert the outbox, one request per batch of rows with the same changed fields. """
+        while True:
+            pending = store.outbox(BATCH_SIZE)
+            if not pending:
+                return
+
+            groups = {}
+            for uid, changes, values in pending:
+                if values is None:
+                    row = {"id": uid, "deleted": True, "deleted_at": changes["deleted"]}
+                else:
+                    row = {"id": uid}
+                    for field in FIELDS:
+                        if field in changes:
+                            row[field] = values[field]
+                            row[f"{field}_at"] = changes[field]
+                # PostgREST bulk upserts need the same columns in every row
+                groups.setdefault(tuple(sorted(row)), []).append((uid, changes, row))
+
+            for batch in groups.values():
+                self.client.table(TABLE).upsert([row for _, _, row in batch]).execute()
+                self.round_trips += 1
+                for uid, changes, _ in batch:
+                    store.acknowledge(uid, changes)
+                store.flush()
+
+def benchmark(tasks: int = 1000, edits: int = 10000, directory: str = None):
+    """
+    Syncs two devices through a local PostgREST stand-in over HTTP, with
+    postgrest-py (the client supabase uses). Device A creates `tasks` tasks
+    (a first small batch, so later pages start mid-upsert) and makes
+    `edits` edits to them; device B pulls after each. Returns the round
+    trips of each push and pull and checks both devices end up equal.
+    """
+    import random
+    import re
+    import tempfile
+    from datetime import datetime, timedelta, timezone
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+    from postgrest import SyncPostgrestClient
+
+    operators = {"gt": str.__gt__, "gte": str.__ge__, "eq": str.__eq__, "lt": str.__lt__, "lte": str.__le__}
+    keyset = re.compile(r'\(updated_at\.gt\."([^"]+)",and\(updated_at\.eq\."([^"]+)",id\.gt\."([^"]*)"\)\)')
+    table = {}
+    clock = [datetime.now(timezone.utc)]
+    lock = threading.Lock()
+
+    class StandIn(BaseHTTPRequestHandler):
+        """ GET with the filters pull() sends, POST as a merging upsert stamping one updated_at per request like now() does. """
+        def reply(self, rows):
+            body = json.dumps(rows).encode()
+            self.send_response(200 if self.command == "GET" else 201)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            after = ("", "")
+            if "or" in query:
+                updated_at, _, uid = keyset.fullmatch(query["or"][0]).groups()
+                after = (updated_at, uid)
+            # Plain comparisons such as updated_at=gt.<time>
+            comparisons = [(column, *value[0].split(".", 1)) for column, value in query.items() if column in ("updated_at", "id")]
+            with lock:
+                rows = sorted((row for row in table.values() if (row["updated_at"], row["id"]) > after
+                               and all(operators[op](row[column], value) for column, op, value in comparisons)),
+                              key=lambda row: (row["updated_at"], row["id"]))
+            self.reply(rows[:int(query["limit"][0])])
+
+        def do_POST(self):
+            rows = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with lock:
+                clock[0] = max(clock[0] + timedelta(microseconds=1), datetime.now(timezone.utc))
+                stamp = clock[0].isoformat(timespec="microseconds")
+                for row in rows:
+                    table.setdefault(row["id"], {"deleted": False}).update(row, updated_at=stamp)
+            self.reply(rows)
+
+        def log_message(self, *args):
+            pass
+
+    def contents(store):
+        return store.connection.execute("SELECT uid, title, description, time, position, rule FROM tasks ORDER BY uid").fetchall()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = SyncPostgrestClient(f"http://127.0.0.1:{server.server_address[1]}")
+    folder = tempfile.mkdtemp(dir=directory)
+    a, b = TaskStore(os.path.join(folder, "a.db")), TaskStore(os.path.join(folder, "b.db"))
+    engine = SyncEngine(client, folder)
+
+    def sync(name, store, step):
+        trips = engine.round_trips
+        start = time.perf_counter()
+        step(store)
+        results[name] = (engine.round_trips - trips, time.perf_counter() - start)
+
+    results = {}
+    first = tasks // 27
+    ids = [task_id for task_id, _ in a.addMany((f"Task {i}", "", "09:00 AM", None) for i in range(first))]
+    a.flush()
+    engine.push(a)
+    ids += [task_id for task_id, _ in a.addMany((f"Task {i}", "", "09:00 AM", None) for i in range(first, tasks))]
+    a.flush()
+    sync("push tasks", a, engine.push)
+    sync("pull tasks", b, engine.pull)
+    assert contents(a) == contents(b), "pulled tasks differ"
+
+    rng = random.Random(6)
+    for i in range(edits):
+        task_id = rng.choice(ids)
+        if i % 4 == 3:
+            a.move(task_id, rng.random() * tasks, None)
+        else:
+            a.update(task_id, f"Edit {i}", "", f"{rng.randint(1, 12):02d}:30 PM")
+    a.flush()
+    sync("push edits", a, engine.push)
+    sync("pull edits", b, engine.pull)
+    assert contents(a) == contents(b), "pulled edits differ"
+
+    a.close()
+    b.close()
+    server.shutdown()
+    return results
+
+if __name__ == "__main__":
+    # python -m utils.sync benchmark [edits]  (needs postgrest, installed with supabase)
+    if sys.argv[1:2] == ["benchmark"]:
+        edits = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+        for name, (trips, seconds) in benchmark(edits=edits).items():
+            print(f"{name:<11} {trips:3d} round trips   {seconds * 1000:7.1f} ms")
@@ -0,0 +1,277 @@
+import re
+import sys
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+# Word characters of the scanner, anything else ends a token
+WORD_PATTERN = re.compile(r"[\w:@]")
+# "@9", "9:30", "@9:30pm", "17:45"
+TIME_PATTERN = re.compile(r"(@)?(\d{1,2})(?::(\d{2}))?(am|pm|a|p)?$")
+# "20min", "2h" typed without a space
+DURATION_PATTERN = re.compile(r"(\d{1,4})([a-z]+)$")
+
+MERIDIEMS = {"am": "am", "a": "am", "pm": "pm", "p": "pm"}
+UNITS = {
+    "m": 1, "min": 1, "mins": 1, "minute": 1, "minutes": 1,
+    "h": 60, "hr": 60, "hrs": 60, "hour": 60, "hours": 60,
+}
+DAYS = {"today": 0, "tonight": 0, "tomorrow": 1, "tmrw": 1, "tmr": 1}
+NAMED_TIMES = {"noon": (12, 0), "midnight": (0, 0)}
+WEEKDAYS = {
+    "mon": 0, "monday": 0, "mondays": 0,
+    "tue": 1, "tues": 1, "tuesday": 1, "tuesdays": 1,
+    "wed": 2, "wednesday": 2, "wednesdays": 2,
+    "thu": 3, "thur": 3, "thurs": 3, "thursday": 3, "thursdays": 3,
+    "fri": 4, "friday": 4, "fridays": 4,
+    "sat": 5, "saturday": 5, "saturdays": 5,
+    "sun": 6, "sunday": 6, "sundays": 6,
+}
+WEEKDAY_GROUPS = {
+    "day": frozenset(range(7)), "daily": frozenset(range(7)),
+    "weekday": frozenset(range(5)), "weekdays": frozenset(range(5)),
+    "weekend": frozenset((5, 6)), "weekends": frozenset((5, 6)),
+}
+
+Token = namedtuple("Token", "word start end")
+
+# The scanner state after each character. Immutable and small, so keeping
+# one per character makes backspace a pop and typing one step.
+State = namedtuple("State", [
+    "word_start",   # start of the token being typed, -1 between tokens
+    "window",       # the last three tokens, phrases are at most that long
+    "time",         # (hour, minute) or None
+    "delta",        # minutes from now ("in 20 min") or None
+    "day",          # days from today ("tomorrow") or None
+    "weekdays",     # frozenset of 0 (Monday) .. 6 or None
+    "listing",      # start of an open "every mon and ..." phrase, or -1
+    "spans",        # recognised phrases as a cons list ((start, end), rest)
+])
+EMPTY = State(-1, (), None, None, None, None, -1, None)
+
+# What a title asks for, `spans` is the cons list of phrases to strip from it
+Schedule = namedtuple("Schedule", "time delta day weekdays spans")
+
+def toHour(hour: int, meridiem: str = None):
+    """ 24-hour value of `hour`, None if it is not a valid hour. """
+    if meridiem is None:
+        return hour if 0 <= hour <= 23 else None
+    if not 1 <= hour <= 12:
+        return None
+    if meridiem == "am":
+        return 0 if hour == 12 else hour
+    return hour if hour == 12 else hour + 12
+
+def isClock(word: str):
+    """ Whether a token is written as a time on its own ("@9", "9:30"), not just a number. """
+    match = TIME_PATTERN.match(word)
+    return match is not None and bool(match.group(1) or match.group(3))
+
+def addSpan(spans, start: int, end: int):
+    """ Push a span, merging it with the previous one when they overlap. """
+    if spans is not None and spans[0][1] >= start:
+        (previous_start, _), rest = spans
+        return ((min(previous_start, start), end), rest)
+    return ((start, end), spans)
+
+def readToken(state: State, token: Token):
+    """ Advance the phrase state past one complete token. """
+    word = token.word
+    window = state.window
+    previous = window[-1] if window else None
+    before = window[-2] if len(window) > 1 else None
+    start = token.start
+    if previous is not None and previous.word in ("at", "@"):
+        start = previous.start
+    changes = {"window": (window + (token,))[-3:], "listing": -1}
+
+    match = TIME_PATTERN.match(word)
+    duration = DURATION_PATTERN.match(word)
+    if match and (match.group(1) or match.group(3) or match.group(4) or start != token.start):
+        # "@9", "9:30", "9pm", "at 9"
+        _, hour, minute, meridiem = match.groups()
+        hour = toHour(int(hour), MERIDIEMS.get(meridiem))
+        minute = int(minute or 0)
+        if hour is not None and minute <= 59:
+            changes.update(time=(hour, minute), delta=None, spans=addSpan(state.spans, start, token.end))
+    elif word in MERIDIEMS and previous is not None and TIME_PATTERN.match(previous.word) and (
+            len(word) == 2 or isClock(previous.word) or (before is not None and before.word in ("at", "@"))):
+        # "9 pm", "9:30 pm", "9:30 p", "at 9 a"; a lone "a" after a number is a word ("take 2 a day")
+        _, hour, minute, _ = TIME_PATTERN.match(previous.word).groups()
+        if before is not None and before.word in ("at", "@"):
+            previous = before
+        hour = toHour(int(hour), MERIDIEMS[word])
+        minute = int(minute or 0)
+        if hour is not None and minute <= 59:
+            changes.update(time=(hour, minute), delta=None, spans=addSpan(state.spans, previous.start, token.end))
+    elif word in NAMED_TIMES:
+        changes.update(time=NAMED_TIMES[word], delta=None, spans=addSpan(state.spans, start, token.end))
+    elif word in UNITS and previous is not None and previous.word.isdigit() and before is not None and before.word == "in":
+        # "in 20 min"
+        changes.update(delta=int(previous.word) * UNITS[word], time=None, spans=addSpan(state.spans, before.start, token.end))
+    elif duration and duration.group(2) in UNITS and previous is not None and previous.word == "in":
+        # "in 20min"
+        changes.update(delta=int(duration.group(1)) * UNITS[duration.group(2)], time=None, spans=addSpan(state.spans, previous.start, token.end))
+    elif word in DAYS:
+        changes.update(day=DAYS[word], spans=addSpan(state.spans, token.start, token.end))
+    elif word == "daily":
+        changes.update(weekdays=WEEKDAY_GROUPS[word], spans=addSpan(state.spans, token.start, token.end))
+    elif word == "every":
+        changes.update(listing=token.start)
+    elif state.listing >= 0 and word == "and":
+        changes.update(listing=state.listing)
+    elif state.listing >= 0 and (word in WEEKDAYS or word in WEEKDAY_GROUPS):
+        # "every mon and wed", "every weekday", "every and mon" while typing
+        days = WEEKDAY_GROUPS.get(word) or frozenset((WEEKDAYS[word],))
+        if previous.word != "every":
+            # Continuing the list of this phrase
+            days = (state.weekdays or frozenset()) | days
+        changes.update(weekdays=days, listing=state.listing, spans=addSpan(state.spans, state.listing, token.end))
+
+    return state._replace(**changes)
+
+def step(state: State, text: str, i: int):
+    """ State after character `i` of `text`. """
+    if WORD_PATTERN.match(text[i]):
+        return state if state.word_start >= 0 else state._replace(word_start=i)
+    if state.word_start < 0:
+        return state
+    token = Token(text[state.word_start:i].lower(), state.word_start, i)
+    return readToken(state._replace(word_start=-1), token)
+
+def finish(state: State, text: str):
+    """ Schedule for the whole text, including the token still being typed. """
+    if state.word_start >= 0:
+        state = readToken(state, Token(text[state.word_start:].lower(), state.word_start, len(text)))
+    return Schedule(state.time, state.delta, state.day, state.weekdays, state.spans)
+
+class TimeParser:
+    """
+    ClassName : TimeParser
+    Description : Reads a schedule out of a task title as it is typed:
+    "@9:30 pm", "17:45", "at 5", "in 20 min", "tomorrow 5pm", "every mon
+    and wed", "daily". One scanner state is kept per character, so typing
+    or deleting at the end costs one step whatever the title's length.
+    """
+    def __init__(self):
+        self.text = ""
+        self.states = [EMPTY]
+        self.schedule = Schedule(None, None, None, None, None)
+
+    def feed(self, text: str):
+        """ Parse `text`, reusing the states of the prefix it shares with the last text. """
+        if text.startswith(self.text):
+            start = len(self.text)
+        elif self.text.startswith(text):
+            start = len(text)
+        else:
+            start = 0
+            for old, new in zip(self.text, text):
+                if old != new:
+                    break
+                start += 1
+
+        del self.states[start + 1:]
+        state = self.states[-1]
+        for i in range(start, len(text)):
+            state = step(state, text, i)
+            self.states.append(state)
+        self.text = text
+        self.schedule = finish(state, text)
+        return self.schedule
+
+    def fireTime(self, now: datetime = None):
+        """ Datetime the parsed schedule points at, or None if the title has no time. """
+        schedule = self.schedule
+        now = now or datetime.now()
+        if schedule.delta is not None:
+            return now.replace(second=0, microsecond=0) + timedelta(minutes=schedule.delta)
+        if schedule.time is None:
+            return None
+        fire_at = now.replace(hour=schedule.time[0], minute=schedule.time[1], second=0, microsecond=0)
+        return fire_at + timedelta(days=schedule.day or 0)
+
+    def strip(self, text: str = None):
+        """ `text` (the last parsed text by default) without the recognised phrases. """
+        text = self.text if text is None else text
+        # Spans are stored last first, so earlier offsets stay valid
+        node = self.schedule.spans
+        while node is not None:
+            (start, end), node = node
+            text = text[:start] + text[end:]
+        return " ".join(text.split())
+
+    def clear(self):
+        self.feed("")
+
+# Titles and what they should parse to: (time, minutes from now, title left)
+CASES = {
+    "take 2 a day": (None, None, "take 2 a day"),
+    "buy 3 a pack": (None, None, "buy 3 a pack"),
+    "call mom 9 a": (None, None, "call mom 9 a"),
+    "call mom 9a": ((9, 0), None, "call mom"),
+    "at 9 a call mom": ((9, 0), None, "call mom"),
+    "@9 p call mom": ((21, 0), None, "call mom"),
+    "walk 9:30 p": ((21, 30), None, "walk"),
+    "meet 9 pm": ((21, 0), None, "meet"),
+    "meet at 5": ((5, 0), None, "meet"),
+    "stretch in 20 min": (None, 20, "stretch"),
+}
+
+def check():
+    """ Parse every title in CASES at once and typed character by character, and compare. """
+    for text, (time, delta, title) in CASES.items():
+        typed = TimeParser()
+        for end in range(1, len(text) + 1):
+            typed.feed(text[:end])
+        whole = TimeParser()
+        whole.feed(text)
+        for parser in (whole, typed):
+            got = (parser.schedule.time, parser.schedule.delta, parser.strip())
+            assert got == (time, delta, title), f"{text!r}: {got} instead of {(time, delta, title)}"
+    return len(CASES)
+
+def benchmark(length: int = 2000, keystrokes: int = 5000):
+    """
+    Microseconds per keystroke while typing a `length` character title with
+    a trailing schedule, for the regex over the whole title the Input used
+    before and for TimeParser. Every tenth keystroke is a backspace.
+    """
+    import time
+
+    old_pattern = re.compile(r"@([0]?[1-9]|1[0-2]):([0-5]?[0-9])\s([APap][Mm])")
+    # Every prefix of these is fed, half-typed phrases included
+    words = ("water the plants and call the office about the report ", "tomorrow @9:30 pm ", "every mon and wed ", "every and mon ")
+    title = "".join(words[i % len(words)] for i in range(length // 20 + 1))[:length]
+
+    edits = []
+    text = title[:length - keystrokes // 2] if keystrokes // 2 < length else ""
+    position = len(text)
+    for i in range(keystrokes):
+        if i % 10 == 9 and text:
+            text = text[:-1]
+            position -= 1
+        else:
+            text += title[position % len(title)]
+            position += 1
+        edits.append(text)
+
+    results = {}
+    start = time.perf_counter()
+    for text in edits:
+        old_pattern.findall(text)
+    results["regex"] = (time.perf_counter() - start) / len(edits) * 1e6
+
+    parser = TimeParser()
+    parser.feed(edits[0][:-1])
+    start = time.perf_counter()
+    for text in edits:
+        parser.feed(text)
+    results["incremental"] = (time.perf_counter() - start) / len(edits) * 1e6
+    return results
+
+if __name__ == "__main__":
+    # python -m utils.timeparse [title length]
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{check()} titles parsed as expected")
+    for name, us in benchmark(length).items():
+        print(f"{name:<12} {us:8.2f} us per keystroke")
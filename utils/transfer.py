@@ -0,0 +1,359 @@
+import csv
+import io
+import json
+import os
+import re
+import sys
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from utils.recurrence import Recurrence, DATE_FORMAT
+
+# Fields of an exported task, `rule` is the stored Recurrence text.
+# Readers yield them as a tuple; writers take (uid, *fields) rows.
+COLUMNS = ("title", "description", "time", "rule")
+ICS_DATETIME = "%Y%m%dT%H%M%S"
+# RFC 5545 lines are folded at 75 octets
+ICS_LINE = 75
+# "09:30 PM", "9:30pm", "21:30"; strptime is most of the cost of a bulk import
+TIME_PATTERN = re.compile(r"(\d{1,2}):(\d{2})\s*([AP]M)?$", re.IGNORECASE)
+
+def normalTime(text: str):
+    """ `text` as "hh:mm AP", None if it is not a time of day. """
+    match = TIME_PATTERN.match(text.strip())
+    if match is None:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2)), match.group(3)
+    if minute > 59 or (meridiem and not 1 <= hour <= 12) or hour > 23:
+        return None
+    if meridiem is None:
+        meridiem = "AM" if hour < 12 else "PM"
+        hour = hour % 12 or 12
+    return f"{hour:02d}:{minute:02d} {meridiem.upper()}"
+
+def clockOf(time_str: str):
+    """ (hour, minute) of an "hh:mm AP" string. """
+    hour, minute = int(time_str[:2]), int(time_str[3:5])
+    return hour % 12 + (12 if time_str[6:8] == "PM" else 0), minute
+
+@lru_cache(maxsize=256)
+def storedRule(text: str):
+    """ Normal stored form of a rule read from a file, ValueError if it is not one the app can repeat by. """
+    recurrence = Recurrence.parse(text)
+    if recurrence.freq not in ("DAILY", "WEEKLY"):
+        raise ValueError(f"Unsupported rule: {text}")
+    return str(recurrence)
+
+def taskRecord(title: str, description: str = "", time_str: str = "", rule=None):
+    """ A task as read from a file, None when it has no title, an unusable time or rule, or a field that is not text. """
+    if not all(value is None or isinstance(value, str) for value in (title, description, time_str, rule)):
+        return None
+    title = (title or "").strip()
+    time_str = normalTime(time_str or "")
+    if not title or time_str is None:
+        return None
+    if rule:
+        try:
+            rule = storedRule(rule)
+        except ValueError:
+            return None
+    return (title, (description or "").strip(), time_str, rule or None)
+
+# JSON Lines
+
+def readJSONL(file):
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        if not isinstance(item, dict):
+            yield None
+            continue
+        yield taskRecord(item.get("title"), item.get("description"), item.get("time"), item.get("rule"))
+
+def writeJSONL(file, rows):
+    for _, *task in rows:
+        file.write(json.dumps(dict(zip(COLUMNS, task)), ensure_ascii=False))
+        file.write("\n")
+
+# CSV
+
+def readCSV(file):
+    for row in csv.DictReader(file):
+        yield taskRecord(row.get("title"), row.get("description"), row.get("time"), row.get("rule"))
+
+def writeCSV(file, rows):
+    writer = csv.writer(file)
+    writer.writerow(COLUMNS)
+    for _, *task in rows:
+        writer.writerow(["" if value is None else value for value in task])
+
+# iCalendar
+
+def unfold(file):
+    """ Logical content lines of an .ics file, continuation lines joined back. """
+    pending = None
+    for line in file:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if pending is not None:
+                pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending:
+        yield pending
+
+def unescape(text: str):
+    out = []
+    chars = iter(text)
+    for char in chars:
+        if char == "\\":
+            char = next(chars, "")
+            out.append("\n" if char in ("n", "N") else char)
+        else:
+            out.append(char)
+    return "".join(out)
+
+def escape(text: str):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def fold(line: str):
+    """ Split a content line into 75-octet pieces, never inside a UTF-8 character. """
+    data = line.encode()
+    if len(data) <= ICS_LINE:
+        return line + "\r\n"
+    pieces = []
+    start, limit = 0, ICS_LINE
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        pieces.append(data[start:end].decode())
+        start, limit = end, ICS_LINE - 1
+    return "\r\n ".join(pieces) + "\r\n"
+
+def parseDateTime(text: str):
+    """ Local datetime of an ICS DATE-TIME ("20261018T093000", "...Z" for UTC), None for a DATE. """
+    if len(text) < 15 or text[8] != "T" or not (text[:8] + text[9:15]).isdigit():
+        return None
+    when = datetime(int(text[:4]), int(text[4:6]), int(text[6:8]), int(text[9:11]), int(text[11:13]), int(text[13:15]))
+    if text.endswith("Z"):
+        when = when.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return when
+
+@lru_cache(maxsize=256)
+def importedRule(rrule: str, start: str, exceptions: str):
+    """ Stored rule text for a DAILY or WEEKLY RRULE, None for plain daily. Bulk files repeat a few rules. """
+    text = f"{rrule};DTSTART={start}"
+    if exceptions:
+        text += f";EXDATE={exceptions}"
+    recurrence = Recurrence.parse(text)
+    if recurrence.freq == "DAILY" and recurrence.interval == 1 and not recurrence.exceptions and recurrence.until is None and recurrence.start <= date.today():
+        # Already in effect every day: a plain task
+        return None
+    return str(recurrence)
+
+def eventRecord(event: dict):
+    """ Task for a VEVENT: DTSTART gives the time, RRULE (DAILY or WEEKLY) how it repeats. """
+    when = parseDateTime(event.get("DTSTART", ""))
+    if when is None:
+        # All-day events have no time to remind at
+        return None
+    rule = None
+    if "RRULE" in event:
+        exceptions = ",".join(day[:8] for day in event.get("EXDATE", "").split(",") if day)
+        parts = dict(part.split("=", 1) for part in event["RRULE"].split(";") if "=" in part)
+        if parts.get("FREQ") not in ("DAILY", "WEEKLY") or "COUNT" in parts:
+            # The app's tasks repeat by day or week, forever or until a date
+            return None
+        rule = importedRule(event["RRULE"], f"{when.year:04d}{when.month:02d}{when.day:02d}", exceptions)
+    elif when.date() > date.today():
+        # A plain daily task that starts on the event's day
+        rule = str(Recurrence(start=when.date()))
+    return taskRecord(event.get("SUMMARY"), event.get("DESCRIPTION"), f"{when.hour:02d}:{when.minute:02d}", rule)
+
+def readICS(file):
+    event = None
+    for line in unfold(file):
+        name, _, value = line.partition(":")
+        # Parameters such as DTSTART;TZID=... are not needed
+        name = name.split(";", 1)[0].upper()
+        if name == "BEGIN" and value == "VEVENT":
+            event = {}
+        elif name == "END" and value == "VEVENT":
+            if event is not None:
+                try:
+                    yield eventRecord(event)
+                except ValueError:
+                    # Impossible dates, malformed RRULE values
+                    yield None
+            event = None
+        elif event is not None:
+            if name == "EXDATE" and name in event:
+                value = event[name] + "," + value
+            event[name] = unescape(value) if name in ("SUMMARY", "DESCRIPTION") else value
+
+@lru_cache(maxsize=256)
+def eventTiming(rule: str, time_str: str, today: date):
+    """ DTSTART, RRULE and EXDATE lines of an exported task, shared by every task with the same rule and time. """
+    recurrence = Recurrence.parse(rule)
+    hour, minute = clockOf(time_str)
+    when = datetime.combine(recurrence.start if recurrence else today, datetime.min.time()).replace(hour=hour, minute=minute)
+    repeat = ";".join(part for part in str(recurrence or Recurrence(start=today)).split(";") if not part.startswith(("DTSTART", "EXDATE")))
+    if recurrence and recurrence.until is not None:
+        # UNTIL takes the same form as the floating DTSTART
+        repeat = repeat.replace(f"UNTIL={recurrence.until.strftime(DATE_FORMAT)}", f"UNTIL={recurrence.until.strftime(DATE_FORMAT)}T235959")
+    lines = f"DTSTART:{when.strftime(ICS_DATETIME)}\r\nRRULE:{repeat}\r\n"
+    if recurrence and recurrence.exceptions:
+        lines += fold("EXDATE:" + ",".join(day.strftime(DATE_FORMAT) + when.strftime("T%H%M%S") for day in sorted(recurrence.exceptions)))
+    return lines
+
+def writeICS(file, rows):
+    """ The task uids become the events' UIDs, so a calendar re-importing an export updates its events. """
+    file.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//RemindIt//Tasks//EN\r\n")
+    today = date.today()
+    stamp = datetime.now(timezone.utc).strftime(ICS_DATETIME) + "Z"
+    for uid, title, description, time_str, rule in rows:
+        file.write(
+            f"BEGIN:VEVENT\r\nUID:{uid}@remindit\r\nDTSTAMP:{stamp}\r\n"
+            + eventTiming(rule, time_str, today)
+            + fold(f"SUMMARY:{escape(title)}")
+            + fold(f"DESCRIPTION:{escape(description)}")
+            + "END:VEVENT\r\n"
+        )
+    file.write("END:VCALENDAR\r\n")
+
+FORMATS = {
+    ".jsonl": (readJSONL, writeJSONL),
+    ".csv": (readCSV, writeCSV),
+    ".ics": (readICS, writeICS),
+}
+
+def formatOf(path: str):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported file type: {extension or path}")
+    return FORMATS[extension]
+
+class TaskReader:
+    """
+    ClassName : TaskReader
+    Description : Streams tasks out of a JSONL, CSV or iCalendar file one
+    record at a time, so memory stays flat whatever the file's size.
+    `progress` is the fraction of the file read so far.
+    """
+    def __init__(self, path: str):
+        read, _ = formatOf(path)
+        self.raw = open(path, "rb")
+        self.size = os.fstat(self.raw.fileno()).st_size
+        self.text = io.TextIOWrapper(self.raw, encoding="utf-8-sig", newline="")
+        self.records = read(self.text)
+        self.skipped = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """ Next usable task as (title, description, time, rule), unusable records are counted in `skipped`. """
+        for record in self.records:
+            if record is not None:
+                return record
+            self.skipped += 1
+        raise StopIteration
+
+    def take(self, count: int):
+        """ Up to `count` tasks, fewer only at the end of the file. """
+        tasks = []
+        for task in self:
+            tasks.append(task)
+            if len(tasks) >= count:
+                break
+        return tasks
+
+    @property
+    def progress(self):
+        if self.raw.closed:
+            return 1.0
+        return self.raw.tell() / self.size if self.size else 1.0
+
+    def close(self):
+        self.text.close()
+
+def exportTasks(store, path: str, batch: int = 1000):
+    """ Write every task of `store` to `path`, in list order, in the format of its extension. Returns the count. """
+    _, write = formatOf(path)
+    count = 0
+
+    def rows():
+        nonlocal count
+        for chunk in store.iterate(batch):
+            count += len(chunk)
+            yield from chunk
+
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8", newline="") as file:
+        write(file, rows())
+    os.replace(temporary, path)
+    return count
+
+def exportDatabase(db_path: str, path: str):
+    """ Export from a connection of its own, for a worker thread. """
+    from utils.store import TaskStore
+    store = TaskStore(db_path)
+    try:
+        return exportTasks(store, path)
+    finally:
+        store.close()
+
+def benchmark(count: int = 100000):
+    """ Seconds to export `count` tasks to each format and to stream them back, and the peak memory of reading. """
+    import tempfile
+    import time
+    import tracemalloc
+    from utils.store import TaskStore
+
+    directory = tempfile.mkdtemp()
+    store = TaskStore(os.path.join(directory, "tasks.db"))
+    rule = str(Recurrence("WEEKLY", weekdays=(0, 2), start=date.today()))
+    store.addMany((f"Task {i}", f"Description, \"quoted\"; {i}", "09:30 PM", rule if i % 2 else None) for i in range(count))
+    store.flush()
+
+    results = {}
+    for extension in FORMATS:
+        path = os.path.join(directory, "tasks" + extension)
+        start = time.perf_counter()
+        exportTasks(store, path)
+        exported = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reader = TaskReader(path)
+        read = sum(1 for _ in reader)
+        reader.close()
+        imported = time.perf_counter() - start
+        assert read == count, (extension, read)
+
+        # Traced separately, tracemalloc slows the reading down several times
+        tracemalloc.start()
+        reader = TaskReader(path)
+        for _ in reader:
+            pass
+        reader.close()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[extension] = (exported, imported, peak, os.path.getsize(path))
+    store.close()
+    return results
+
+if __name__ == "__main__":
+    # python -m utils.transfer benchmark [tasks]
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+        for extension, (exported, imported, peak, size) in benchmark(count).items():
+            print(f"{extension:<7} {size / 1e6:6.1f} MB   export {exported * 1000:7.1f} ms   "
+                  f"read {imported * 1000:7.1f} ms   peak {peak / 1024:7.1f} KiB")
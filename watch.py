@@ -1,69 +1,512 @@
 import sys
 import time
 import os
+import ast
+import fnmatch
+import hashlib
+import importlib
+import runpy
+import signal
 import subprocess
 import threading
+from dotenv import load_dotenv
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import psutil
 
-class CodeChangeHandler(FileSystemEventHandler):
+load_dotenv()
+
+# Packages whose modules can be swapped in the running app
+RELOADABLE_PACKAGES = ("ui", "gui")
+# Seconds without further saves before a reload or restart
+RELOAD_DEBOUNCE = float(os.getenv('RELOAD_DEBOUNCE') or 0.1)
+# Imported once by the zygote, every forked app starts with them loaded
+ZYGOTE_MODULES = ("PyQt6.QtCore", "PyQt6.QtGui", "PyQt6.QtWidgets", "supabase", "dotenv")
+# Comma separated globs of paths that never trigger a reload
+RELOAD_IGNORE = [pattern.strip() for pattern in (
+    os.getenv('RELOAD_IGNORE') or "*/.git/*,*/__pycache__/*,*/venv/*,*/.venv/*,*/site-packages/*"
+).split(",") if pattern.strip()]
+
+def moduleName(root, path):
+    """ Dotted module name of a file under `root`, or None if it is outside. """
+    relative = os.path.relpath(os.path.abspath(path), root)
+    if relative.startswith("..") or not relative.endswith(".py"):
+        return None
+    parts = relative[:-3].split(os.sep)
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts) or None
+
+def modulePath(root, name):
+    """ File of a project module, or None for third-party and stdlib modules. """
+    base = os.path.join(root, *name.split("."))
+    for path in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(path):
+            return path
+    return None
+
+def importsOf(root, name, path):
+    """ Project modules imported by the module `name` stored at `path`. """
+    with open(path, "rb") as file:
+        tree = ast.parse(file.read(), path)
+    is_package = path.endswith("__init__.py")
+    package = name if is_package else name.rpartition(".")[0]
+
+    candidates = []
+    # Importing a submodule runs its package first
+    if "." in name:
+        candidates.append(name.rpartition(".")[0])
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            candidates.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                anchor = package.split(".")[:len(package.split(".")) - node.level + 1] if package else []
+                base = ".".join(anchor + ([base] if base else []))
+            candidates.append(base)
+            candidates.extend(f"{base}.{alias.name}" if base else alias.name for alias in node.names)
+
+    imports = set()
+    for candidate in candidates:
+        # `import a.b.c` also imports a and a.b
+        parts = candidate.split(".")
+        for i in range(1, len(parts) + 1):
+            module = ".".join(parts[:i])
+            if module != name and modulePath(root, module):
+                imports.add(module)
+    return imports
+
+def importGraph(root, main_module):
+    """ {module: project modules it imports}, for every module reachable from `main_module`. """
+    graph = {}
+    pending = [main_module]
+    while pending:
+        name = pending.pop()
+        if name in graph:
+            continue
+        path = modulePath(root, name)
+        graph[name] = importsOf(root, name, path) if path else set()
+        pending.extend(graph[name] - graph.keys())
+    return graph
+
+def dependentsOf(graph, changed):
+    """ `changed` plus every module that imports one of them, directly or not. """
+    importers = {}
+    for name, imports in graph.items():
+        for module in imports:
+            importers.setdefault(module, set()).add(name)
+    result = set()
+    pending = list(changed)
+    while pending:
+        name = pending.pop()
+        if name not in result:
+            result.add(name)
+            pending.extend(importers.get(name, ()))
+    return result
+
+def reloadOrder(graph, modules):
+    """ `modules` sorted so each comes after the project modules it imports. """
+    order = []
+    visiting = set()
+    def visit(name):
+        if name in visiting or name in order:
+            return
+        visiting.add(name)
+        for module in sorted(graph.get(name, ())):
+            if module in modules:
+                visit(module)
+        order.append(name)
+    for name in sorted(modules):
+        visit(name)
+    return order
+
+def fileHash(path):
+    try:
+        with open(path, "rb") as file:
+            return hashlib.sha1(file.read()).hexdigest()
+    except OSError:
+        return None
+
+class ChangeFilter:
+    """
+    ClassName : ChangeFilter
+    Description : Decides which saves matter: files in the main module's
+    import graph (or under an explicitly watched directory) that match no
+    ignore glob and whose content really changed.
+    """
+    def __init__(self, main_file, extra_directories=None, ignore=RELOAD_IGNORE):
+        self.root = os.path.dirname(os.path.abspath(main_file))
+        self.main_module = moduleName(self.root, main_file)
+        self.extra_directories = [os.path.abspath(directory) for directory in extra_directories or []]
+        self.ignore = ignore
+        self.lock = threading.Lock()
+        # Path -> content hash of every module in the import graph
+        self.files = {}
+        self.skipped = 0
+        self.refresh()
+
+    def refresh(self):
+        """ Rebuild the import graph, returns True when the watched directories changed. """
+        try:
+            graph = importGraph(self.root, self.main_module)
+        except SyntaxError as e:
+            # Keep the last graph until the file is fixed
+            print(f"[Hot Reload] {e.filename}:{e.lineno}: {e.msg}")
+            return False
+        paths = {modulePath(self.root, name) for name in graph} - {None}
+        with self.lock:
+            directories = self.directories()
+            self.files = {path: self.files.get(path) or fileHash(path) for path in paths}
+            return self.directories() != directories
+
+    def directories(self):
+        return sorted({os.path.dirname(path) for path in self.files})
+
+    def ignored(self, path):
+        return any(fnmatch.fnmatch(path, pattern) for pattern in self.ignore)
+
+    def accept(self, path):
+        path = os.path.abspath(path)
+        if not path.endswith(".py") or self.ignored(path):
+            return False
+        with self.lock:
+            if path not in self.files and not any(path.startswith(directory + os.sep) for directory in self.extra_directories):
+                return False
+            digest = fileHash(path)
+            if digest is None or digest == self.files.get(path):
+                # Saved without changes, or touched by a tool
+                self.skipped += 1
+                return False
+            self.files[path] = digest
+            return True
+
+def scheduleWatches(observer, handler, change_filter):
+    """ One non-recursive watch per directory of the import graph, recursive ones for extra directories. """
+    observer.unschedule_all()
+    directories = change_filter.directories()
+    for directory in directories:
+        observer.schedule(handler, directory, recursive=False)
+    for directory in change_filter.extra_directories:
+        observer.schedule(handler, directory, recursive=True)
+    print(f"[Hot Reload] {len(change_filter.files)} modules in the import graph, "
+          f"{len(directories) + len(change_filter.extra_directories)} directories watched")
+
+class ModuleReloader:
+    """
+    ClassName : ModuleReloader
+    Description : Swaps changed modules of a running app with importlib.
+    Changed `ui/` and `gui/` modules are reloaded together with the modules
+    that import them (so `from x import Y` names are refreshed), then the
+    window rebuilds its pages. Anything else needs a full restart.
+    """
+    def __init__(self, root, main_module):
+        self.root = root
+        self.main_module = main_module
+        self.edit_time = None
+
+    def canReload(self, names):
+        return all(name.split(".")[0] in RELOADABLE_PACKAGES for name in names)
+
+    def reload(self, paths, window):
+        """ Reload the modules of `paths` and rebuild `window`, returns the reloaded names. """
+        changed = {name for name in (moduleName(self.root, path) for path in paths) if name}
+        graph = importGraph(self.root, self.main_module)
+        changed &= graph.keys()
+        if not changed:
+            return []
+        if not self.canReload(changed):
+            raise RuntimeError(f"{', '.join(sorted(changed))} cannot be reloaded in place")
+
+        theme = sys.modules.get("ui.Theme")
+        current_theme = getattr(theme, "current", None)
+
+        reloaded = [name for name in reloadOrder(graph, dependentsOf(graph, changed)) if name in sys.modules]
+        for name in reloaded:
+            importlib.reload(sys.modules[name])
+
+        # A reloaded theme module starts from its default, keep the one in use
+        if "ui.Theme" in reloaded and current_theme:
+            sys.modules["ui.Theme"].applyTheme(current_theme)
+        window.rebuildPages()
+        return reloaded
+
+def afterPaint(window, callback):
+    """
+    Call `callback` once `window` has next been painted. A zero timer
+    queued after show() or a reload can run before the window is exposed
+    (xcb, wayland), which made the edit to window times look too short.
+    """
+    from PyQt6.QtCore import QEvent, QObject, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Type.Paint and watched.isWidgetType() and watched.window() is window:
+                QApplication.instance().removeEventFilter(self)
+                # Queued behind the rest of the paint pass and the flush to the screen
+                QTimer.singleShot(0, callback)
+                self.deleteLater()
+            return False
+
+    watcher = PaintWatcher(window)
+    QApplication.instance().installEventFilter(watcher)
+    return watcher
+
+def runInProcess(main_file, watch_directories):
+    """
+    Run the app in this process and reload changed modules in place, the
+    QApplication, the session and the saved tasks survive every edit. Falls
+    back to re-executing the watcher when a reload fails.
+    """
+    from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+    from PyQt6.QtWidgets import QApplication
+
+    change_filter = ChangeFilter(main_file, watch_directories)
+    root, main_module = change_filter.root, change_filter.main_module
+    sys.path.insert(0, root)
+
+    class ChangeNotifier(QObject, FileSystemEventHandler):
+        # Emitted on the watchdog thread, delivered on the UI thread
+        changed = pyqtSignal(str)
+
+        def on_modified(self, event):
+            if change_filter.accept(event.src_path):
+                self.changed.emit(event.src_path)
+
+        on_created = on_modified
+
+        def on_moved(self, event):
+            # Editors that save through a temporary file
+            if change_filter.accept(event.dest_path):
+                self.changed.emit(event.dest_path)
+
+    app = QApplication(sys.argv)
+    module = importlib.import_module(main_module)
+    window = module.createWindow()
+    reloader = ModuleReloader(root, main_module)
+    reloads = 0
+
+    changed_paths = set()
+    debounce = QTimer()
+    debounce.setSingleShot(True)
+    notifier = ChangeNotifier()
+    def on_changed(path):
+        changed_paths.add(path)
+        reloader.edit_time = time.time()
+        debounce.start(int(RELOAD_DEBOUNCE * 1000))
+    notifier.changed.connect(on_changed)
+
+    def reload():
+        nonlocal reloads
+        paths = set(changed_paths)
+        changed_paths.clear()
+        try:
+            reloaded = reloader.reload(paths, window)
+        except SyntaxError as e:
+            # Keep the running version until the file is fixed
+            print(f"\n[Hot Reload] {e.filename}:{e.lineno}: {e.msg}")
+            return
+        except Exception as e:
+            print(f"\n[Hot Reload] Reload failed ({e}), restarting...")
+            observer.stop()
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+        if reloaded:
+            reloads += 1
+            message = f"\n[Hot Reload] Reload #{reloads}: {', '.join(reloaded)}, edit to window"
+            edit_time, skipped = reloader.edit_time, change_filter.skipped
+            afterPaint(window, lambda: print(f"{message} {(time.time() - edit_time) * 1000:.0f} ms ({skipped} unchanged saves skipped)"))
+        if change_filter.refresh():
+            scheduleWatches(observer, notifier, change_filter)
+    debounce.timeout.connect(reload)
+
+    observer = Observer()
+    scheduleWatches(observer, notifier, change_filter)
+    observer.start()
+    try:
+        app.exec()
+    finally:
+        observer.stop()
+        observer.join()
+
+def runForked(main_file, edit_time):
+    """ Body of a process forked from the zygote: start the app and report when it is on screen. """
+    root = os.path.dirname(os.path.abspath(main_file))
+    sys.path.insert(0, root)
+    sys.argv = [main_file]
+    with open(main_file, "rb") as file:
+        tree = ast.parse(file.read(), main_file)
+    if not any(isinstance(node, ast.FunctionDef) and node.name == "createWindow" for node in tree.body):
+        runpy.run_path(main_file, run_name="__main__")
+        return
+    module = importlib.import_module(moduleName(root, main_file))
+
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+    window = module.createWindow()
+    if edit_time:
+        afterPaint(window, lambda: print(f"[Hot Reload] Edit to window {(time.time() - edit_time) * 1000:.0f} ms", flush=True))
+    sys.exit(app.exec())
+
+def runZygote(main_file, reply_fd):
+    """
+    Standby interpreter: import the heavy modules once, then fork a new app
+    for every `spawn <edit time>` line on stdin and answer with its pid.
+    """
+    for name in ZYGOTE_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(e)
+    # Forked apps are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    replies = os.fdopen(reply_fd, "w")
+
+    for line in sys.stdin:
+        command, _, edit_time = line.strip().partition(" ")
+        if command != "spawn":
+            continue
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                replies.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+                runForked(main_file, float(edit_time or 0))
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 0
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        replies.write(f"{pid}\n")
+        replies.flush()
+
+class Zygote:
+    """
+    ClassName : Zygote
+    Description : Keeps one standby interpreter with PyQt6, supabase and
+    dotenv already imported. A restart forks it, so the app skips the
+    interpreter startup and those imports.
+    """
     def __init__(self, main_file):
         self.main_file = main_file
+        self.process = None
+        self.replies = None
+        self.start()
+
+    def start(self):
+        read_fd, write_fd = os.pipe()
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--zygote", self.main_file, str(write_fd)],
+            stdin=subprocess.PIPE, pass_fds=(write_fd,), text=True
+        )
+        os.close(write_fd)
+        self.replies = os.fdopen(read_fd)
+
+    def spawn(self, edit_time=None):
+        """ Fork a new app, returns its pid. """
+        if self.process.poll() is not None:
+            self.start()
+        self.process.stdin.write(f"spawn {edit_time or 0}\n")
+        self.process.stdin.flush()
+        line = self.replies.readline()
+        if not line:
+            raise RuntimeError("the zygote exited")
+        return int(line)
+
+    def stop(self):
+        self.process.kill()
+
+class CodeChangeHandler(FileSystemEventHandler):
+    def __init__(self, main_file, change_filter, debounce=RELOAD_DEBOUNCE):
+        self.main_file = main_file
+        self.change_filter = change_filter
+        self.debounce = debounce
+        self.restarts = 0
+        # Called after each restart, the new code may import other modules
+        self.on_restarted = None
         self.last_edit_time = None
+        self.timer = None
         self.is_restarting = False
         self.current_process = None
         self.lock = threading.Lock()
-
-        # Start monitoring in a separate thread
-        self.monitor_thread = threading.Thread(target=self.monitor_changes, daemon=True)
-        self.monitor_thread.start()
+        # Forking needs a POSIX system, elsewhere every restart is cold
+        self.zygote = Zygote(main_file) if hasattr(os, "fork") else None
 
     def on_modified(self, event):
-        if event.src_path.endswith('.py'):
-            with self.lock:
-                self.last_edit_time = time.time()  # Update last edit time
+        self.on_changed(event.src_path)
+
+    on_created = on_modified
 
-    def monitor_changes(self):
-        while True:
-            time.sleep(1)
+    def on_moved(self, event):
+        # Editors that save through a temporary file
+        self.on_changed(event.dest_path)
+
+    def on_changed(self, path):
+        if self.change_filter.accept(path):
             with self.lock:
-                if self.last_edit_time and time.time() - self.last_edit_time >= 4:
-                    self.restart_application()
-                    self.last_edit_time = None  # Reset after restart
+                self.last_edit_time = time.time()
+                # Restart once the saves stop for `debounce` seconds
+                if self.timer:
+                    self.timer.cancel()
+                self.timer = threading.Timer(self.debounce, self.restart_application)
+                self.timer.daemon = True
+                self.timer.start()
 
     def restart_application(self):
-        if self.is_restarting:
-            return
-
-        self.is_restarting = True
+        with self.lock:
+            if self.is_restarting:
+                return
+            self.is_restarting = True
+            edit_time, self.last_edit_time = self.last_edit_time, None
+            self.timer = None
         try:
             # Kill current process and its children
             if self.current_process:
-                parent = psutil.Process(self.current_process.pid)
-                for child in parent.children(recursive=True):
-                    child.kill()
-                parent.kill()
+                try:
+                    parent = psutil.Process(self.current_process.pid)
+                    for child in parent.children(recursive=True):
+                        child.kill()
+                    parent.kill()
+                except psutil.NoSuchProcess:
+                    pass
                 self.current_process = None
 
             # Start new process
-            print("\n[Hot Reload] Starting application...")
-            self.current_process = subprocess.Popen([sys.executable, self.main_file])
+            if edit_time is None:
+                print("\n[Hot Reload] Starting application...")
+            else:
+                self.restarts += 1
+                print(f"\n[Hot Reload] Restart #{self.restarts} ({self.change_filter.skipped} unchanged saves skipped)")
+            if self.zygote:
+                self.current_process = psutil.Process(self.zygote.spawn(edit_time))
+            else:
+                self.current_process = subprocess.Popen([sys.executable, self.main_file])
 
         finally:
             self.is_restarting = False
+        if edit_time is not None and self.on_restarted:
+            self.on_restarted()
 
 class HotReloader:
     def __init__(self, main_file, watch_directories=None):
         self.main_file = main_file
-        self.watch_directories = watch_directories or [os.path.dirname(os.path.abspath(main_file))]
-        self.event_handler = CodeChangeHandler(main_file)
+        # Only the import graph of the main file is watched, plus these directories
+        self.watch_directories = watch_directories or []
+        self.change_filter = ChangeFilter(main_file, self.watch_directories)
+        self.event_handler = CodeChangeHandler(main_file, self.change_filter)
+        self.event_handler.on_restarted = self.refresh_watches
         self.observer = Observer()
 
     def start(self):
         # Start file watcher
-        for directory in self.watch_directories:
-            self.observer.schedule(self.event_handler, directory, recursive=True)
+        scheduleWatches(self.observer, self.event_handler, self.change_filter)
         self.observer.start()
 
         # Start initial application
@@ -75,19 +518,35 @@ class HotReloader:
         except KeyboardInterrupt:
             self.stop()
 
+    def refresh_watches(self):
+        if self.change_filter.refresh():
+            scheduleWatches(self.observer, self.event_handler, self.change_filter)
+
     def stop(self):
         self.observer.stop()
         if self.event_handler.current_process:
             self.event_handler.current_process.kill()
+        if self.event_handler.zygote:
+            self.event_handler.zygote.stop()
         self.observer.join()
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python hot_reloader.py <main_python_file> [additional_watch_directories...]")
+    if sys.argv[1:2] == ["--zygote"]:
+        runZygote(sys.argv[2], int(sys.argv[3]))
+        sys.exit(0)
+
+    args = sys.argv[1:]
+    in_process = "--reload" in args
+    args = [arg for arg in args if arg != "--reload"]
+    if not args:
+        print("Usage: python watch.py [--reload] <main_python_file> [additional_watch_directories...]")
         sys.exit(1)
 
-    main_file = sys.argv[1]
-    watch_dirs = sys.argv[2:] if len(sys.argv) > 2 else None
+    main_file = args[0]
+    watch_dirs = args[1:] or None
 
-    reloader = HotReloader(main_file, watch_dirs)
-    reloader.start()
+    if in_process:
+        runInProcess(main_file, watch_dirs)
+    else:
+        reloader = HotReloader(main_file, watch_dirs)
+        reloader.start()